@@ -1 +1,16 @@
 """__init__ for tests package."""
+from aiohttp import web
+
+
+async def start_server(app: web.Application):
+    """Serve an aiohttp application on a free local port.
+
+    :param app: <aiohttp.web.Application>
+    :return: <tuple> (<aiohttp.web.AppRunner> to clean up, <str> base url)
+    """
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]  # pylint: disable=protected-access
+    return runner, f"http://127.0.0.1:{port}"
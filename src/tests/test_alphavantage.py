@@ -1,11 +1,21 @@
 # -*- coding: utf-8 -*-
 # pylint: disable=C0116, W0511
 """Unit testing module for the alphavantage module."""
+import asyncio
 import json
+import math
+import os
+import tempfile
+import time
 import unittest
+from unittest import mock
 
 import pandas as pd
 
+from warren_bot import cache
+from warren_bot import quota
+from warren_bot import rate_limit
+
 from warren_bot import alphavantage as alpha
 
 
@@ -111,6 +121,7 @@ class AlphavantageTestCase(unittest.TestCase):
         # Check structure of annualEarnings
         self.assertIn("reportedEPS", earnings["annualEarnings"].keys())
         self.assertTrue(len(earnings["annualEarnings"].keys()) == 1)
+        self.assertEqual(earnings["annualEarnings"].dtypes["reportedEPS"], "float64")
         # Check structure of quarterlyEarnings
         self.assertIn("reportedEPS", earnings["quarterlyEarnings"].keys())
         self.assertIn("reportedDate", earnings["quarterlyEarnings"].keys())
@@ -397,10 +408,325 @@ class AlphavantageTestCase(unittest.TestCase):
         self.assertIn("volume", prices.keys())
         self.assertIn("dividend_amt", prices.keys())
         self.assertIn("ticker", prices.keys())
-        self.assertIn("SMA20", prices.keys())
-        self.assertIn("SMA50", prices.keys())
-        self.assertIn("SMA200", prices.keys())
-        self.assertIn("log_return", prices.keys())
+        self.assertNotIn("SMA20", prices.keys())
+
+    def test_process_prices_dtypes(self):
+        """Test time series bars are parsed into typed columns oldest first."""
+        # GIVEN
+        with open("./src/tests/IBM.monthly_adjusted.json", encoding="utf-8") as file:
+            data = json.load(file)
+
+        # WHEN
+        prices = alpha.process_alphavantage_company_prices(data)
+
+        # THEN
+        self.assertEqual(len(prices), len(data["Monthly Adjusted Time Series"]))
+        self.assertTrue(prices.index.is_monotonic_increasing)
+        self.assertEqual(prices["close"].dtype, "float32")
+        self.assertEqual(prices["volume"].dtype, "int64")
+        self.assertEqual(prices["ticker"].dtype, "category")
+        self.assertTrue(prices["split coefficient"].isna().all())
+        self.assertAlmostEqual(float(prices["close"].iloc[-1]), 135.36, places=4)
+
+    def test_process_report_frame_schema(self):
+        """Test schema conversion maps None to NaN and flags unknown fields."""
+        # GIVEN
+        records = [
+            {"fiscalDateEnding": "2022-12-31", "reportedCurrency": "USD", "totalRevenue": "100", "newField": "1"},
+            {"fiscalDateEnding": "2021-12-31", "reportedCurrency": "USD", "totalRevenue": "None", "newField": "2"},
+        ]
+
+        # WHEN
+        with self.assertLogs(alpha.LOGGER, level="WARNING") as logs:
+            frame = alpha.process_report_frame(records, alpha.INCOME_STATEMENT_SCHEMA, "income statement")
+
+        # THEN
+        self.assertEqual(frame["totalRevenue"].dtype.kind, "f")
+        self.assertEqual(frame["totalRevenue"].iloc[0], 100)
+        self.assertTrue(pd.isna(frame["totalRevenue"].iloc[1]))
+        self.assertEqual(frame["reportedCurrency"].iloc[0], "USD")
+        self.assertIn("newField", logs.output[0])
+
+    def test_merge_daily_prices(self):
+        """Test new daily bars are appended to the stored history."""
+        # GIVEN
+        with open("./src/tests/IBM.daily_adjusted.json", encoding="utf-8") as file:
+            data = json.load(file)
+        prices = alpha.process_alphavantage_company_prices(data)
+        stored = prices.iloc[:-10].copy()
+        recent = prices.iloc[-20:].copy()
+
+        # WHEN
+        merged = alpha.merge_daily_prices(stored, recent)
+
+        # THEN
+        self.assertEqual(len(merged), len(prices))
+        self.assertEqual(merged.index[-1], prices.index[-1])
+        pd.testing.assert_frame_equal(merged, prices)
+
+    def test_merge_daily_prices_needs_full_history(self):
+        """Test a gap or a new dividend asks for the full history again."""
+        # GIVEN
+        with open("./src/tests/IBM.daily_adjusted.json", encoding="utf-8") as file:
+            data = json.load(file)
+        prices = alpha.process_alphavantage_company_prices(data)
+        dividend_date = prices.index[prices["dividend_amt"] > 0][0]
+
+        # WHEN
+        gap = alpha.merge_daily_prices(prices.iloc[:30], prices.iloc[40:])
+        dividend = alpha.merge_daily_prices(
+            prices[prices.index < dividend_date], prices[prices.index >= dividend_date - pd.Timedelta(days=7)]
+        )
+
+        # THEN
+        self.assertIsNone(gap)
+        self.assertIsNone(dividend)
+
+
+class AlphavantageDownloadTestCase(unittest.IsolatedAsyncioTestCase):
+    """Test Alphavantage download methods."""
+
+    async def asyncSetUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        patches = [
+            mock.patch.object(alpha, "RESPONSE_CACHE", cache.ResponseCache(self.tmp_dir.name)),
+            mock.patch.object(alpha, "KEY_POOL", rate_limit.KeyPool(per_minute=1000)),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+        self.addCleanup(self.tmp_dir.cleanup)
+
+    async def test_cache_hit_skips_network(self):
+        """Test a repeat request is answered from the response cache."""
+        # GIVEN
+        with open("./src/tests/IBM.company_overview.json", encoding="utf-8") as file:
+            data = json.load(file)
+        get_json = mock.AsyncMock(return_value=(200, data))
+
+        # WHEN
+        with mock.patch.object(alpha.http_client, "get_json", get_json):
+            first = await alpha.get_alphavantage_data("OVERVIEW", "IBM", "demo")
+            second = await alpha.get_alphavantage_data("OVERVIEW", "IBM", "demo")
+
+        # THEN
+        self.assertEqual(first, data)
+        self.assertEqual(second, data)
+        get_json.assert_awaited_once()
+
+    async def test_identical_requests_coalesce(self):
+        """Test concurrent identical requests share one download."""
+
+        # GIVEN
+        async def slow_get_json(url, params=None):  # pylint: disable=unused-argument
+            await asyncio.sleep(0.05)
+            return 200, {"Symbol": params["symbol"]}
+
+        get_json = mock.AsyncMock(side_effect=slow_get_json)
+
+        # WHEN
+        with mock.patch.object(alpha.http_client, "get_json", get_json):
+            results = await asyncio.gather(
+                *[alpha.get_alphavantage_data("OVERVIEW", "MSFT", "demo") for _ in range(5)],
+                alpha.get_alphavantage_data("OVERVIEW", "IBM", "demo"),
+            )
+
+        # THEN
+        self.assertEqual(get_json.await_count, 2)
+        self.assertEqual([r["Symbol"] for r in results], ["MSFT"] * 5 + ["IBM"])
+        self.assertFalse(alpha.IN_FLIGHT.in_flight(("OVERVIEW", "MSFT", "compact", None)))
+
+    async def test_fresh_request_does_not_join_cached_request(self):
+        """Test a request for fresh data is not answered by a concurrent request accepting an older payload."""
+        # GIVEN
+        alpha.RESPONSE_CACHE.set(("OVERVIEW", "IBM", "compact"), {"Symbol": "IBM", "Name": "old"})
+        get_json = mock.AsyncMock(return_value=(200, {"Symbol": "IBM", "Name": "new"}))
+
+        # WHEN
+        with mock.patch.object(alpha.http_client, "get_json", get_json):
+            cached, fresh = await asyncio.gather(
+                alpha.get_alphavantage_data("OVERVIEW", "IBM", "demo", max_age=math.inf),
+                alpha.get_alphavantage_data("OVERVIEW", "IBM", "demo", max_age=0),
+            )
+
+        # THEN
+        self.assertEqual(cached["Name"], "old")
+        self.assertEqual(fresh["Name"], "new")
+        get_json.assert_awaited_once()
+
+    async def test_interactive_call_joins_batch_call(self):
+        """Test an interactive caller joining a batch download in flight is not held to the batch reserve."""
+
+        # GIVEN
+        async def batch_call(symbol):
+            with quota.priority(quota.BATCH):
+                return await alpha.get_alphavantage_data("OVERVIEW", symbol, "demo")
+
+        get_json = mock.AsyncMock(return_value=(200, {"Symbol": "IBM"}))
+        reserve_everything = quota.QuotaPlanner(reserve=1.0, off_peak=(0, 0))
+        with mock.patch.object(alpha, "QUOTA_PLANNER", reserve_everything), mock.patch.object(
+            alpha, "KEY_POOL", rate_limit.KeyPool(per_minute=1000, per_day=10)
+        ), mock.patch.object(alpha.http_client, "get_json", get_json):
+            batch = asyncio.create_task(batch_call("IBM"))
+            await asyncio.sleep(0)  # the batch download is in flight
+
+            # WHEN
+            interactive = await alpha.get_alphavantage_data("OVERVIEW", "IBM", "demo")
+
+            # THEN
+            self.assertEqual(await batch, interactive)
+            get_json.assert_awaited_once()
+            with self.assertRaises(quota.ReservedQuotaError):
+                await batch_call("MSFT")
+
+    async def test_throttle_response_not_cached(self):
+        """Test throttle messages are never written to the cache."""
+        # GIVEN
+        get_json = mock.AsyncMock(return_value=(200, {"Error Message": "Invalid API call."}))
+
+        # WHEN
+        with mock.patch.object(alpha.http_client, "get_json", get_json):
+            await alpha.get_alphavantage_data("OVERVIEW", "NOPE", "demo")
+            await alpha.get_alphavantage_data("OVERVIEW", "NOPE", "demo")
+
+        # THEN
+        self.assertEqual(get_json.await_count, 2)
+
+    async def test_estimate_calls(self):
+        """Test cached payloads are left out of the call estimate."""
+        # GIVEN
+        with open("./src/tests/IBM.company_overview.json", encoding="utf-8") as file:
+            overview = json.load(file)
+        with open("./src/tests/IBM.income_statement.json", encoding="utf-8") as file:
+            income_statement = json.load(file)
+        get_json = mock.AsyncMock(side_effect=[(200, overview), (200, income_statement)])
+        with mock.patch.object(alpha.http_client, "get_json", get_json):
+            with quota.priority(quota.BATCH):
+                await alpha.get_alphavantage_overview("IBM", "demo")
+                await alpha.get_alphavantage_statement("INCOME_STATEMENT", "IBM", "demo")
+
+        # WHEN
+        cost = alpha.estimate_calls(["IBM", "ibm", "MSFT"])
+
+        # THEN
+        self.assertEqual(cost, 10)
+        self.assertEqual(
+            alpha.estimate_calls(["IBM"], functions=["OVERVIEW", "INCOME_STATEMENT"], prices=False), 0
+        )
+
+    async def test_estimate_calls_keeps_current_statements(self):
+        """Test a statement past its TTL that reports the latest filed quarter is not counted as a call."""
+        # GIVEN
+        with open("./src/tests/IBM.company_overview.json", encoding="utf-8") as file:
+            overview = json.load(file)
+        with open("./src/tests/IBM.income_statement.json", encoding="utf-8") as file:
+            income_statement = json.load(file)
+        alpha.RESPONSE_CACHE.set(alpha.cache_key("OVERVIEW", "IBM", alpha.FUNDAMENTALS_OUTPUTSIZE), overview)
+        statement = alpha.cache_key("INCOME_STATEMENT", "IBM", alpha.FUNDAMENTALS_OUTPUTSIZE)
+        alpha.RESPONSE_CACHE.set(statement, income_statement)
+        old = time.time() - 30 * 24 * 60 * 60
+        os.utime(alpha.RESPONSE_CACHE.path(statement), (old, old))
+        functions = ["OVERVIEW", "INCOME_STATEMENT"]
+
+        # WHEN
+        current = alpha.estimate_calls(["IBM"], functions=functions, prices=False)
+        newer_overview = dict(overview, LatestQuarter="2023-06-30")
+        alpha.RESPONSE_CACHE.set(alpha.cache_key("OVERVIEW", "IBM", alpha.FUNDAMENTALS_OUTPUTSIZE), newer_overview)
+        behind = alpha.estimate_calls(["IBM"], functions=functions, prices=False)
+
+        # THEN
+        self.assertEqual(current, 0)
+        self.assertEqual(behind, 1)
+
+    async def test_exhausted_key_rotates(self):
+        """Test a key reported over its daily limit is skipped for the next key of the pool."""
+
+        # GIVEN
+        async def fake_get_json(url, params=None):  # pylint: disable=unused-argument
+            if params["apikey"] == "spent":
+                return 200, {"Information": "Our standard API rate limit is 25 requests per day."}
+            return 200, {"Symbol": params["symbol"]}
+
+        get_json = mock.AsyncMock(side_effect=fake_get_json)
+
+        # WHEN
+        with mock.patch.object(alpha, "KEY_POOL", rate_limit.KeyPool(["spent", "fresh"], per_minute=1000)):
+            with mock.patch.object(alpha.http_client, "get_json", get_json):
+                data = await alpha.get_alphavantage_data("OVERVIEW", "IBM", "spent")
+            remaining = alpha.KEY_POOL.limiters["spent"].remaining_today()
+
+        # THEN
+        self.assertEqual(data, {"Symbol": "IBM"})
+        self.assertEqual(get_json.await_count, 2)
+        self.assertEqual(remaining, 0)
+
+    async def test_statement_refreshed_after_new_quarter(self):
+        """Test a cached statement is reused until the overview reports a newer quarter."""
+        # GIVEN
+        with open("./src/tests/IBM.income_statement.json", encoding="utf-8") as file:
+            data = json.load(file)
+        alpha.RESPONSE_CACHE.set(("INCOME_STATEMENT", "IBM", "full"), data)
+        old = time.time() - 30 * 24 * 60 * 60
+        os.utime(alpha.RESPONSE_CACHE.path(("INCOME_STATEMENT", "IBM", "full")), (old, old))
+        get_json = mock.AsyncMock(return_value=(200, data))
+
+        # WHEN
+        with mock.patch.object(alpha.http_client, "get_json", get_json):
+            current = await alpha.get_alphavantage_statement("INCOME_STATEMENT", "IBM", "demo", "2023-03-31")
+            calls_when_current = get_json.await_count
+            await alpha.get_alphavantage_statement("INCOME_STATEMENT", "IBM", "demo", pd.Timestamp("2023-06-30"))
+
+        # THEN
+        self.assertEqual(current, data)
+        self.assertEqual(calls_when_current, 0)
+        get_json.assert_awaited_once()
+
+    async def test_monthly_prices_share_daily_sync(self):
+        """Test monthly bars are built from the daily sync running for the same ticker."""
+        # GIVEN
+        with open("./src/tests/IBM.daily_adjusted.json", encoding="utf-8") as file:
+            daily = alpha.process_alphavantage_company_prices(json.load(file))
+
+        async def slow_sync(ticker, key):  # pylint: disable=unused-argument
+            await asyncio.sleep(0.05)
+            return daily
+
+        sync = mock.AsyncMock(side_effect=slow_sync)
+
+        # WHEN
+        with mock.patch.object(alpha, "_sync_daily_prices", sync):
+            prices, monthly = await asyncio.gather(
+                alpha.sync_daily_alphavantage_company_prices("IBM", "demo"),
+                alpha.get_monthly_alphavantage_company_prices("ibm", "demo"),
+            )
+
+        # THEN
+        sync.assert_awaited_once()
+        self.assertIsNot(prices, daily)  # callers sort their prices in place
+        pd.testing.assert_frame_equal(prices, daily)
+        self.assertEqual(monthly.index[-1], daily.index[-1])
+
+    async def test_download_stocks_reports_failures(self):
+        """Test a bad ticker is reported without aborting the other downloads."""
+        # GIVEN
+        with open("./src/tests/IBM.daily_adjusted.json", encoding="utf-8") as file:
+            ibm = alpha.process_alphavantage_company_prices(json.load(file))
+        stocks = pd.DataFrame({"ticker": ["IBM", "NOPE", "IBM"]})
+
+        async def sync(ticker, key):  # pylint: disable=unused-argument
+            if ticker == "NOPE":
+                raise KeyError("Time Series (Daily)")
+            return ibm
+
+        # WHEN
+        with mock.patch.object(alpha, "sync_daily_alphavantage_company_prices", side_effect=sync) as sync_mock:
+            prices, failed = await alpha.download_stocks(stocks, "demo")
+
+        # THEN
+        self.assertEqual(sync_mock.await_count, 2)
+        self.assertEqual(list(failed), ["NOPE"])
+        self.assertIsInstance(failed["NOPE"], KeyError)
+        self.assertEqual(len(prices), len(ibm))
 
 
 if __name__ == "__main__":
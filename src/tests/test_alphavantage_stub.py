@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+# pylint: disable=C0116, W0511
+"""Unit testing module for the alphavantage_stub module."""
+import datetime
+import unittest
+
+from tests import start_server
+from warren_bot import alphavantage as alpha
+from warren_bot import alphavantage_stub as stub
+from warren_bot import http_client
+
+
+class AlphavantageStubTestCase(unittest.TestCase):
+    """Test AlphavantageStub payloads."""
+
+    def test_recorded_payload(self):
+        """Test recordings are served as is and trimmed for compact requests."""
+        # GIVEN
+        server = stub.AlphavantageStub()
+
+        # WHEN
+        overview = server.payload("OVERVIEW", "IBM")
+        daily = server.payload("TIME_SERIES_DAILY_ADJUSTED", "IBM", "compact")
+
+        # THEN
+        self.assertEqual(overview["Symbol"], "IBM")
+        self.assertLessEqual(len(daily["Time Series (Daily)"]), stub.COMPACT_BARS)
+
+    def test_synthetic_payload(self):
+        """Test any symbol gets reports and parsable, reproducible prices."""
+        # GIVEN
+        server = stub.AlphavantageStub()
+
+        # WHEN
+        overview = server.payload("OVERVIEW", "ZZZ")
+        full = alpha.process_alphavantage_company_prices(
+            stub.synthetic_time_series("TIME_SERIES_DAILY_ADJUSTED", "ZZZ", "full", today="2024-06-28")
+        )
+        compact = alpha.process_alphavantage_company_prices(
+            stub.synthetic_time_series("TIME_SERIES_DAILY_ADJUSTED", "ZZZ", "compact", today="2024-06-28")
+        )
+        monthly = alpha.process_alphavantage_company_prices(
+            stub.synthetic_time_series("TIME_SERIES_MONTHLY_ADJUSTED", "ZZZ", today="2024-06-28")
+        )
+
+        # THEN
+        self.assertEqual(overview["Symbol"], "ZZZ")
+        self.assertEqual(len(compact), stub.COMPACT_BARS)
+        self.assertEqual(full["close"].iloc[-1], compact["close"].iloc[-1])
+        self.assertEqual(str(monthly.index.max().date()), "2024-06-28")
+        self.assertTrue((full["high"] >= full["low"]).all())
+
+    def test_limits(self):
+        """Test Note throttling and Information quota responses."""
+        # GIVEN
+        server = stub.AlphavantageStub(per_minute=2, per_day=3)
+
+        # WHEN
+        minute = [server.throttle() for _ in range(3)]
+        server.recent_calls.clear()
+        day = [server.throttle() for _ in range(2)]
+
+        # THEN
+        self.assertEqual(minute[:2], [None, None])
+        self.assertIn("Note", minute[2])
+        self.assertIsNone(day[0])
+        self.assertIn("Information", day[1])
+
+    def test_daily_quota_resets(self):
+        """Test the per-day quota starts over on a new day."""
+        # GIVEN
+        server = stub.AlphavantageStub(per_day=1)
+        server.throttle()
+        self.assertIn("Information", server.throttle())
+
+        # WHEN
+        server.day -= datetime.timedelta(days=1)
+        body = server.throttle()
+
+        # THEN
+        self.assertIsNone(body)
+        self.assertEqual(server.calls, 1)
+
+
+class AlphavantageStubServerTestCase(unittest.IsolatedAsyncioTestCase):
+    """Test the stand-in over HTTP."""
+
+    async def asyncSetUp(self):
+        self.runner, base = await start_server(stub.AlphavantageStub(invalid_symbols=("NOPE",)).app())
+        self.url = f"{base}/query"
+
+    async def asyncTearDown(self):
+        await http_client.close_session()
+        await self.runner.cleanup()
+
+    async def test_query(self):
+        """Test the /query interface answers like Alphavantage."""
+        # WHEN
+        _, earnings = await http_client.get_json(self.url, params={"function": "EARNINGS", "symbol": "msft"})
+        _, invalid = await http_client.get_json(self.url, params={"function": "EARNINGS", "symbol": "NOPE"})
+
+        # THEN
+        self.assertEqual(earnings["symbol"], "MSFT")
+        self.assertIn("Error Message", invalid)
+
+
+if __name__ == "__main__":
+    unittest.main()
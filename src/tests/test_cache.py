@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+# pylint: disable=C0116, W0511
+"""Unit testing module for the cache module."""
+import os
+import tempfile
+import time
+import unittest
+
+from warren_bot import cache
+
+
+class ResponseCacheTestCase(unittest.TestCase):
+    """Test ResponseCache methods."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.cache = cache.ResponseCache(self.tmp_dir.name)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_round_trip(self):
+        """Test stored documents are returned compressed on disk."""
+        # GIVEN
+        key = ("OVERVIEW", "IBM", "full")
+
+        # WHEN
+        self.cache.set(key, {"Symbol": "IBM"})
+
+        # THEN
+        self.assertEqual(self.cache.get(key), {"Symbol": "IBM"})
+        self.assertTrue(self.cache.path(key).endswith(".json.gz"))
+        self.assertIsNone(self.cache.get(("OVERVIEW", "MSFT", "full")))
+
+    def test_stale_entry(self):
+        """Test documents older than max_age are ignored."""
+        # GIVEN
+        key = ("EARNINGS", "IBM", "full")
+        self.cache.set(key, {"symbol": "IBM"})
+        old = time.time() - 120
+        os.utime(self.cache.path(key), (old, old))
+
+        # WHEN
+        fresh = self.cache.get(key, max_age=60)
+        any_age = self.cache.get(key)
+
+        # THEN
+        self.assertIsNone(fresh)
+        self.assertEqual(any_age, {"symbol": "IBM"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+# pylint: disable=C0116, W0511
+"""Unit testing module for the capture module."""
+import asyncio
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from warren_bot import alphavantage as alpha
+from warren_bot import capture
+
+
+class CorpusTestCase(unittest.IsolatedAsyncioTestCase):
+    """Test Corpus record and replay."""
+
+    async def asyncSetUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.addCleanup(self.tmp_dir.cleanup)
+
+    async def test_record_then_replay(self):
+        """Test a recorded call replays with its response and timing."""
+        # GIVEN
+        async def slow_call():
+            await asyncio.sleep(0.2)
+            return {"sicDescription": "Computer Services"}
+
+        real_call = mock.AsyncMock(side_effect=slow_call)
+        recorder = capture.Corpus(self.tmp_dir.name, "record")
+        recorded = await recorder.call("sec", ("https://data.sec.gov/x.json",), real_call)
+        player = capture.Corpus(self.tmp_dir.name, "replay")
+
+        # WHEN
+        start = time.monotonic()
+        replayed = await player.call("sec", ("https://data.sec.gov/x.json",), real_call)
+        elapsed = time.monotonic() - start
+
+        # THEN
+        real_call.assert_awaited_once()
+        self.assertEqual(replayed, recorded)
+        self.assertGreaterEqual(elapsed, 0.15)
+        with self.assertRaises(capture.ReplayMissError):
+            await player.call("sec", ("https://data.sec.gov/y.json",), real_call)
+
+    async def test_record_keeps_first_call(self):
+        """Test a repeated request keeps the timing of its first recorded call."""
+        # GIVEN
+        async def slow_call():
+            await asyncio.sleep(0.2)
+            return {"sicDescription": "Computer Services"}
+
+        recorder = capture.Corpus(self.tmp_dir.name, "record")
+        await recorder.call("sec", ("https://data.sec.gov/x.json",), slow_call)
+
+        # WHEN
+        await recorder.call("sec", ("https://data.sec.gov/x.json",), mock.AsyncMock(return_value={"cached": True}))
+        entry = recorder.store("sec").get(("https://data.sec.gov/x.json",))
+
+        # THEN
+        self.assertGreaterEqual(entry["elapsed"], 0.15)
+        self.assertEqual(entry["response"], {"sicDescription": "Computer Services"})
+
+    async def test_replay_speed(self):
+        """Test a higher replay speed answers faster than the recording took."""
+        # GIVEN
+        async def slow_call():
+            await asyncio.sleep(0.4)
+            return {"sicDescription": "Computer Services"}
+
+        await capture.Corpus(self.tmp_dir.name, "record").call("sec", ("https://data.sec.gov/x.json",), slow_call)
+        player = capture.Corpus(self.tmp_dir.name, "replay", speed=4)
+
+        # WHEN
+        start = time.monotonic()
+        await player.call("sec", ("https://data.sec.gov/x.json",), slow_call)
+        elapsed = time.monotonic() - start
+
+        # THEN
+        self.assertGreaterEqual(elapsed, 0.08)
+        self.assertLess(elapsed, 0.3)
+
+    async def test_replay_alphavantage(self):
+        """Test get_alphavantage_data is answered from the corpus without the network."""
+        # GIVEN
+        recorder = capture.Corpus(self.tmp_dir.name, "record")
+        payload = {"Symbol": "IBM"}
+        with mock.patch.object(alpha, "_fetch_alphavantage_data", mock.AsyncMock(return_value=payload)):
+            with mock.patch.object(capture, "CAPTURE", recorder):
+                await alpha.get_alphavantage_data("overview", "ibm", "demo")
+        get_json = mock.AsyncMock()
+
+        # WHEN
+        with mock.patch.object(capture, "CAPTURE", capture.Corpus(self.tmp_dir.name, "replay", speed=0)):
+            with mock.patch.object(alpha.http_client, "get_json", get_json):
+                data = await alpha.get_alphavantage_data("OVERVIEW", "IBM", "other-key")
+
+        # THEN
+        self.assertEqual(data, payload)
+        get_json.assert_not_awaited()
+
+    def test_unknown_mode(self):
+        """Test an unknown capture mode is rejected."""
+        with self.assertRaises(ValueError):
+            capture.Corpus(self.tmp_dir.name, "rewind")
+
+
+if __name__ == "__main__":
+    unittest.main()
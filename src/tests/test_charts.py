@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+# pylint: disable=C0116, W0511
+"""Unit testing module for the charts module."""
+import unittest
+
+import pandas as pd
+
+# under test
+from warren_bot import charts
+
+
+def draw_prices(ax):
+    prices = pd.DataFrame(
+        {"high": [3.0, 5.0, 4.0, 6.0], "low": [1.0, 2.0, 2.5, 3.0]},
+        index=pd.to_datetime(["2023-01-31", "2023-02-28", "2023-03-31", "2023-04-30"]),
+    )
+    prices.plot(ax=ax, title="Stock High & Low", xlabel="Date", ylabel="USD")
+
+
+def draw_twin(ax):
+    ax.plot([1, 2, 3], color="tab:red")
+    ax.set_title("Revenue & EPS")
+    ax.twinx().plot([3, 1, 2])
+    ax.figure.autofmt_xdate()
+
+
+class ChartPoolTestCase(unittest.TestCase):
+    """Test figure reuse and cleanup."""
+
+    def test_figures_are_reused(self):
+        """Test charts drawn one after another share one figure and axes."""
+        # GIVEN
+        pool = charts.ChartPool()
+
+        # WHEN
+        for _ in range(5):
+            with pool.figure() as (fig, ax):
+                draw_twin(ax)
+                charts.render(fig, "chart.png")
+        with pool.figure() as (last_fig, last_ax):
+            axes = list(last_fig.axes)
+
+        # THEN
+        self.assertIs(last_fig, fig)
+        self.assertIs(last_ax, ax)
+        self.assertEqual(axes, [ax])  # twin axes of earlier charts are gone
+        self.assertEqual(last_ax.get_title(), "")
+        metrics = pool.metrics()
+        self.assertEqual(metrics["live_figures"], 1)
+        self.assertEqual(metrics["created"], 1)
+        self.assertEqual(metrics["reused"], 5)
+        self.assertGreater(metrics["buffer_bytes"], 0)
+
+    def test_reused_figure_renders_like_a_new_one(self):
+        """Test a chart drawn on a reused figure is pixel identical to one drawn on a new figure."""
+        # GIVEN
+        with charts.ChartPool().figure() as (fig, ax):
+            draw_prices(ax)
+            _, expected = charts.render(fig, "prices.png")
+        pool = charts.ChartPool()
+        with pool.figure() as (fig, ax):
+            draw_twin(ax)
+            charts.render(fig, "twin.png")
+
+        # WHEN
+        with pool.figure() as (fig, ax):
+            draw_prices(ax)
+            _, image = charts.render(fig, "prices.png")
+
+        # THEN
+        self.assertEqual(pool.metrics()["created"], 1)
+        self.assertEqual(image.getvalue(), expected.getvalue())
+
+    def test_failed_chart_closes_figure(self):
+        """Test a figure is closed rather than reused when drawing its chart fails."""
+        # GIVEN
+        pool = charts.ChartPool()
+
+        # WHEN
+        with self.assertRaises(ValueError):
+            with pool.figure() as (fig, _):
+                raise ValueError("bad data")
+
+        # THEN
+        self.assertEqual(fig.axes, [])
+        metrics = pool.metrics()
+        self.assertEqual(metrics["live_figures"], 0)
+        self.assertEqual(metrics["closed"], 1)
+
+    def test_idle_figures_are_bounded(self):
+        """Test figures returned past the idle limit are closed."""
+        # GIVEN
+        pool = charts.ChartPool(max_idle=1)
+
+        # WHEN
+        with pool.figure() as (first, _):
+            with pool.figure() as (second, _):
+                self.assertEqual(pool.metrics()["in_use"], 2)
+        pool.close()
+
+        # THEN
+        self.assertIsNot(first, second)
+        metrics = pool.metrics()
+        self.assertEqual(metrics["live_figures"], 0)
+        self.assertEqual(metrics["closed"], 2)
+        self.assertEqual(metrics["pyplot_figures"], 0)
+
+    def test_with_metrics(self):
+        """Test a charting function's result comes back with the metrics of the pool that drew it."""
+        # GIVEN
+        def chart():
+            with charts.CHARTS.figure() as (fig, ax):
+                draw_twin(ax)
+                return charts.render(fig, "chart.png")[0]
+
+        # WHEN
+        filename, metrics = charts.with_metrics(chart)
+
+        # THEN
+        self.assertEqual(filename, "chart.png")
+        self.assertEqual(metrics["in_use"], 0)
+        self.assertGreaterEqual(metrics["live_figures"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+# pylint: disable=C0116, W0511
+"""Unit testing module for the compact module."""
+import json
+import unittest
+
+import pandas as pd
+
+from warren_bot import alphavantage as alpha
+from warren_bot import compact
+
+
+class CompactTestCase(unittest.TestCase):
+    """Test memory-compact column types."""
+
+    def test_dtypes_are_per_column(self):
+        """Test declared columns are narrowed whatever their values and other numbers are kept."""
+        # GIVEN
+        frame = pd.DataFrame({"close": [135.36, 1234.5678], "reportedEPS": [1.23, 0.1234], "volume": [10, 20]})
+
+        # WHEN
+        narrow = compact.compact_frame(frame, {"close": "float32"})
+
+        # THEN
+        self.assertEqual(narrow["close"].dtype, "float32")
+        self.assertAlmostEqual(float(narrow["close"].iloc[0]), 135.36, places=4)
+        self.assertEqual(narrow["reportedEPS"].dtype, "float64")
+        self.assertEqual(narrow["volume"].dtype, "int64")
+
+    def test_compact_frame(self):
+        """Test a compact price frame keeps its values in less memory."""
+        # GIVEN
+        with open("./src/tests/IBM.daily_adjusted.json", encoding="utf-8") as file:
+            prices = alpha.process_alphavantage_company_prices(json.load(file))
+        wide = prices.astype({"close": "float64", "volume": "int64", "ticker": object})
+
+        # WHEN
+        narrow = compact.compact_frame(wide, compact.PRICE_DTYPES)
+        report = compact.memory_report({"wide": wide, "compact": narrow})
+
+        # THEN
+        self.assertEqual(narrow["ticker"].dtype, "category")
+        self.assertEqual(narrow["close"].dtype, "float32")
+        pd.testing.assert_series_equal(narrow["volume"], wide["volume"])
+        self.assertLess(report.loc["compact", "bytes"], report.loc["wide", "bytes"])
+        self.assertEqual(report.loc["total", "rows"], 2 * len(prices))
+
+
+if __name__ == "__main__":
+    unittest.main()
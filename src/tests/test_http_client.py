@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+# pylint: disable=C0116, W0511
+"""Unit testing module for the http_client module."""
+import json
+import unittest
+from unittest import mock
+
+from aiohttp import web
+
+from tests import start_server
+from warren_bot import http_client
+from warren_bot import resilience
+
+
+class HttpClientTestCase(unittest.IsolatedAsyncioTestCase):
+    """Test shared HTTP session methods."""
+
+    async def asyncSetUp(self):
+        self.flaky_calls = 0
+
+        async def handler(request):
+            return web.json_response({"symbol": request.query.get("symbol")})
+
+        async def flaky(request):  # pylint: disable=unused-argument
+            self.flaky_calls += 1
+            if self.flaky_calls == 1:
+                return web.Response(status=503)
+            if self.flaky_calls == 2:
+                return web.Response(text="{truncated")
+            return web.json_response({"ok": True})
+
+        async def broken(request):  # pylint: disable=unused-argument
+            return web.Response(text="<html>not json</html>")
+
+        app = web.Application()
+        app.router.add_get("/query", handler)
+        app.router.add_get("/flaky", flaky)
+        app.router.add_get("/broken", broken)
+        self.runner, self.base = await start_server(app)
+        self.url = f"{self.base}/query"
+        patches = [
+            mock.patch.object(resilience, "BREAKERS", {}),
+            mock.patch.object(resilience, "backoff_delay", return_value=0),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    async def asyncTearDown(self):
+        await http_client.close_session()
+        await self.runner.cleanup()
+
+    async def test_get_json(self):
+        """Test JSON round trip through the shared session."""
+        # WHEN
+        status, body = await http_client.get_json(self.url, params={"symbol": "IBM"})
+
+        # THEN
+        self.assertEqual(status, 200)
+        self.assertEqual(body, {"symbol": "IBM"})
+
+    async def test_session_is_reused(self):
+        """Test the pooled session is shared between requests."""
+        # WHEN
+        first = await http_client.get_session()
+        await http_client.get_json(self.url)
+        second = await http_client.get_session()
+
+        # THEN
+        self.assertIs(first, second)
+        await http_client.close_session()
+        self.assertTrue(first.closed)
+
+    async def test_retries_5xx_and_malformed_json(self):
+        """Test a 503 and a truncated body are retried until a good answer arrives."""
+        # WHEN
+        status, body = await http_client.get_json(f"{self.base}/flaky")
+
+        # THEN
+        self.assertEqual((status, body), (200, {"ok": True}))
+        self.assertEqual(self.flaky_calls, 3)
+
+    async def test_failing_host_opens_circuit(self):
+        """Test a host that keeps failing is no longer called."""
+        # GIVEN
+        with self.assertRaises(json.JSONDecodeError):
+            await http_client.get_json(f"{self.base}/broken")
+
+        # WHEN
+        with self.assertRaises(resilience.CircuitOpenError):
+            await http_client.get_json(f"{self.base}/broken")
+
+        # THEN
+        with self.assertRaises(resilience.CircuitOpenError):
+            await http_client.get_json(self.url)  # same host
+
+
+if __name__ == "__main__":
+    unittest.main()
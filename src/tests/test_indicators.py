@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+# pylint: disable=C0116, W0511
+"""Unit testing module for the indicators module."""
+import json
+import unittest
+
+import pandas as pd
+
+from warren_bot import alphavantage as alpha
+from warren_bot import indicators
+
+
+class IndicatorsTestCase(unittest.TestCase):
+    """Test on-demand indicators."""
+
+    def setUp(self):
+        with open("./src/tests/IBM.monthly_adjusted.json", encoding="utf-8") as file:
+            self.prices = alpha.process_alphavantage_company_prices(json.load(file))
+        self.cache = indicators.IndicatorCache()
+
+    def test_window_matches_full_history(self):
+        """Test an indicator limited to a window equals the full history computation."""
+        # GIVEN
+        start = self.prices.index[-30]
+
+        # WHEN
+        windowed = self.cache.get(self.prices, "sma", start=start, window=50)
+        macd = self.cache.get(self.prices, "macd", start=start)
+
+        # THEN
+        full = self.prices["close"].rolling(50).mean()
+        pd.testing.assert_series_equal(windowed, full[full.index >= start])
+        full_macd = indicators.macd(self.prices["close"])
+        pd.testing.assert_frame_equal(macd, full_macd[full_macd.index >= start], atol=1e-6)
+
+    def test_memoized(self):
+        """Test repeated requests for a covered window reuse the memoized values."""
+        # GIVEN
+        self.cache.get(self.prices, "rsi", start=self.prices.index[-60])
+
+        # WHEN
+        rsi = self.cache.get(self.prices, "rsi", start=self.prices.index[-20])
+        self.cache.get(self.prices, "rsi", start=self.prices.index[-20], window=7)
+        self.cache.get(self.prices.iloc[:-1], "rsi", start=self.prices.index[-20])
+
+        # THEN
+        self.assertEqual(self.cache.hits, 1)
+        self.assertEqual(self.cache.misses, 3)
+        self.assertEqual(len(rsi), 20)
+        self.assertTrue(rsi.between(0, 100).all())
+
+    def test_bollinger_and_unknown(self):
+        """Test Bollinger bands bracket the moving average and unknown indicators are rejected."""
+        # WHEN
+        bands = self.cache.get(self.prices, "bollinger", start=self.prices.index[-12])
+
+        # THEN
+        self.assertEqual(list(bands.columns), ["middle", "upper", "lower"])
+        self.assertTrue((bands["upper"] >= bands["lower"]).all())
+        with self.assertRaises(ValueError):
+            self.cache.get(self.prices, "vwap")
+
+
+if __name__ == "__main__":
+    unittest.main()
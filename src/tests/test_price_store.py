@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+# pylint: disable=C0116, W0511
+"""Unit testing module for the price_store module."""
+import datetime
+import json
+import os
+import tempfile
+import unittest
+
+import pandas as pd
+
+from warren_bot import alphavantage as alpha
+from warren_bot import price_store
+
+
+class PriceStoreTestCase(unittest.TestCase):
+    """Test price_store functions."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        with open("./src/tests/IBM.daily_adjusted.json", encoding="utf-8") as file:
+            self.prices = alpha.process_alphavantage_company_prices(json.load(file))
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_round_trip(self):
+        """Test stored prices load back unchanged."""
+        # WHEN
+        price_store.save_prices("ibm", self.prices, self.tmp_dir.name)
+        loaded = price_store.load_prices("IBM", directory=self.tmp_dir.name)
+
+        # THEN
+        pd.testing.assert_frame_equal(loaded, self.prices.sort_index()[loaded.columns], check_freq=False)
+        self.assertIsNone(price_store.load_prices("MSFT", directory=self.tmp_dir.name))
+
+    def test_partial_read(self):
+        """Test only the requested dates and columns are read."""
+        # GIVEN
+        price_store.save_prices("IBM", self.prices, self.tmp_dir.name)
+        dates = self.prices.index.sort_values()
+        start, end = dates[10], dates[20]
+
+        # WHEN
+        loaded = price_store.load_prices("IBM", start=start, end=end, columns=["close"], directory=self.tmp_dir.name)
+
+        # THEN
+        self.assertEqual(list(loaded.columns), ["close", "ticker"])
+        self.assertEqual(len(loaded), 11)
+        self.assertEqual(loaded.index.min(), start)
+        self.assertEqual(loaded.index.max(), end)
+
+    def test_freshness_and_versions(self):
+        """Test a save marks the ticker fresh and replaces the previous version."""
+        # GIVEN
+        price_store.save_prices("IBM", self.prices, self.tmp_dir.name)
+        first_version = price_store.read_metadata("IBM", self.tmp_dir.name)["version"]
+
+        # WHEN
+        price_store.save_prices("IBM", self.prices.iloc[:5], self.tmp_dir.name)
+
+        # THEN
+        meta = price_store.read_metadata("IBM", self.tmp_dir.name)
+        self.assertEqual(meta["rows"], 5)
+        self.assertFalse(os.path.exists(os.path.join(price_store.ticker_dir("IBM", self.tmp_dir.name), first_version)))
+        self.assertTrue(price_store.is_fresh("IBM", self.tmp_dir.name))
+        self.assertFalse(price_store.is_fresh("IBM", self.tmp_dir.name, today=datetime.date(2000, 1, 1)))
+        self.assertFalse(price_store.is_fresh("MSFT", self.tmp_dir.name))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+# pylint: disable=C0116, W0511
+"""Unit testing module for the quota module."""
+import datetime
+import unittest
+
+from warren_bot import quota
+
+MORNING = datetime.datetime(2026, 3, 2, 10, 0)
+EVENING = datetime.datetime(2026, 3, 2, 22, 0)
+
+
+class QuotaPlannerTestCase(unittest.TestCase):
+    """Test QuotaPlanner methods."""
+
+    def setUp(self):
+        self.planner = quota.QuotaPlanner(reserve=0.4, off_peak=(21, 24))
+
+    def test_admit_keeps_reserve(self):
+        """Test batch calls stop at the interactive reserve outside off-peak hours."""
+        # WHEN
+        self.planner.admit(11, 25, quota.BATCH, MORNING)
+        self.planner.admit(1, 25, quota.INTERACTIVE, MORNING)
+        self.planner.admit(1, 25, quota.BATCH, EVENING)
+
+        # THEN
+        with self.assertRaises(quota.ReservedQuotaError):
+            self.planner.admit(10, 25, quota.BATCH, MORNING)
+
+    def test_plan_defers_batch(self):
+        """Test batch work that does not fit now is planned for the off-peak window."""
+        # WHEN
+        fits = self.planner.plan(5, 20, 25, quota.BATCH, MORNING)
+        deferred = self.planner.plan(15, 20, 25, quota.BATCH, MORNING)
+        interactive = self.planner.plan(15, 20, 25, quota.INTERACTIVE, MORNING)
+        unlimited = self.planner.plan(500, None, None, quota.BATCH, MORNING)
+
+        # THEN
+        self.assertEqual(fits, quota.Plan(5, 10, MORNING))
+        self.assertEqual(deferred, quota.Plan(15, 20, datetime.datetime(2026, 3, 2, 21, 0)))
+        self.assertEqual(interactive.start, MORNING)
+        self.assertEqual(unlimited.start, MORNING)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+# pylint: disable=C0116, W0511
+"""Unit testing module for the rate_limit module."""
+import os
+import tempfile
+import unittest
+
+from warren_bot import rate_limit
+
+
+class TokenBucketTestCase(unittest.TestCase):
+    """Test TokenBucket methods."""
+
+    def test_reserve_burst(self):
+        """Test a full bucket hands out its burst without waiting."""
+        # GIVEN
+        bucket = rate_limit.TokenBucket(5, 60)
+
+        # WHEN
+        delays = [bucket.reserve() for _ in range(5)]
+
+        # THEN
+        self.assertEqual(delays, [0.0] * 5)
+
+    def test_reserve_queues_in_order(self):
+        """Test callers past the burst wait one refill interval each."""
+        # GIVEN
+        bucket = rate_limit.TokenBucket(5, 60)
+        for _ in range(5):
+            bucket.reserve()
+
+        # WHEN
+        first = bucket.reserve()
+        second = bucket.reserve()
+
+        # THEN
+        self.assertAlmostEqual(first, 12, delta=0.1)
+        self.assertAlmostEqual(second, 24, delta=0.1)
+
+
+class RateLimiterTestCase(unittest.IsolatedAsyncioTestCase):
+    """Test RateLimiter methods."""
+
+    async def test_daily_budget(self):
+        """Test the daily budget raises once used up."""
+        # GIVEN
+        limiter = rate_limit.RateLimiter(per_minute=10, per_day=2)
+
+        # WHEN
+        await limiter.acquire()
+        await limiter.acquire()
+
+        # THEN
+        self.assertEqual(limiter.remaining_today(), 0)
+        with self.assertRaises(rate_limit.DailyLimitError):
+            await limiter.acquire()
+
+    def test_for_tier(self):
+        """Test key pool is sized from the tier table."""
+        # WHEN
+        pool = rate_limit.KeyPool.for_tier(["a"], "premium_75")
+
+        # THEN
+        self.assertEqual(pool.limiters["a"].per_minute, 75)
+        self.assertIsNone(pool.remaining_today())
+        with self.assertRaises(ValueError):
+            rate_limit.KeyPool.for_tier(["a"], "gold")
+
+
+class KeyPoolTestCase(unittest.IsolatedAsyncioTestCase):
+    """Test KeyPool methods."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.usage_file = os.path.join(self.tmp_dir.name, "key_usage.json")
+
+    async def test_spreads_calls_across_keys(self):
+        """Test each key's per-minute burst is used before any caller waits."""
+        # GIVEN
+        pool = rate_limit.KeyPool(["a", "b", "c"], per_minute=2, per_day=25)
+
+        # WHEN
+        keys = [await pool.acquire() for _ in range(6)]
+
+        # THEN
+        self.assertEqual(sorted(keys), ["a", "a", "b", "b", "c", "c"])
+        self.assertEqual(pool.remaining_today(), 69)
+
+    async def test_skips_exhausted_keys(self):
+        """Test exhausted keys are skipped until none are left."""
+        # GIVEN
+        pool = rate_limit.KeyPool(["a", "b"], per_minute=10, per_day=1)
+        pool.exhaust("a")
+
+        # WHEN
+        key = await pool.acquire()
+
+        # THEN
+        self.assertEqual(key, "b")
+        with self.assertRaises(rate_limit.DailyLimitError):
+            await pool.acquire()
+
+    async def test_no_keys(self):
+        """Test a pool without keys reports a configuration error rather than a spent budget."""
+        # GIVEN
+        pool = rate_limit.KeyPool(per_minute=10, per_day=1)
+
+        # WHEN
+        with self.assertRaises(rate_limit.NoKeysError) as raised:
+            await pool.acquire()
+
+        # THEN
+        self.assertNotIsInstance(raised.exception, rate_limit.DailyLimitError)
+
+    async def test_usage_persists(self):
+        """Test a new pool remembers today's usage without storing the keys."""
+        # GIVEN
+        pool = rate_limit.KeyPool(["a", "b"], per_minute=10, per_day=5, usage_file=self.usage_file)
+        await pool.acquire("a")
+        pool.exhaust("b")
+        batched = os.path.exists(self.usage_file)
+        await pool.flush()
+
+        # WHEN
+        restarted = rate_limit.KeyPool(["a", "b"], per_minute=10, per_day=5, usage_file=self.usage_file)
+
+        # THEN
+        self.assertFalse(batched)
+        self.assertEqual(restarted.usage(), pool.usage())
+        self.assertEqual(restarted.remaining_today(), 4)
+        with open(self.usage_file, encoding="utf-8") as file:
+            self.assertNotIn('"a"', file.read())
+
+
+if __name__ == "__main__":
+    unittest.main()
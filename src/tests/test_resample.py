@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+# pylint: disable=C0116, W0511
+"""Unit testing module for the resample module."""
+import json
+import unittest
+
+import pandas as pd
+
+from warren_bot import alphavantage as alpha
+from warren_bot import resample
+
+
+class ResampleTestCase(unittest.TestCase):
+    """Test period bars built from daily prices."""
+
+    def setUp(self):
+        with open("./src/tests/IBM.daily_adjusted.json", encoding="utf-8") as file:
+            self.daily = alpha.process_alphavantage_company_prices(json.load(file))
+        self.cache = resample.BarCache()
+
+    def test_matches_alphavantage_monthly(self):
+        """Test monthly bars of complete months match Alphavantage's monthly series."""
+        # GIVEN
+        with open("./src/tests/IBM.monthly_adjusted.json", encoding="utf-8") as file:
+            monthly = alpha.process_alphavantage_company_prices(json.load(file))
+
+        # WHEN
+        bars = resample.resample_prices(self.daily, "monthly")
+
+        # THEN
+        complete = bars.index[1:]  # the first month of the compact download is partial
+        columns = ["open", "high", "low", "close", "volume", "dividend_amt"]
+        pd.testing.assert_frame_equal(bars.loc[complete, columns], monthly.loc[complete, columns])
+        self.assertEqual(bars.index[-1], self.daily.index[-1])
+
+    def test_rebuilds_changed_periods(self):
+        """Test new daily bars rebuild only the periods they fall in."""
+        # GIVEN
+        self.cache.get(self.daily.iloc[:-10], "weekly")
+
+        # WHEN
+        bars = self.cache.get(self.daily, "weekly")
+        again = self.cache.get(self.daily, "weekly")
+
+        # THEN
+        self.assertEqual((self.cache.misses, self.cache.partial, self.cache.hits), (1, 1, 1))
+        pd.testing.assert_frame_equal(bars, resample.resample_prices(self.daily, "weekly"))
+        pd.testing.assert_frame_equal(again, bars)
+        with self.assertRaises(ValueError):
+            self.cache.get(self.daily, "hourly")
+
+
+if __name__ == "__main__":
+    unittest.main()
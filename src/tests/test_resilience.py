@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+# pylint: disable=C0116, W0511
+"""Unit testing module for the resilience module."""
+import asyncio
+import time
+import unittest
+from unittest import mock
+
+from warren_bot import resilience
+
+
+class BackoffTestCase(unittest.TestCase):
+    """Test backoff delays."""
+
+    def test_backoff_delay(self):
+        """Test delays stay under a doubling ceiling capped at the maximum."""
+        # WHEN
+        delays = [[resilience.backoff_delay(attempt, base=1, cap=5) for _ in range(50)] for attempt in range(5)]
+
+        # THEN
+        for attempt, ceiling in enumerate([1, 2, 4, 5, 5]):
+            self.assertTrue(all(0 <= delay <= ceiling for delay in delays[attempt]))
+        self.assertGreater(len(set(delays[0])), 1)
+
+
+class CircuitBreakerTestCase(unittest.TestCase):
+    """Test CircuitBreaker methods."""
+
+    def test_opens_and_recovers(self):
+        """Test the circuit opens after repeated failures and closes after a successful trial call."""
+        # GIVEN
+        circuit = resilience.CircuitBreaker(failure_threshold=2, reset_timeout=60)
+        circuit.record_failure()
+        circuit.before_call()
+        circuit.record_failure()
+
+        # WHEN
+        with self.assertRaises(resilience.CircuitOpenError):
+            circuit.before_call()
+        circuit.opened_at -= 60
+        circuit.before_call()  # trial call
+
+        # THEN
+        self.assertEqual(circuit.state, "half-open")
+        with self.assertRaises(resilience.CircuitOpenError):
+            circuit.before_call()  # only one trial at a time
+        circuit.record_success()
+        self.assertEqual(circuit.state, "closed")
+
+
+class CallTestCase(unittest.IsolatedAsyncioTestCase):
+    """Test retried calls."""
+
+    def setUp(self):
+        patch = mock.patch.object(resilience, "BREAKERS", {})
+        patch.start()
+        self.addCleanup(patch.stop)
+
+    async def test_retries_transient_errors(self):
+        """Test transient failures are retried until the call succeeds."""
+        # GIVEN
+        attempt = mock.AsyncMock(side_effect=[resilience.TransientError("503"), asyncio.TimeoutError(), "ok"])
+
+        # WHEN
+        with mock.patch.object(resilience, "backoff_delay", return_value=0):
+            result = await resilience.call("example.com", attempt, deadline=5)
+
+        # THEN
+        self.assertEqual(result, "ok")
+        self.assertEqual(attempt.await_count, 3)
+        self.assertEqual(resilience.breaker("example.com").state, "closed")
+
+    async def test_deadline_bounds_slow_calls(self):
+        """Test a hanging upstream costs the deadline rather than every attempt's timeout."""
+
+        # GIVEN
+        async def hang(timeout):  # pylint: disable=unused-argument
+            await asyncio.sleep(60)
+
+        # WHEN
+        start = time.monotonic()
+        with self.assertRaises(asyncio.TimeoutError):
+            await resilience.call("slow.example.com", hang, deadline=0.3)
+
+        # THEN
+        self.assertLess(time.monotonic() - start, 2)
+
+    async def test_other_errors_not_retried(self):
+        """Test errors that are not transient are raised at once."""
+        # GIVEN
+        attempt = mock.AsyncMock(side_effect=KeyError("symbol"))
+
+        # WHEN
+        with self.assertRaises(KeyError):
+            await resilience.call("example.com", attempt)
+
+        # THEN
+        attempt.assert_awaited_once()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+# pylint: disable=C0116, W0511
+"""Unit testing module for the sec module."""
+import asyncio
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from warren_bot import cache
+from warren_bot import rate_limit
+from warren_bot import sec
+
+
+class SecTestCase(unittest.IsolatedAsyncioTestCase):
+    """Test SEC EDGAR client methods."""
+
+    async def asyncSetUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.get_json = mock.AsyncMock(side_effect=lambda url, headers=None: (200, {"url": url}))
+        patches = [
+            mock.patch.object(sec, "RESPONSE_CACHE", cache.ResponseCache(self.tmp_dir.name)),
+            mock.patch.object(sec, "RATE_LIMITER", rate_limit.TokenBucket(sec.REQUESTS_PER_SECOND, 1)),
+            mock.patch.object(sec.http_client, "get_json", self.get_json),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    async def test_documents_cached(self):
+        """Test submissions are downloaded once, padded to a 10 digit CIK, and identified with a user agent."""
+        # WHEN
+        first = await sec.get_submissions("51143")
+        second = await sec.get_submissions("0000051143")
+
+        # THEN
+        self.assertEqual(first, {"url": "https://data.sec.gov/submissions/CIK0000051143.json"})
+        self.assertEqual(second, first)
+        self.get_json.assert_awaited_once()
+        self.assertIn("user-agent", self.get_json.await_args.kwargs["headers"])
+
+    async def test_fair_access_rate(self):
+        """Test requests past the burst are held to 10 per second."""
+        # WHEN
+        start = time.monotonic()
+        await asyncio.gather(*(sec.get_company_facts(str(cik)) for cik in range(13)))
+
+        # THEN
+        self.assertEqual(self.get_json.await_count, 13)
+        self.assertGreaterEqual(time.monotonic() - start, 0.25)
+
+
+if __name__ == "__main__":
+    unittest.main()
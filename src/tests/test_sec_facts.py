@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+# pylint: disable=C0116, W0511
+"""Unit testing module for the sec_facts module."""
+import unittest
+from unittest import mock
+
+from warren_bot import sec_facts
+
+
+def revenue(fy: int, start: str, end: str, val: float, filed: str, *, form: str = "10-K", fp: str = "FY"):
+    return {"start": start, "end": end, "val": val, "accn": "a", "fy": fy, "fp": fp, "form": form, "filed": filed}
+
+
+def company_facts(*records):
+    return {
+        "cik": 51143,
+        "entityName": "INTERNATIONAL BUSINESS MACHINES CORP",
+        "facts": {
+            "us-gaap": {"Revenues": {"units": {"USD": list(records)}}},
+            "dei": {"EntityCommonStockSharesOutstanding": {"units": {"shares": [{"end": "2023-01-31", "val": 9}]}}},
+        },
+    }
+
+
+def submissions(*filings):
+    return {
+        "name": "INTERNATIONAL BUSINESS MACHINES CORP",
+        "sicDescription": "Computer & Office Equipment",
+        "filings": {"recent": {"form": [form for form, _ in filings], "accessionNumber": [acc for _, acc in filings]}},
+    }
+
+
+FY2021 = revenue(2021, "2021-01-01", "2021-12-31", 57350000000.0, "2022-02-22")
+FY2022 = revenue(2022, "2022-01-01", "2022-12-31", 60530000000.0, "2023-02-28")
+FY2022_PRIOR_YEAR = revenue(2022, "2021-01-01", "2021-12-31", 57350000000.0, "2023-02-28")
+Q1_2023 = revenue(2023, "2023-01-01", "2023-03-31", 14252000000.0, "2023-04-25", form="10-Q", fp="Q1")
+
+
+class FactsIndexTestCase(unittest.IsolatedAsyncioTestCase):
+    """Test FactsIndex methods."""
+
+    def setUp(self):
+        self.index = sec_facts.FactsIndex(":memory:")
+        self.addCleanup(self.index.close)
+
+    def test_latest_annual(self):
+        """Test the latest full fiscal year of a 10-K wins over comparatives and quarters."""
+        # GIVEN
+        self.index.update("51143", company_facts(FY2021, FY2022, FY2022_PRIOR_YEAR, Q1_2023), submissions(), "a-1")
+
+        # WHEN
+        value = self.index.latest_annual("0000051143", sec_facts.REVENUE_CONCEPTS)
+
+        # THEN
+        self.assertEqual(value, 60530000000.0)
+        self.assertIsNone(self.index.latest_annual("51143", ["GrossProfit"]))
+        self.assertEqual(self.index.company("51143")["sic_description"], "Computer & Office Equipment")
+
+    def test_latest_annual_concept_preference(self):
+        """Test the first listed concept wins when several are reported for the same fiscal year."""
+        # GIVEN
+        facts = company_facts(FY2022)
+        later_filed = revenue(2022, "2022-01-01", "2022-12-31", 1.0, "2023-03-15")
+        facts["facts"]["us-gaap"]["SalesRevenueNet"] = {"units": {"USD": [later_filed]}}
+        self.index.update("51143", facts, submissions(), "a-1")
+
+        # WHEN
+        value = self.index.latest_annual("51143", sec_facts.REVENUE_CONCEPTS)
+
+        # THEN
+        self.assertEqual(value, 60530000000.0)
+        self.assertEqual(self.index.latest_annual("51143", ["SalesRevenueNet", "Revenues"]), 1.0)
+
+    def test_update_is_incremental(self):
+        """Test only facts filed on or after the last indexed filing day are written again."""
+        # GIVEN
+        first = self.index.update("51143", company_facts(FY2021), submissions(), "a-1")
+
+        # WHEN
+        second = self.index.update("51143", company_facts(FY2021, FY2022, FY2022_PRIOR_YEAR), submissions(), "a-2")
+
+        # THEN
+        self.assertEqual(first, 2)
+        self.assertEqual(second, 3)  # the undated dei fact is skipped, facts filed on the last indexed day are kept
+        self.assertEqual(self.index.latest_annual("51143", ["Revenues"]), 60530000000.0)
+        self.assertEqual(self.index.company("51143")["last_filed"], "2023-02-28")
+
+    async def test_sync_downloads_only_new_filings(self):
+        """Test company facts are downloaded again only after a new financial filing."""
+        # GIVEN
+        get_submissions = mock.AsyncMock(
+            side_effect=[
+                submissions(("8-K", "a-3"), ("10-K", "a-2")),
+                submissions(("8-K", "a-4"), ("10-K", "a-2")),
+                submissions(("10-Q", "a-5"), ("10-K", "a-2")),
+            ]
+        )
+        get_company_facts = mock.AsyncMock(side_effect=[company_facts(FY2022), company_facts(FY2022, Q1_2023)])
+
+        # WHEN
+        with mock.patch.object(sec_facts.sec, "get_submissions", get_submissions), mock.patch.object(
+            sec_facts.sec, "get_company_facts", get_company_facts
+        ):
+            synced = [await sec_facts.sync_company("51143", self.index) for _ in range(3)]
+
+        # THEN
+        self.assertEqual(synced, [True, False, True])
+        self.assertEqual(get_company_facts.await_args.kwargs["max_age"], 0)
+        self.assertEqual(self.index.company("51143")["last_accession"], "a-5")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,8 +1,18 @@
 # -*- coding: utf-8 -*-
 # pylint: disable=C0116, W0511
 """Test stock_report module for stock analysis."""
+import asyncio
+import io
+import os
+import shutil
+import tempfile
+import time
 import unittest
 import json
+from unittest import mock
+
+import pandas as pd
+
 from warren_bot import alphavantage as alv
 
 # under test
@@ -72,8 +82,9 @@ class StockAnalysisTestCase(unittest.TestCase):
         # THEN
         self.assertIsInstance(msg, str)
         self.assertIsInstance(files, list)
-        for file in files:
-            self.assertIsInstance(file, str)
+        for filename, image in files:
+            self.assertIsInstance(filename, str)
+            self.assertIsInstance(image, io.BytesIO)
 
     def test_cash_position(self):
         """Test cash position printing module."""
@@ -160,8 +171,94 @@ class StockAnalysisTestCase(unittest.TestCase):
         # THEN
         self.assertIsInstance(msg, str)
         self.assertIsInstance(charts, list)
-        for fig in charts:
-            self.assertIsInstance(fig, str)
+        for filename, image in charts:
+            self.assertIsInstance(filename, str)
+            self.assertIsInstance(image, io.BytesIO)
+
+    def test_trend_charts_in_memory(self):
+        """Test trend charts are rendered into JPEG buffers without touching the working directory."""
+        # GIVEN
+        with open("./src/tests/IBM.income_statement.json", encoding="utf-8") as file:
+            income_data = json.load(file)
+        with open("./src/tests/IBM.earnings.json", encoding="utf-8") as file:
+            eps_data = json.load(file)
+        with open("./src/tests/IBM.monthly_adjusted.json", encoding="utf-8") as file:
+            monthly_data = json.load(file)
+        income_statement = alv.process_alphavantage_income_statement(income_data)
+        eps = alv.process_alphavantage_earnings(eps_data)
+        monthly_prices = alv.process_alphavantage_company_prices(monthly_data)
+        workdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, workdir)
+        self.addCleanup(os.chdir, os.getcwd())
+        os.chdir(workdir)
+
+        # WHEN
+        _, charts = stock_analysis.trend(income_statement, eps, monthly_prices)
+
+        # THEN
+        self.assertEqual([name for name, _ in charts], ["eps_fig.jpg", "stock_high_low.jpg"])
+        for _, image in charts:
+            self.assertTrue(image.getvalue().startswith(b"\xff\xd8"))  # JPEG magic number
+        self.assertEqual(os.listdir(workdir), [])
+
+
+class SendChartsTestCase(unittest.IsolatedAsyncioTestCase):
+    """Test uploading rendered charts."""
+
+    async def test_send_charts(self):
+        """Test every chart buffer is uploaded as a named Discord file."""
+        # GIVEN
+        channel = mock.AsyncMock()
+
+        # WHEN
+        await stock_analysis.send_charts(channel, [("a.jpg", io.BytesIO(b"one")), ("b.jpg", io.BytesIO(b"two"))])
+
+        # THEN
+        files = [call.kwargs["file"] for call in channel.send.await_args_list]
+        self.assertEqual([file.filename for file in files], ["a.jpg", "b.jpg"])
+        self.assertEqual(files[1].fp.read(), b"two")
+
+
+class FetchCompanyDataTestCase(unittest.IsolatedAsyncioTestCase):
+    """Test concurrent download of company data sets."""
+
+    async def test_fetch_company_data_is_concurrent(self):
+        """Test data sets download at the same time, statements right after the overview."""
+
+        # GIVEN
+        async def slow_download(ticker, key, latest_quarter=None):  # pylint: disable=unused-argument
+            await asyncio.sleep(0.1)
+            return ticker if latest_quarter is None else (ticker, latest_quarter)
+
+        async def slow_overview(ticker, key):  # pylint: disable=unused-argument
+            await asyncio.sleep(0.1)
+            return pd.Series({"Symbol": ticker, "LatestQuarter": pd.Timestamp("2023-03-31")})
+
+        getters = [
+            "get_alphavantage_income_statement",
+            "get_alphavantage_balance_sheet",
+            "get_alphavantage_earnings",
+            "get_alphavantage_cash_flow",
+            "get_monthly_alphavantage_company_prices",
+            "sync_daily_alphavantage_company_prices",
+        ]
+        patches = [mock.patch.object(alv, name, side_effect=slow_download) for name in getters]
+        patches.append(mock.patch.object(alv, "get_alphavantage_overview", side_effect=slow_overview))
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+        # WHEN
+        start = time.monotonic()
+        tasks = stock_analysis.fetch_company_data("IBM", "demo")
+        results = await asyncio.gather(*tasks.values())
+        elapsed = time.monotonic() - start
+
+        # THEN
+        self.assertEqual(len(tasks), 7)
+        self.assertEqual(results[1:5], [("IBM", pd.Timestamp("2023-03-31"))] * 4)
+        self.assertEqual(results[5:], ["IBM"] * 2)
+        self.assertLess(elapsed, 0.5)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+# pylint: disable=C0116, W0511
+"""Unit testing module for the symbols module."""
+import datetime
+import os
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from warren_bot import resilience
+from warren_bot import symbols
+
+BULK = {
+    "fields": ["cik", "name", "ticker", "exchange"],
+    "data": [
+        [789019, "MICROSOFT CORP", "MSFT", "Nasdaq"],
+        [1067983, "BERKSHIRE HATHAWAY INC", "BRK-B", "NYSE"],
+        [1067983, "BERKSHIRE HATHAWAY INC", "BRK-A", "NYSE"],
+        [1018724, "AMAZON COM INC", "AMZN", "Nasdaq"],
+        [51143, "INTERNATIONAL BUSINESS MACHINES CORP", "IBM", "NYSE"],
+    ],
+}
+
+
+class SymbolIndexTestCase(unittest.TestCase):
+    """Test SymbolIndex methods."""
+
+    def setUp(self):
+        self.index = symbols.SymbolIndex().merge(BULK)
+
+    def test_lookup(self):
+        """Test tickers are found in any case or class separator and misspellings are not."""
+        # WHEN
+        listing = self.index.get("brk.b")
+
+        # THEN
+        self.assertEqual(listing.cik, "1067983")
+        self.assertEqual(listing.status, "active")
+        self.assertIsNone(self.index.get("MSTF"))
+        self.assertEqual(self.index.suggest("MSTF"), ["MSFT"])
+
+    def test_normalize(self):
+        """Test share class dots become dashes while exchange suffixes are kept."""
+        # THEN
+        self.assertEqual(symbols.normalize(" brk.b"), "BRK-B")
+        self.assertEqual(symbols.normalize("tsco.lon"), "TSCO.LON")
+        self.assertFalse(symbols.has_exchange_suffix("BRK.B"))
+        self.assertTrue(symbols.has_exchange_suffix("TSCO.LON"))
+
+    def test_prefix(self):
+        """Test prefix search returns matching tickers in order."""
+        # WHEN
+        found = self.index.prefix("BRK")
+
+        # THEN
+        self.assertEqual([listing.ticker for listing in found], ["BRK-A", "BRK-B"])
+        self.assertEqual(self.index.prefix("ZZ"), [])
+
+    def test_delisted_kept(self):
+        """Test a ticker missing from a newer bulk file is kept as delisted."""
+        # GIVEN
+        newer = dict(BULK, data=[row for row in BULK["data"] if row[2] != "IBM"])
+
+        # WHEN
+        index = self.index.merge(newer, today=datetime.date(2026, 3, 2))
+
+        # THEN
+        self.assertEqual(index.get("IBM").status, "delisted")
+        self.assertEqual(index.get("IBM").delisted, "2026-03-02")
+        self.assertNotIn("IBM", index.suggest("IBN"))
+
+    def test_save_load(self):
+        """Test the index round trips through its file."""
+        # GIVEN
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "symbols.json")
+            self.index.save(path)
+
+            # WHEN
+            loaded = symbols.SymbolIndex.load(path)
+
+        # THEN
+        self.assertEqual(loaded.listings, self.index.listings)
+        self.assertEqual(loaded.updated, self.index.updated)
+
+
+class GetIndexTestCase(unittest.IsolatedAsyncioTestCase):
+    """Test the shared symbol index."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.path = os.path.join(self.tmp_dir.name, "symbols.json")
+        for patch in (mock.patch.object(symbols, "INDEX", None), mock.patch.object(symbols, "LAST_ATTEMPT", 0.0)):
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    async def test_failed_refresh_keeps_saved_index(self):
+        """Test a stale saved index is served while it refreshes and a failed refresh is not retried at once."""
+        # GIVEN
+        saved = symbols.SymbolIndex().merge(BULK)
+        saved.updated = time.time() - 2 * symbols.REFRESH_INTERVAL
+        saved.save(self.path)
+        failing = mock.AsyncMock(side_effect=resilience.CircuitOpenError("down"))
+
+        # WHEN
+        with mock.patch.object(symbols.sec, "get_company_tickers", failing):
+            index = await symbols.get_index(self.path)
+            await symbols.REFRESH_TASK
+            again = await symbols.get_index(self.path)
+
+        # THEN
+        failing.assert_awaited_once()
+        self.assertEqual(index.get("MSFT").cik, "789019")
+        self.assertIs(again, index)
+
+    async def test_first_download_waits(self):
+        """Test an index that was never downloaded waits for SEC."""
+        # GIVEN
+        bulk = mock.AsyncMock(return_value=BULK)
+
+        # WHEN
+        with mock.patch.object(symbols.sec, "get_company_tickers", bulk):
+            index = await symbols.get_index(self.path)
+
+        # THEN
+        self.assertEqual(index.get("IBM").cik, "51143")
+        self.assertTrue(os.path.exists(self.path))
+
+if __name__ == "__main__":
+    unittest.main()
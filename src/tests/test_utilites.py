@@ -1,7 +1,16 @@
 # -*- coding: utf-8 -*-
 # pylint: disable=C0116, W0511
 """Unit testing module for the utilities module."""
+import asyncio
+import copy
+import os
+import tempfile
+import time
 import unittest
+from unittest import mock
+
+import warren_bot
+from warren_bot import symbols
 from warren_bot import utilities as util
 
 
@@ -20,6 +29,32 @@ class UtilitiesTestCase(unittest.TestCase):
         self.assertTrue(len(resp) == 10)
         self.assertEqual(cik, resp)
 
+    def test_process_config_file_keys(self):
+        """Test keys falls back to key when it is blank or left out."""
+        # GIVEN
+        files = {
+            "single": "[alphavantage]\nkey = ONE\ntier = free\n",
+            "blank": "[alphavantage]\nkey = ONE\nkeys =\n",
+            "listed": "[alphavantage]\nkey = ONE\nkeys = TWO, THREE\ntier = premium_75\n",
+        }
+        configs = {}
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            for name, text in files.items():
+                path = os.path.join(tmp_dir, f"{name}.ini")
+                with open(path, "w", encoding="utf-8") as file:
+                    file.write(text)
+                cfg = {**copy.deepcopy(warren_bot.CONFIG), "config_file": path}
+
+                # WHEN
+                configs[name] = util.process_config_file(cfg)["alphavantage"]
+
+        # THEN
+        self.assertEqual(configs["single"]["keys"], ["ONE"])
+        self.assertEqual(configs["blank"]["keys"], ["ONE"])
+        self.assertEqual(configs["blank"]["tier"], "free")
+        self.assertEqual(configs["listed"]["keys"], ["TWO", "THREE"])
+        self.assertEqual(configs["listed"]["tier"], "premium_75")
+
     def test_fix_cik_smaller_str(self):
         """Test fix_cik to ensure proper size."""
         # Given
@@ -43,5 +78,55 @@ class UtilitiesTestCase(unittest.TestCase):
         self.assertEqual(resp, cik)
 
 
+class VerifyClubDataTestCase(unittest.IsolatedAsyncioTestCase):
+    """Test club data verification."""
+
+    async def test_stocks_verified_concurrently(self):
+        """Test missing CIKs, industries and sizes of every stock are looked up at once."""
+
+        # GIVEN
+        async def slow_lookup(cik):  # pylint: disable=unused-argument
+            await asyncio.sleep(0.2)
+            return 20000000000
+
+        stocks = {
+            ticker: {"cik": str(cik), "industry": "", "sector": "", "company_size": ""}
+            for cik, ticker in enumerate(["IBM", "MSFT", "KO", "PEP", "T"], start=1)
+        }
+        stocks["T"].update({"cik": "", "industry": "Telephone", "company_size": "large"})
+        index = symbols.SymbolIndex([symbols.Listing("T", "732717", "AT&T INC.", "NYSE", "active", None)], time.time())
+        data = {"club": {"name": "club", "valuation_dates": ["2023-01-02"], "club_stocks": stocks}}
+
+        # WHEN
+        start = time.monotonic()
+        with mock.patch.object(util, "get_company_industry", side_effect=slow_lookup), mock.patch.object(
+            util, "get_current_sec_10k_revenue", side_effect=slow_lookup
+        ), mock.patch.object(symbols, "INDEX", index):
+            data, changed = await util.verify_club_data(data)
+
+        # THEN
+        self.assertTrue(changed)
+        self.assertLess(time.monotonic() - start, 0.6)
+        self.assertEqual(data["club"]["club_stocks"]["IBM"]["company_size"], "mega")
+        self.assertEqual(data["club"]["club_stocks"]["T"]["company_size"], "large")
+        self.assertEqual(data["club"]["club_stocks"]["T"]["cik"], "732717")
+
+    async def test_company_industry_from_submissions(self):
+        """Test the industry is read from the submissions document without syncing company facts."""
+        # GIVEN
+        get_submissions = mock.AsyncMock(return_value={"sicDescription": "Computer & Office Equipment"})
+        sync_company = mock.AsyncMock()
+
+        # WHEN
+        with mock.patch.object(util.sec, "get_submissions", get_submissions), mock.patch.object(
+            util.sec_facts, "sync_company", sync_company
+        ):
+            industry = await util.get_company_industry("0000051143")
+
+        # THEN
+        self.assertEqual(industry, "Computer & Office Equipment")
+        sync_company.assert_not_awaited()
+
+
 if __name__ == "__main__":
     unittest.main()
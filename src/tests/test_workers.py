@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+# pylint: disable=C0116, W0511
+"""Unit testing module for the worker pool module."""
+import os
+import unittest
+from unittest import mock
+
+# under test
+from warren_bot import workers
+
+
+class WorkersTestCase(unittest.IsolatedAsyncioTestCase):
+    """Test running CPU-bound jobs off the event loop."""
+
+    def tearDown(self):
+        workers.shutdown()
+
+    async def test_run_in_worker_process(self):
+        """Test a job runs in another process and its result is handed back."""
+        # GIVEN
+        with mock.patch.object(workers, "MAX_WORKERS", 1):
+            # WHEN
+            pid = await workers.run(os.getpid)
+            total = await workers.run(sum, [1, 2, 3], start=4)
+
+        # THEN
+        self.assertNotEqual(pid, os.getpid())
+        self.assertEqual(total, 10)
+
+    async def test_run_reuses_pool(self):
+        """Test jobs share one pool until it is shut down."""
+        # GIVEN
+        with mock.patch.object(workers, "MAX_WORKERS", 1):
+            first = await workers.run(os.getpid)
+
+            # WHEN
+            second = await workers.run(os.getpid)
+            workers.shutdown()
+            restarted = await workers.run(os.getpid)
+
+        # THEN
+        self.assertEqual(first, second)
+        self.assertNotEqual(first, restarted)
+
+    async def test_run_without_workers(self):
+        """Test jobs run on a thread of this process when workers are turned off."""
+        # GIVEN
+        with mock.patch.object(workers, "MAX_WORKERS", 0):
+            # WHEN
+            pid = await workers.run(os.getpid)
+
+        # THEN
+        self.assertEqual(pid, os.getpid())
+        self.assertIsNone(workers._POOL)  # pylint: disable=protected-access
+
+
+if __name__ == "__main__":
+    unittest.main()
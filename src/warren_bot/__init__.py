@@ -27,7 +27,7 @@ CONFIG = {
         "discord_app_id": "",
         "discord_public_key": "",
     },
-    "alphavantage": {"key": ""},
+    "alphavantage": {"key": "", "keys": [], "tier": "free"},
 }
 
 
@@ -1,23 +1,34 @@
 # -*- coding: utf-8 -*-
 # pylint: disable=C0116, W0511
 """Discord chatbot entrypoint."""
-import configparser
+import asyncio
+import copy
+import datetime
 import logging
 import re
 
 import discord
 
+from . import CONFIG
+from . import alphavantage
+from . import http_client
 from . import portfolio_analysis
+from . import quota
 from . import stock_analysis
+from . import symbols
+from . import utilities
+from . import workers
 
 
-config = configparser.ConfigParser()
-config.read("./bot_config.ini")
+config = utilities.process_config_file({**copy.deepcopy(CONFIG), "config_file": "./bot_config.ini"})
 TOKEN = config["discord"]["token"]
-KEY = config["alphavantage"]["key"]
+KEYS = config["alphavantage"]["keys"]
+KEY = KEYS[0] if KEYS else None
+alphavantage.set_api_keys(KEYS, config["alphavantage"]["tier"])
 LOGGER = logging.getLogger("discord")
 
 DEBUG = False
+DEFERRED_REPORTS = set()  # club reports waiting for off-peak hours, referenced so they are not garbage collected
 
 COMMANDS_HELP = {
     "!stock_report": "!stock_report <ticker> will return club worksheet calculations of the "
@@ -33,11 +44,23 @@ HELP_INFO = (
     "technologies."
 )
 
+
+class WarrenClient(discord.Client):
+    """Discord client that owns the lifetime of the shared HTTP connection pool and report workers."""
+
+    async def close(self):
+        """Release pooled data provider connections and report workers, and save key usage, before disconnecting."""
+        await http_client.close_session()
+        await alphavantage.KEY_POOL.flush()
+        await asyncio.to_thread(workers.shutdown)
+        await super().close()
+
+
 # Build and initialize discord Client
 intents = discord.Intents.default()
 intents.guild_messages = True
 intents.messages = True
-CLIENT = discord.Client(intents=intents)
+CLIENT = WarrenClient(intents=intents)
 
 
 def divide_prompt_and_content(content: str):
@@ -80,6 +103,23 @@ async def run_stock_report(message):
     except IndexError:
         await message.reply("!stock_report requires a ticker symbol.")
         return
+    index = await symbols.get_index()
+    listing = index.get(ticker)
+    if index and listing is None and not symbols.has_exchange_suffix(ticker):
+        suggestions = index.suggest(ticker)
+        hint = f" Did you mean {' or '.join(suggestions)}?" if suggestions else ""
+        await message.reply(f"{ticker} is not a listed ticker symbol.{hint}")
+        return
+    if listing is not None and listing.status == "delisted":
+        await message.reply(f"{ticker} ({listing.name}) was delisted on {listing.delisted}.")
+        return
+    plan = alphavantage.plan_calls(await asyncio.to_thread(alphavantage.estimate_calls, [ticker]), quota.INTERACTIVE)
+    if plan.cost > plan.available:
+        await message.reply(
+            f"{ticker} needs {plan.cost} Alphavantage calls but only {plan.available} are left today, "
+            "try again tomorrow."
+        )
+        return
     await message.add_reaction("⏳")
     try:
         await stock_analysis.run(message, ticker, KEY)
@@ -94,14 +134,31 @@ async def run_stock_report(message):
         raise e
 
 
-async def run_club_report(message):
+async def run_club_report(message, planned=False):
     """Build and deliver club report.
 
+    Refreshing prices is batch work: when it does not fit in the quota left outside the stock report reserve the
+    report is deferred to off-peak hours.
+
+    :param message: Discord Message
+    :param planned: <bool> True when the report already waited for its planned start
     :return:
     """
+    plan = alphavantage.plan_calls(portfolio_analysis.refresh_cost("./cyic_stocks.csv"), quota.BATCH)
+    if not planned and plan.start > datetime.datetime.now():
+        await message.reply(
+            f"🕒 Refreshing club prices needs {plan.cost} Alphavantage calls, more than can be spared while stock "
+            f"reports may need them. The club report will run at {plan.start:%H:%M}."
+        )
+        deferred = asyncio.create_task(defer_club_report(message, plan.start))
+        DEFERRED_REPORTS.add(deferred)
+        deferred.add_done_callback(DEFERRED_REPORTS.discard)
+        return
     await message.add_reaction("⏳")
     try:
-        await portfolio_analysis.run("./cyic_stocks.csv", "./club_info.json", key=KEY)
+        failed = await portfolio_analysis.run("./cyic_stocks.csv", "./club_info.json", key=KEY)
+        if failed:
+            await message.reply("\n⚠️ Prices could not be refreshed for: {}".format(", ".join(sorted(failed))))
         try:
             await message.clear_reaction("⏳")
         except discord.errors.Forbidden:
@@ -114,6 +171,16 @@ async def run_club_report(message):
         raise e
 
 
+async def defer_club_report(message, start: datetime.datetime):
+    """Wait until a planned start time and then build and deliver the club report.
+
+    :param message: Discord Message
+    :param start: <datetime.datetime> when to run the report
+    """
+    await asyncio.sleep(max((start - datetime.datetime.now()).total_seconds(), 0))
+    await run_club_report(message, planned=True)
+
+
 async def run_report_bug(message):
     """A method to log and track bug reports from users.
 
@@ -184,7 +251,12 @@ async def on_message(message):
 
 
 async def main():
-    await portfolio_analysis.run("./cyic_stocks.csv", "./club_info.json", KEY)
+    try:
+        await portfolio_analysis.run("./cyic_stocks.csv", "./club_info.json", KEY)
+    finally:
+        await http_client.close_session()
+        await alphavantage.KEY_POOL.flush()
+        workers.shutdown()
 
 
 def run():
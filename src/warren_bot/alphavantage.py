@@ -1,15 +1,307 @@
 # -*- coding: utf-8 -*-
 # pylint: disable=C0116, W0511
 """Module to get and process Alphavantage information into Pandas data structures."""
-from asyncio import sleep
+import logging
+import math
+import os
+from asyncio import gather, to_thread
 
 import numpy as np
 import pandas as pd
-from pandas._libs.tslibs.parsing import DateParseError  # pylint: disable=E0611
-import requests
+from pandas.tseries.offsets import BDay
+
+from warren_bot import cache
+from warren_bot import capture
+from warren_bot import compact
+from warren_bot import http_client
+from warren_bot import price_store
+from warren_bot import quota
+from warren_bot import rate_limit
+from warren_bot import resample
+
+LOGGER = logging.getLogger(__name__)
+
+# Overridable to point at a stand-in server, see alphavantage_stub
+ALPHAVANTAGE_URL = os.getenv("ALPHAVANTAGE_URL", "https://www.alphavantage.co/query")
+KEY_USAGE_FILE = os.path.join(cache.CACHE_DIR, "key_usage.json")
+KEY_POOL = rate_limit.KeyPool.for_tier([], "free", usage_file=KEY_USAGE_FILE)
+QUOTA_PLANNER = quota.QuotaPlanner()
+RESPONSE_CACHE = cache.ResponseCache(os.path.join(cache.CACHE_DIR, "alphavantage"))
+IN_FLIGHT = quota.PriorityFlight()
+PRICE_SYNCS = quota.PriorityFlight()
+COMPACT_BARS = 100  # trading days returned by outputsize=compact
+# Indicator columns saved with price histories before indicators were computed on demand, see indicators
+LEGACY_INDICATOR_COLUMNS = ["SMA20", "SMA50", "SMA200", "log_return"]
+# Alphavantage TIME_SERIES bar fields and the price column they are stored as
+PRICE_FIELDS = {
+    "1. open": "open",
+    "2. high": "high",
+    "3. low": "low",
+    "4. close": "close",
+    "5. adjusted close": "adj_close",
+    "6. volume": "volume",
+    "7. dividend amount": "dividend_amt",
+    "8. split coefficient": "split coefficient",
+}
+# Quarterly report list of each financial statement payload
+STATEMENT_QUARTERS = {
+    "INCOME_STATEMENT": "quarterlyReports",
+    "BALANCE_SHEET": "quarterlyReports",
+    "CASH_FLOW": "quarterlyReports",
+    "EARNINGS": "quarterlyEarnings",
+}
+# Functions a stock report downloads besides the daily prices
+STOCK_REPORT_FUNCTIONS = ["OVERVIEW", "INCOME_STATEMENT", "BALANCE_SHEET", "CASH_FLOW", "EARNINGS"]
+# outputsize the overview and statements are downloaded with, the response cache is keyed on it
+FUNDAMENTALS_OUTPUTSIZE = "full"
+STATEMENT_RECHECK = 24 * 60 * 60  # seconds before a statement behind the latest filed quarter is downloaded again
+# Seconds each Alphavantage function's payload stays fresh in the response cache
+CACHE_TTLS = {
+    "OVERVIEW": 24 * 60 * 60,
+    "INCOME_STATEMENT": 7 * 24 * 60 * 60,
+    "BALANCE_SHEET": 7 * 24 * 60 * 60,
+    "CASH_FLOW": 7 * 24 * 60 * 60,
+    "EARNINGS": 7 * 24 * 60 * 60,
+    "TIME_SERIES_DAILY_ADJUSTED": 6 * 60 * 60,
+    "TIME_SERIES_WEEKLY_ADJUSTED": 24 * 60 * 60,
+    "TIME_SERIES_MONTHLY_ADJUSTED": 24 * 60 * 60,
+}
+
+
+# Field schemas for the Alphavantage reports. Numeric fields are converted in one bulk pass, date fields are parsed
+# as datetimes and text fields are kept as is. Anything else in a payload is logged as an unknown field.
+INCOME_STATEMENT_SCHEMA = {
+    "dates": ["fiscalDateEnding"],
+    "text": ["reportedCurrency"],
+    "numeric": [
+        "grossProfit",
+        "totalRevenue",
+        "costOfRevenue",
+        "costofGoodsAndServicesSold",
+        "operatingIncome",
+        "sellingGeneralAndAdministrative",
+        "researchAndDevelopment",
+        "operatingExpenses",
+        "investmentIncomeNet",
+        "netInterestIncome",
+        "interestIncome",
+        "interestExpense",
+        "nonInterestIncome",
+        "otherNonOperatingIncome",
+        "depreciation",
+        "depreciationAndAmortization",
+        "incomeBeforeTax",
+        "incomeTaxExpense",
+        "interestAndDebtExpense",
+        "netIncomeFromContinuingOperations",
+        "comprehensiveIncomeNetOfTax",
+        "ebit",
+        "ebitda",
+        "netIncome",
+    ],
+}
+BALANCE_SHEET_SCHEMA = {
+    "dates": ["fiscalDateEnding"],
+    "text": ["reportedCurrency"],
+    "numeric": [
+        "totalAssets",
+        "totalCurrentAssets",
+        "cashAndCashEquivalentsAtCarryingValue",
+        "cashAndShortTermInvestments",
+        "inventory",
+        "currentNetReceivables",
+        "totalNonCurrentAssets",
+        "propertyPlantEquipment",
+        "accumulatedDepreciationAmortizationPPE",
+        "intangibleAssets",
+        "intangibleAssetsExcludingGoodwill",
+        "goodwill",
+        "investments",
+        "longTermInvestments",
+        "shortTermInvestments",
+        "otherCurrentAssets",
+        "otherNonCurrentAssets",
+        "totalLiabilities",
+        "totalCurrentLiabilities",
+        "currentAccountsPayable",
+        "deferredRevenue",
+        "currentDebt",
+        "shortTermDebt",
+        "totalNonCurrentLiabilities",
+        "capitalLeaseObligations",
+        "longTermDebt",
+        "currentLongTermDebt",
+        "longTermDebtNoncurrent",
+        "shortLongTermDebtTotal",
+        "otherCurrentLiabilities",
+        "otherNonCurrentLiabilities",
+        "totalShareholderEquity",
+        "treasuryStock",
+        "retainedEarnings",
+        "commonStock",
+        "commonStockSharesOutstanding",
+    ],
+}
+CASH_FLOW_SCHEMA = {
+    "dates": ["fiscalDateEnding"],
+    "text": ["reportedCurrency"],
+    "numeric": [
+        "operatingCashflow",
+        "paymentsForOperatingActivities",
+        "proceedsFromOperatingActivities",
+        "changeInOperatingLiabilities",
+        "changeInOperatingAssets",
+        "depreciationDepletionAndAmortization",
+        "capitalExpenditures",
+        "changeInReceivables",
+        "changeInInventory",
+        "profitLoss",
+        "cashflowFromInvestment",
+        "cashflowFromFinancing",
+        "proceedsFromRepaymentsOfShortTermDebt",
+        "paymentsForRepurchaseOfCommonStock",
+        "paymentsForRepurchaseOfEquity",
+        "paymentsForRepurchaseOfPreferredStock",
+        "dividendPayout",
+        "dividendPayoutCommonStock",
+        "dividendPayoutPreferredStock",
+        "proceedsFromIssuanceOfCommonStock",
+        "proceedsFromIssuanceOfLongTermDebtAndCapitalSecuritiesNet",
+        "proceedsFromIssuanceOfPreferredStock",
+        "proceedsFromRepurchaseOfEquity",
+        "proceedsFromSaleOfTreasuryStock",
+        "changeInCashAndCashEquivalents",
+        "changeInExchangeRate",
+        "netIncome",
+    ],
+}
+ANNUAL_EARNINGS_SCHEMA = {
+    "dates": ["fiscalDateEnding"],
+    "text": [],
+    "numeric": ["reportedEPS"],
+}
+QUARTERLY_EARNINGS_SCHEMA = {
+    "dates": ["fiscalDateEnding", "reportedDate"],
+    "text": [],
+    "numeric": ["reportedEPS", "estimatedEPS", "surprise", "surprisePercentage"],
+}
+OVERVIEW_SCHEMA = {
+    "dates": ["LatestQuarter", "DividendDate", "ExDividendDate"],
+    "text": [
+        "Symbol",
+        "AssetType",
+        "Name",
+        "Description",
+        "Exchange",
+        "Currency",
+        "Country",
+        "Sector",
+        "Industry",
+        "Address",
+        "FiscalYearEnd",
+    ],
+    "numeric": [
+        "CIK",
+        "MarketCapitalization",
+        "EBITDA",
+        "PERatio",
+        "PEGRatio",
+        "BookValue",
+        "DividendPerShare",
+        "DividendYield",
+        "EPS",
+        "RevenuePerShareTTM",
+        "ProfitMargin",
+        "OperatingMarginTTM",
+        "ReturnOnAssetsTTM",
+        "ReturnOnEquityTTM",
+        "RevenueTTM",
+        "GrossProfitTTM",
+        "DilutedEPSTTM",
+        "QuarterlyEarningsGrowthYOY",
+        "QuarterlyRevenueGrowthYOY",
+        "AnalystTargetPrice",
+        "TrailingPE",
+        "ForwardPE",
+        "PriceToSalesRatioTTM",
+        "PriceToBookRatio",
+        "EVToRevenue",
+        "EVToEBITDA",
+        "Beta",
+        "52WeekHigh",
+        "52WeekLow",
+        "50DayMovingAverage",
+        "200DayMovingAverage",
+        "SharesOutstanding",
+    ],
+}
+
+
+def check_schema_fields(fields, schema: dict, report: str):
+    """Log payload fields a report schema does not know about.
+
+    :param fields: iterable of field names in the payload
+    :param schema: <dict> report schema
+    :param report: <str> report name for the log message
+    :return: <list> of unknown field names
+    """
+    known = set(schema["dates"]) | set(schema["text"]) | set(schema["numeric"])
+    unknown = [field for field in fields if field not in known]
+    if unknown:
+        LOGGER.warning("Unknown %s fields: %s", report, unknown)
+    return unknown
+
+
+def coerce_numeric(values: np.ndarray):
+    """Convert a block of Alphavantage strings to floats in one vectorized pass.
+
+    "None" and other non-numeric strings become NaN.
+
+    :param values: <numpy.ndarray> object array of numeric strings
+    :return: <numpy.ndarray> float64 array of the same shape
+    """
+    flat = pd.to_numeric(values.ravel(), errors="coerce")
+    return np.asarray(flat, dtype="float64").reshape(values.shape)
+
+
+def process_report_frame(records: list, schema: dict, report: str):
+    """Build a typed, date indexed DataFrame from a list of Alphavantage report records.
 
+    :param records: <list> of report dicts (ex. data["annualReports"])
+    :param schema: <dict> report schema
+    :param report: <str> report name for log messages
+    :return: pandas.DataFrame indexed by fiscalDateEnding
+    """
+    frame = pd.DataFrame(records)
+    check_schema_fields(frame.columns, schema, report)
+    index = pd.DatetimeIndex(pd.to_datetime(frame["fiscalDateEnding"]), name="fiscalDateEnding")
+    numeric = [field for field in schema["numeric"] if field in frame.columns]
+    columns = {}
+    for field in frame.columns:
+        if field == "fiscalDateEnding":
+            continue
+        if field in schema["dates"]:
+            columns[field] = pd.to_datetime(frame[field], errors="coerce").to_numpy()
+        elif field not in numeric:
+            columns[field] = frame[field].to_numpy()
+    converted = pd.DataFrame(coerce_numeric(frame[numeric].to_numpy(dtype=object)), index=index, columns=numeric)
+    result = pd.concat([pd.DataFrame(columns, index=index), converted], axis=1)
+    return compact.compact_frame(result[[field for field in frame.columns if field != "fiscalDateEnding"]])
+
+
+def set_api_keys(keys: list, tier: str = "free"):
+    """Replace the shared Alphavantage key pool with the configured keys.
+
+    :param keys: <list> of Alphavantage API keys, calls are spread across all of them
+    :param tier: <str> key of rate_limit.ALPHAVANTAGE_TIERS (ex. free, premium_75) the keys share
+    """
+    global KEY_POOL  # pylint: disable=global-statement
+    KEY_POOL = rate_limit.KeyPool.for_tier(keys, tier, usage_file=KEY_USAGE_FILE)
 
-async def get_alphavantage_data(function: str, symbol: str, key: str, outputsize: str = "compact"):
+
+async def get_alphavantage_data(
+    function: str, symbol: str, key: str, outputsize: str = "compact", max_age: float = None
+):
     """Make https API call to Alphavantage.
 
     https://www.alphavantage.co/documentation
@@ -18,23 +310,148 @@ async def get_alphavantage_data(function: str, symbol: str, key: str, outputsize
                      TIME_SERIES_MONTHLY_ADJUSTED, TIME_SERIES_WEEKLY_ADJUSTED,
                      TIME_SERIES_DAILY_ADJUSTED, EARNINGS)
     :param symbol: (str) Company stock ticker
-    :param key: (str) Alphavantage api key
+    :param key: (str) Alphavantage api key, the call may be made with another key of KEY_POOL
     :param outputsize: (str) alphavantage passed variable
+    :param max_age: (float) seconds a cached payload is accepted for, defaults to the function's CACHE_TTLS
     :return: <dict> json of alphavantage data
     """
     function = str.upper(function)
-    url = "https://www.alphavantage.co/query?function={funct}&symbol={symbol}&apikey={key}&outputsize={outputsize}".format(  # pylint: disable=C0301
-        funct=function, key=key, symbol=symbol, outputsize=outputsize
+    request = cache_key(function, symbol, outputsize)
+    # Identical requests already on the wire share that download instead of spending another call, a request that
+    # accepts a different cache age may be answered differently so it does not join
+    return await capture.CAPTURE.call(
+        "alphavantage",
+        request,
+        IN_FLIGHT.do,
+        (*request, max_age),
+        _fetch_alphavantage_data,
+        function,
+        symbol,
+        key,
+        outputsize,
+        max_age,
     )
-    resp = requests.get(url, timeout=30).json()
-    if resp.get("Note") is not None:
-        await sleep(60)
-        resp = requests.get(url, timeout=30).json()
-    elif resp.get("Information") is not None:
-        raise ConnectionError("Daily Alphavantage API Limit Reached!")
+
+
+def cache_key(function: str, symbol: str, outputsize: str):
+    """Build the response cache key of an Alphavantage request.
+
+    :param function: <str> Alphavantage function
+    :param symbol: <str> Company stock ticker
+    :param outputsize: <str> compact or full
+    :return: <tuple>
+    """
+    return str.upper(function), str.upper(symbol), outputsize
+
+
+async def _fetch_alphavantage_data(function: str, symbol: str, key: str, outputsize: str, max_age: float = None):
+    request = cache_key(function, symbol, outputsize)
+    ttl = CACHE_TTLS.get(function) if max_age is None else max_age
+    if ttl is not None:
+        resp = await to_thread(RESPONSE_CACHE.get, request, ttl)
+        if resp is not None:
+            return resp
+    throttled = False
+    while True:
+        if key is not None:
+            KEY_POOL.add(key)
+        QUOTA_PLANNER.admit(KEY_POOL.remaining_today(), KEY_POOL.daily_budget())
+        api_key = await KEY_POOL.acquire()
+        params = {"function": function, "symbol": symbol, "apikey": api_key, "outputsize": outputsize}
+        # KEY_POOL paces calls to each key's per-minute rate, http_client caps open connections to the host
+        _, resp = await http_client.get_json(ALPHAVANTAGE_URL, params=params)
+        if resp.get("Note") is not None and not throttled:
+            # Key is also used elsewhere, back off until its next slot opens and retry
+            KEY_POOL.drain(api_key)
+            throttled = True
+        elif resp.get("Information") is not None:
+            # Key's daily budget is spent, retry with the next key until the pool raises DailyLimitError
+            KEY_POOL.exhaust(api_key)
+        else:
+            break
+    if ttl is not None and is_valid_response(resp):
+        await to_thread(RESPONSE_CACHE.set, request, resp)
     return resp
 
 
+def estimate_calls(tickers: list, functions: list = None, prices: bool = True):
+    """Estimate the Alphavantage calls downloading data for tickers will spend.
+
+    Payloads still fresh in the response cache are free. Statements are checked like get_alphavantage_statement
+    checks them, against the LatestQuarter of the cached overview, so a statement kept past its TTL because no newer
+    quarter was filed is free too. Cached payloads are read, run it off the event loop.
+
+    :param tickers: <list> of ticker symbols
+    :param functions: <list> of Alphavantage functions per ticker, defaults to STOCK_REPORT_FUNCTIONS
+    :param prices: <bool> include the daily price sync
+    :return: <int> number of calls
+    """
+    functions = STOCK_REPORT_FUNCTIONS if functions is None else functions
+    ttl = CACHE_TTLS["TIME_SERIES_DAILY_ADJUSTED"]
+    calls = 0
+    for ticker in {str.upper(ticker) for ticker in tickers}:
+        latest_quarter = cached_latest_quarter(ticker) if set(functions) & set(STATEMENT_QUARTERS) else None
+        calls += sum(not is_cached(function, ticker, latest_quarter) for function in functions)
+        if prices and not any(
+            RESPONSE_CACHE.is_fresh(cache_key("TIME_SERIES_DAILY_ADJUSTED", ticker, size), ttl)
+            for size in ("compact", "full")
+        ):
+            calls += 1
+    return calls
+
+
+def cached_latest_quarter(ticker: str):
+    """Read the last quarter a company filed from its cached overview, whatever its age.
+
+    :param ticker: <str> Company ticker symbol
+    :return: <pandas.Timestamp> LatestQuarter, None if no overview is cached or it has none
+    """
+    overview = RESPONSE_CACHE.get(cache_key("OVERVIEW", ticker, FUNDAMENTALS_OUTPUTSIZE))
+    if overview is None:
+        return None
+    latest_quarter = pd.to_datetime(overview.get("LatestQuarter"), errors="coerce")
+    return None if pd.isna(latest_quarter) else latest_quarter
+
+
+def is_cached(function: str, ticker: str, latest_quarter=None):
+    """Check a fundamentals payload would be answered from the response cache.
+
+    :param function: <str> Alphavantage function of STOCK_REPORT_FUNCTIONS
+    :param ticker: <str> Company ticker symbol
+    :param latest_quarter: optional last quarter the company filed, see get_alphavantage_statement
+    :return: <bool>
+    """
+    request = cache_key(function, ticker, FUNDAMENTALS_OUTPUTSIZE)
+    if function not in STATEMENT_QUARTERS or latest_quarter is None:
+        return RESPONSE_CACHE.is_fresh(request, CACHE_TTLS[function])
+    data = RESPONSE_CACHE.get(request)
+    if data is None:
+        return False
+    reported = latest_reported_quarter(data, function)
+    if reported is not None and reported >= pd.Timestamp(latest_quarter):
+        return True
+    return RESPONSE_CACHE.is_fresh(request, STATEMENT_RECHECK)
+
+
+def plan_calls(cost: int, name: str = quota.INTERACTIVE):
+    """Plan when work spending a number of Alphavantage calls should run.
+
+    :param cost: <int> calls the work needs, see estimate_calls
+    :param name: <str> quota.INTERACTIVE or quota.BATCH
+    :return: <quota.Plan>
+    """
+    return QUOTA_PLANNER.plan(cost, KEY_POOL.remaining_today(), KEY_POOL.daily_budget(), name)
+
+
+def is_valid_response(resp: dict):
+    """Check an Alphavantage response holds data rather than a throttle or error message.
+
+    :param resp: <dict> json of alphavantage data
+    :return: <bool> True if the response can be cached
+    """
+    return bool(resp) and not {"Note", "Information", "Error Message"} & resp.keys()
+
+
 def process_alphavantage_annual_company_info(income_statement, balance_sheet):
     """Get company fundamentals.
 
@@ -122,7 +539,46 @@ def process_alphavantage_annual_company_info(income_statement, balance_sheet):
     return company_data
 
 
-async def get_alphavantage_income_statement(ticker: str, key: str):
+async def get_alphavantage_statement(function: str, ticker: str, key: str, latest_quarter=None):
+    """Get a financial statement payload, downloading it again only once a new quarter has been filed.
+
+    Statements only change after a filing. When the company's latest filed quarter is known (ex. the OVERVIEW
+    LatestQuarter), a cached statement that already reports that quarter is used however old it is. A cached
+    statement behind that quarter is refreshed, at most once per STATEMENT_RECHECK seconds since Alphavantage can
+    publish the OVERVIEW before the statements.
+
+    :param function: <str> INCOME_STATEMENT, BALANCE_SHEET, CASH_FLOW or EARNINGS
+    :param ticker: <str> Company ticker symbol
+    :param key: <str> Alphavantage API Key
+    :param latest_quarter: optional last quarter the company filed, None falls back to the CACHE_TTLS expiry
+    :return: <dict> json of alphavantage data
+    """
+    if latest_quarter is None or pd.isna(latest_quarter):
+        return await get_alphavantage_data(function, ticker, key, outputsize=FUNDAMENTALS_OUTPUTSIZE)
+    data = await get_alphavantage_data(function, ticker, key, outputsize=FUNDAMENTALS_OUTPUTSIZE, max_age=math.inf)
+    reported = latest_reported_quarter(data, function)
+    if reported is not None and reported >= pd.Timestamp(latest_quarter):
+        return data
+    LOGGER.debug("%s %s reports through %s, %s has been filed", ticker, function, reported, latest_quarter)
+    return await get_alphavantage_data(
+        function, ticker, key, outputsize=FUNDAMENTALS_OUTPUTSIZE, max_age=STATEMENT_RECHECK
+    )
+
+
+def latest_reported_quarter(data: dict, function: str):
+    """Find the last fiscal quarter a statement payload reports.
+
+    :param data: <dict> json of an alphavantage statement
+    :param function: <str> INCOME_STATEMENT, BALANCE_SHEET, CASH_FLOW or EARNINGS
+    :return: <pandas.Timestamp> latest quarterly fiscalDateEnding, None if there is none
+    """
+    dates = pd.to_datetime(
+        [report.get("fiscalDateEnding") for report in data.get(STATEMENT_QUARTERS[function], [])], errors="coerce"
+    )
+    return None if dates.isna().all() else dates.max()
+
+
+async def get_alphavantage_income_statement(ticker: str, key: str, latest_quarter=None):
     """Wrapper to await http get and process income statement from alphavantage.
 
     The download and the processing of alphavantage steps is broken apart for unittesting without
@@ -130,9 +586,10 @@ async def get_alphavantage_income_statement(ticker: str, key: str):
 
     :param ticker: <str> Company ticker symbol
     :param key: <str> Alphavantage API Key
+    :param latest_quarter: optional last quarter the company filed, see get_alphavantage_statement
     :return income_statement: Pandas.DataFrame of processed income statement data
     """
-    data = await get_alphavantage_data("INCOME_STATEMENT", ticker, key, outputsize="full")
+    data = await get_alphavantage_statement("INCOME_STATEMENT", ticker, key, latest_quarter)
     return process_alphavantage_income_statement(data)
 
 
@@ -147,42 +604,13 @@ def process_alphavantage_income_statement(data: dict):
     """
     ret_income = {"annualReports": None, "quarterlyReports": None}
     for time in ["annualReports", "quarterlyReports"]:
-        income = pd.DataFrame(data[time])
-        income.set_index("fiscalDateEnding", inplace=True)
-        income = income.reindex()
-        income.index = pd.to_datetime(income.index)
+        income = process_report_frame(data[time], INCOME_STATEMENT_SCHEMA, "income statement")
         income.sort_index(ascending=False, inplace=True)
-        income["grossProfit"] = pd.to_numeric(income["grossProfit"], "coerce")
-        income["totalRevenue"] = pd.to_numeric(income["totalRevenue"], "coerce")
-        income["costOfRevenue"] = pd.to_numeric(income["costOfRevenue"], "coerce")
-        income["costofGoodsAndServicesSold"] = pd.to_numeric(income["costofGoodsAndServicesSold"], "coerce")
-        income["operatingIncome"] = pd.to_numeric(income["operatingIncome"], "coerce")
-        income["sellingGeneralAndAdministrative"] = pd.to_numeric(income["sellingGeneralAndAdministrative"], "coerce")
-        income["researchAndDevelopment"] = pd.to_numeric(income["researchAndDevelopment"], "coerce")
-        income["operatingExpenses"] = pd.to_numeric(income["operatingExpenses"], "coerce")
-        income["investmentIncomeNet"] = pd.to_numeric(income["investmentIncomeNet"], "coerce")
-        income["netInterestIncome"] = pd.to_numeric(income["netInterestIncome"], "coerce")
-        income["interestIncome"] = pd.to_numeric(income["interestIncome"], "coerce")
-        income["interestExpense"] = pd.to_numeric(income["interestExpense"], "coerce")
-        income["nonInterestIncome"] = pd.to_numeric(income["nonInterestIncome"], "coerce")
-        income["otherNonOperatingIncome"] = pd.to_numeric(income["otherNonOperatingIncome"], "coerce")
-        income["depreciation"] = pd.to_numeric(income["depreciation"], "coerce")
-        income["depreciationAndAmortization"] = pd.to_numeric(income["depreciationAndAmortization"], "coerce")
-        income["incomeBeforeTax"] = pd.to_numeric(income["incomeBeforeTax"], "coerce")
-        income["incomeTaxExpense"] = pd.to_numeric(income["incomeTaxExpense"], "coerce")
-        income["interestAndDebtExpense"] = pd.to_numeric(income["interestAndDebtExpense"], "coerce")
-        income["netIncomeFromContinuingOperations"] = pd.to_numeric(
-            income["netIncomeFromContinuingOperations"], "coerce"
-        )
-        income["comprehensiveIncomeNetOfTax"] = pd.to_numeric(income["comprehensiveIncomeNetOfTax"], "coerce")
-        income["ebit"] = pd.to_numeric(income["ebit"], "coerce")
-        income["ebitda"] = pd.to_numeric(income["ebitda"], "coerce")
-        income["netIncome"] = pd.to_numeric(income["netIncome"], "coerce")
         ret_income[time] = income
     return ret_income
 
 
-async def get_alphavantage_earnings(ticker: str, key: str):
+async def get_alphavantage_earnings(ticker: str, key: str, latest_quarter=None):
     """Wrapper to await http get and process earnings statement from Alphavantage.
 
     The download and the processing of alphavantage steps is broken apart for unittesting without
@@ -190,9 +618,10 @@ async def get_alphavantage_earnings(ticker: str, key: str):
 
     :param ticker: <str> Company ticker symbol
     :param key: <str> Alphavantage API Key
+    :param latest_quarter: optional last quarter the company filed, see get_alphavantage_statement
     :return income_statement: Pandas.DataFrame of processed Earnings statement data
     """
-    data = await get_alphavantage_data("EARNINGS", ticker, key, outputsize="full")
+    data = await get_alphavantage_statement("EARNINGS", ticker, key, latest_quarter)
     return process_alphavantage_earnings(data)
 
 
@@ -212,23 +641,15 @@ def process_alphavantage_earnings(data: dict):
     :return: pandas.DataFrame of annual and quarterly earnings report info
     """
     ret_eps = {"annualEarnings": None, "quarterlyEarnings": None}
+    schemas = {"quarterlyEarnings": QUARTERLY_EARNINGS_SCHEMA, "annualEarnings": ANNUAL_EARNINGS_SCHEMA}
     for time in ["quarterlyEarnings", "annualEarnings"]:
-        eps = pd.DataFrame(data[time])
-        eps.set_index("fiscalDateEnding", inplace=True)
+        eps = process_report_frame(data[time], schemas[time], "earnings")
         eps.sort_index(ascending=True, inplace=True)
-        eps = eps.reindex()
-        eps.index = pd.to_datetime(eps.index)
-        eps["reportedEPS"] = pd.to_numeric(eps["reportedEPS"], "coerce")
-        if time == "quarterlyEarnings":
-            eps["reportedDate"] = pd.to_datetime(eps["reportedDate"])
-            eps["estimatedEPS"] = pd.to_numeric(eps["estimatedEPS"], "coerce")
-            eps["surprise"] = pd.to_numeric(eps["surprise"], "coerce")
-            eps["surprisePercentage"] = pd.to_numeric(eps["surprisePercentage"], "coerce")
         ret_eps[time] = eps
     return ret_eps
 
 
-async def get_alphavantage_cash_flow(ticker: str, key: str):
+async def get_alphavantage_cash_flow(ticker: str, key: str, latest_quarter=None):
     """Wrapper to await http get and process cash flow statement from Alphavantage.
 
     The download and the processing of alphavantage steps is broken apart for unittesting without
@@ -236,9 +657,10 @@ async def get_alphavantage_cash_flow(ticker: str, key: str):
 
     :param ticker: <str> Company ticker symbol
     :param key: <str> Alphavantage API Key
+    :param latest_quarter: optional last quarter the company filed, see get_alphavantage_statement
     :return cash_flow: Pandas.DataFrame of processed cash flow statement data
     """
-    data = await get_alphavantage_data("CASH_FLOW", ticker, key, outputsize="full")
+    data = await get_alphavantage_statement("CASH_FLOW", ticker, key, latest_quarter)
     return process_alphavantage_cash_flow(data)
 
 
@@ -254,54 +676,13 @@ def process_alphavantage_cash_flow(data: dict):
     ret_cash = {"annualReports": None, "quarterlyReports": None}
 
     for time in ["annualReports", "quarterlyReports"]:
-        cash = pd.DataFrame(data[time])
-        cash.set_index("fiscalDateEnding", inplace=True)
-        cash = cash.reindex()
-        cash.index = pd.to_datetime(cash.index)
+        cash = process_report_frame(data[time], CASH_FLOW_SCHEMA, "cash flow")
         cash.sort_index(ascending=True, inplace=True)
-        cash["operatingCashflow"] = pd.to_numeric(cash["operatingCashflow"], "coerce")
-        cash["paymentsForOperatingActivities"] = pd.to_numeric(cash["paymentsForOperatingActivities"], "coerce")
-        cash["proceedsFromOperatingActivities"] = pd.to_numeric(cash["proceedsFromOperatingActivities"], "coerce")
-        cash["changeInOperatingLiabilities"] = pd.to_numeric(cash["changeInOperatingLiabilities"], "coerce")
-        cash["changeInOperatingAssets"] = pd.to_numeric(cash["changeInOperatingAssets"], "coerce")
-        cash["depreciationDepletionAndAmortization"] = pd.to_numeric(
-            cash["depreciationDepletionAndAmortization"], "coerce"
-        )
-        cash["capitalExpenditures"] = pd.to_numeric(cash["capitalExpenditures"], "coerce")
-        cash["changeInReceivables"] = pd.to_numeric(cash["changeInReceivables"], "coerce")
-        cash["changeInInventory"] = pd.to_numeric(cash["changeInInventory"], "coerce")
-        cash["profitLoss"] = pd.to_numeric(cash["profitLoss"], "coerce")
-        cash["cashflowFromInvestment"] = pd.to_numeric(cash["cashflowFromInvestment"], "coerce")
-        cash["cashflowFromFinancing"] = pd.to_numeric(cash["cashflowFromFinancing"], "coerce")
-        cash["proceedsFromRepaymentsOfShortTermDebt"] = pd.to_numeric(
-            cash["proceedsFromRepaymentsOfShortTermDebt"], "coerce"
-        )
-        cash["paymentsForRepurchaseOfCommonStock"] = pd.to_numeric(cash["paymentsForRepurchaseOfCommonStock"], "coerce")
-        cash["paymentsForRepurchaseOfEquity"] = pd.to_numeric(cash["paymentsForRepurchaseOfEquity"], "coerce")
-        cash["paymentsForRepurchaseOfPreferredStock"] = pd.to_numeric(
-            cash["paymentsForRepurchaseOfPreferredStock"], "coerce"
-        )
-        cash["dividendPayout"] = pd.to_numeric(cash["dividendPayout"], "coerce")
-        cash["dividendPayoutCommonStock"] = pd.to_numeric(cash["dividendPayoutCommonStock"], "coerce")
-        cash["dividendPayoutPreferredStock"] = pd.to_numeric(cash["dividendPayoutPreferredStock"], "coerce")
-        cash["proceedsFromIssuanceOfCommonStock"] = pd.to_numeric(cash["proceedsFromIssuanceOfCommonStock"], "coerce")
-        cash["proceedsFromIssuanceOfLongTermDebtAndCapitalSecuritiesNet"] = pd.to_numeric(
-            cash["proceedsFromIssuanceOfLongTermDebtAndCapitalSecuritiesNet"],
-            "coerce",
-        )
-        cash["proceedsFromIssuanceOfPreferredStock"] = pd.to_numeric(
-            cash["proceedsFromIssuanceOfPreferredStock"], "coerce"
-        )
-        cash["proceedsFromRepurchaseOfEquity"] = pd.to_numeric(cash["proceedsFromRepurchaseOfEquity"], "coerce")
-        cash["proceedsFromSaleOfTreasuryStock"] = pd.to_numeric(cash["proceedsFromSaleOfTreasuryStock"], "coerce")
-        cash["changeInCashAndCashEquivalents"] = pd.to_numeric(cash["changeInCashAndCashEquivalents"], "coerce")
-        cash["changeInExchangeRate"] = pd.to_numeric(cash["changeInExchangeRate"], "coerce")
-        cash["netIncome"] = pd.to_numeric(cash["netIncome"], "coerce")
         ret_cash[time] = cash
     return ret_cash
 
 
-async def get_alphavantage_balance_sheet(ticker: str, key: str):
+async def get_alphavantage_balance_sheet(ticker: str, key: str, latest_quarter=None):
     """Wrapper to await http get and process balance sheet from Alphavantage.
 
     The download and the processing of alphavantage steps is broken apart for unittesting without
@@ -309,9 +690,10 @@ async def get_alphavantage_balance_sheet(ticker: str, key: str):
 
     :param ticker: <str> Company ticker symbol
     :param key: <str> Alphavantage API Key
+    :param latest_quarter: optional last quarter the company filed, see get_alphavantage_statement
     :return cash_flow: Pandas.DataFrame of processed balance sheet statement data
     """
-    data = await get_alphavantage_data("BALANCE_SHEET", ticker, key, outputsize="full")
+    data = await get_alphavantage_statement("BALANCE_SHEET", ticker, key, latest_quarter)
     return process_alphavantage_balance_sheet(data)
 
 
@@ -326,52 +708,8 @@ def process_alphavantage_balance_sheet(data: dict):
     """
     ret_bal = {"annualReports": None, "quarterlyReports": None}
     for time in ["annualReports", "quarterlyReports"]:
-        bal = pd.DataFrame(data[time])
-        bal.set_index("fiscalDateEnding", inplace=True)
-        bal = bal.reindex()
-        bal.index = pd.to_datetime(bal.index)
+        bal = process_report_frame(data[time], BALANCE_SHEET_SCHEMA, "balance sheet")
         bal.sort_index(ascending=True, inplace=True)
-        bal["reportedCurrency"] = pd.to_numeric(bal["reportedCurrency"], "coerce")
-        bal["totalAssets"] = pd.to_numeric(bal["totalAssets"], "coerce")
-        bal["totalCurrentAssets"] = pd.to_numeric(bal["totalCurrentAssets"], "coerce")
-        bal["cashAndCashEquivalentsAtCarryingValue"] = pd.to_numeric(
-            bal["cashAndCashEquivalentsAtCarryingValue"], "coerce"
-        )
-        bal["cashAndShortTermInvestments"] = pd.to_numeric(bal["cashAndShortTermInvestments"], "coerce")
-        bal["inventory"] = pd.to_numeric(bal["inventory"], "coerce")
-        bal["currentNetReceivables"] = pd.to_numeric(bal["currentNetReceivables"], "coerce")
-        bal["totalNonCurrentAssets"] = pd.to_numeric(bal["totalNonCurrentAssets"], "coerce")
-        bal["propertyPlantEquipment"] = pd.to_numeric(bal["propertyPlantEquipment"], "coerce")
-        bal["accumulatedDepreciationAmortizationPPE"] = pd.to_numeric(
-            bal["accumulatedDepreciationAmortizationPPE"], "coerce"
-        )
-        bal["intangibleAssets"] = pd.to_numeric(bal["intangibleAssets"], "coerce")
-        bal["intangibleAssetsExcludingGoodwill"] = pd.to_numeric(bal["intangibleAssetsExcludingGoodwill"], "coerce")
-        bal["goodwill"] = pd.to_numeric(bal["goodwill"], "coerce")
-        bal["investments"] = pd.to_numeric(bal["investments"], "coerce")
-        bal["longTermInvestments"] = pd.to_numeric(bal["longTermInvestments"], "coerce")
-        bal["shortTermInvestments"] = pd.to_numeric(bal["shortTermInvestments"], "coerce")
-        bal["otherCurrentAssets"] = pd.to_numeric(bal["otherCurrentAssets"], "coerce")
-        bal["otherNonCurrentAssets"] = pd.to_numeric(bal["otherNonCurrentAssets"], "coerce")
-        bal["totalLiabilities"] = pd.to_numeric(bal["totalLiabilities"], "coerce")
-        bal["totalCurrentLiabilities"] = pd.to_numeric(bal["totalCurrentLiabilities"], "coerce")
-        bal["currentAccountsPayable"] = pd.to_numeric(bal["currentAccountsPayable"], "coerce")
-        bal["deferredRevenue"] = pd.to_numeric(bal["deferredRevenue"], "coerce")
-        bal["currentDebt"] = pd.to_numeric(bal["currentDebt"], "coerce")
-        bal["shortTermDebt"] = pd.to_numeric(bal["shortTermDebt"], "coerce")
-        bal["totalNonCurrentLiabilities"] = pd.to_numeric(bal["totalNonCurrentLiabilities"], "coerce")
-        bal["capitalLeaseObligations"] = pd.to_numeric(bal["capitalLeaseObligations"], "coerce")
-        bal["longTermDebt"] = pd.to_numeric(bal["longTermDebt"], "coerce")
-        bal["currentLongTermDebt"] = pd.to_numeric(bal["currentLongTermDebt"], "coerce")
-        bal["longTermDebtNoncurrent"] = pd.to_numeric(bal["longTermDebtNoncurrent"], "coerce")
-        bal["shortLongTermDebtTotal"] = pd.to_numeric(bal["shortLongTermDebtTotal"], "coerce")
-        bal["otherCurrentLiabilities"] = pd.to_numeric(bal["otherCurrentLiabilities"], "coerce")
-        bal["otherNonCurrentLiabilities"] = pd.to_numeric(bal["otherNonCurrentLiabilities"], "coerce")
-        bal["totalShareholderEquity"] = pd.to_numeric(bal["totalShareholderEquity"], "coerce")
-        bal["treasuryStock"] = pd.to_numeric(bal["treasuryStock"], "coerce")
-        bal["retainedEarnings"] = pd.to_numeric(bal["retainedEarnings"], "coerce")
-        bal["commonStock"] = pd.to_numeric(bal["commonStock"], "coerce")
-        bal["commonStockSharesOutstanding"] = pd.to_numeric(bal["commonStockSharesOutstanding"], "coerce")
         ret_bal[time] = bal
     return ret_bal
 
@@ -386,7 +724,7 @@ async def get_alphavantage_overview(ticker: str, key: str):
     :param key: <str> Alphavantage API Key
     :return cash_flow: Pandas.DataFrame of processed company overview data
     """
-    data = await get_alphavantage_data("OVERVIEW", ticker, key, outputsize="full")
+    data = await get_alphavantage_data("OVERVIEW", ticker, key, outputsize=FUNDAMENTALS_OUTPUTSIZE)
     return process_alphavantage_overview(data)
 
 
@@ -398,46 +736,13 @@ def process_alphavantage_overview(data: dict):
     :param data: <dict> pre-downloaded JSON data from Alphavantage
     :return: pandas.DataFrame of company overview report info
     """
-    view = pd.Series(data)
-    view["CIK"] = pd.to_numeric(view["CIK"], "coerce")
-    view["LatestQuarter"] = pd.to_datetime(view["LatestQuarter"])
-    view["MarketCapitalization"] = pd.to_numeric(view["MarketCapitalization"], "coerce")
-    view["EBITDA"] = pd.to_numeric(view["EBITDA"], "coerce")
-    view["PERatio"] = pd.to_numeric(view["PERatio"], "coerce")
-    view["PEGRatio"] = pd.to_numeric(view["PEGRatio"], "coerce")
-    view["BookValue"] = pd.to_numeric(view["BookValue"], "coerce")
-    view["DividendPerShare"] = pd.to_numeric(view["DividendPerShare"], "coerce")
-    view["DividendYield"] = pd.to_numeric(view["DividendYield"], "coerce")
-    view["EPS"] = pd.to_numeric(view["EPS"], "coerce")
-    view["RevenuePerShareTTM"] = pd.to_numeric(view["RevenuePerShareTTM"], "coerce")
-    view["ProfitMargin"] = pd.to_numeric(view["ProfitMargin"], "coerce")
-    view["OperatingMarginTTM"] = pd.to_numeric(view["OperatingMarginTTM"], "coerce")
-    view["ReturnOnAssetsTTM"] = pd.to_numeric(view["ReturnOnAssetsTTM"], "coerce")
-    view["ReturnOnEquityTTM"] = pd.to_numeric(view["ReturnOnEquityTTM"], "coerce")
-    view["RevenueTTM"] = pd.to_numeric(view["RevenueTTM"], "coerce")
-    view["GrossProfitTTM"] = pd.to_numeric(view["GrossProfitTTM"], "coerce")
-    view["DilutedEPSTTM"] = pd.to_numeric(view["DilutedEPSTTM"], "coerce")
-    view["QuarterlyEarningsGrowthYOY"] = pd.to_numeric(view["QuarterlyEarningsGrowthYOY"], "coerce")
-    view["QuarterlyRevenueGrowthYOY"] = pd.to_numeric(view["QuarterlyRevenueGrowthYOY"], "coerce")
-    view["AnalystTargetPrice"] = pd.to_numeric(view["AnalystTargetPrice"], "coerce")
-    view["TrailingPE"] = pd.to_numeric(view["TrailingPE"], "coerce")
-    view["ForwardPE"] = pd.to_numeric(view["ForwardPE"], "coerce")
-    view["PriceToSalesRatioTTM"] = pd.to_numeric(view["PriceToSalesRatioTTM"], "coerce")
-    view["PriceToBookRatio"] = pd.to_numeric(view["PriceToBookRatio"], "coerce")
-    view["EVToRevenue"] = pd.to_numeric(view["EVToRevenue"], "coerce")
-    view["EVToEBITDA"] = pd.to_numeric(view["EVToEBITDA"], "coerce")
-    view["Beta"] = pd.to_numeric(view["Beta"], "coerce")
-    view["52WeekHigh"] = pd.to_numeric(view["52WeekHigh"], "coerce")
-    view["52WeekLow"] = pd.to_numeric(view["52WeekLow"], "coerce")
-    view["50DayMovingAverage"] = pd.to_numeric(view["50DayMovingAverage"], "coerce")
-    view["200DayMovingAverage"] = pd.to_numeric(view["200DayMovingAverage"], "coerce")
-    view["SharesOutstanding"] = pd.to_numeric(view["SharesOutstanding"], "coerce")
-    try:
-        view["DividendDate"] = pd.to_datetime(view["DividendDate"])
-        view["ExDividendDate"] = pd.to_datetime(view["ExDividendDate"])
-    except DateParseError:
-        view["DividendDate"] = np.nan
-        view["ExDividendDate"] = np.nan
+    check_schema_fields(data.keys(), OVERVIEW_SCHEMA, "overview")
+    view = pd.Series(data, dtype=object)
+    numeric = [field for field in OVERVIEW_SCHEMA["numeric"] if field in view.index]
+    view[numeric] = coerce_numeric(view[numeric].to_numpy(dtype=object))
+    for field in OVERVIEW_SCHEMA["dates"]:
+        if field in view.index:
+            view[field] = pd.to_datetime(view[field], errors="coerce")
     return view
 
 
@@ -455,32 +760,78 @@ async def get_daily_alphavantage_company_prices(ticker: str, key: str):
     return process_alphavantage_company_prices(data)
 
 
+async def sync_daily_alphavantage_company_prices(ticker: str, key: str):
+    """Bring a ticker's stored daily price history up to date and return it.
+
+    Only the last ``COMPACT_BARS`` bars are downloaded when the stored history overlaps them, and the new rows are
+    merged in. A full history is pulled when nothing is stored, the gap is wider than a compact download, or a new
+    split or dividend changes the adjusted close of older bars. Concurrent syncs of the same ticker share one run,
+    each caller gets its own copy of the prices to sort or extend.
+
+    :param ticker: <str> Company ticker symbol
+    :param key: <str> Alphavantage API Key
+    :return: Pandas.DataFrame of processed company stock price data
+    """
+    prices = await PRICE_SYNCS.do(str.upper(ticker), _sync_daily_prices, ticker, key)
+    return prices.copy()
+
+
+async def _sync_daily_prices(ticker: str, key: str):
+    stored = await to_thread(price_store.load_prices, ticker)
+    if stored is None or stored.empty or stored.index.max() < pd.Timestamp.today().normalize() - BDay(COMPACT_BARS):
+        prices = await get_daily_alphavantage_company_prices(ticker, key)
+    else:
+        data = await get_alphavantage_data("TIME_SERIES_DAILY_ADJUSTED", ticker, key, outputsize="compact")
+        recent = process_alphavantage_company_prices(data)
+        prices = merge_daily_prices(stored, recent)
+        if prices is None:
+            LOGGER.info("Refreshing full daily history for %s", ticker)
+            prices = await get_daily_alphavantage_company_prices(ticker, key)
+    await to_thread(price_store.save_prices, ticker, prices)
+    return prices
+
+
+def merge_daily_prices(stored: pd.DataFrame, recent: pd.DataFrame):
+    """Append recently downloaded daily bars to a stored price history.
+
+    :param stored: <pandas.DataFrame> stored daily price history
+    :param recent: <pandas.DataFrame> latest compact download
+    :return: <pandas.DataFrame> merged history, None if the history must be downloaded again in full
+    """
+    last_stored = stored.index.max()
+    if recent.index.min() > last_stored:
+        return None  # gap between the stored history and the new bars
+    new_rows = recent[recent.index > last_stored]
+    if (new_rows["split coefficient"].fillna(1) != 1).any() or (new_rows["dividend_amt"].fillna(0) != 0).any():
+        return None  # adjusted closes of the stored bars are out of date
+    prices = pd.concat([stored[stored.index < recent.index.min()], recent])
+    return compact.compact_frame(prices.drop(columns=LEGACY_INDICATOR_COLUMNS, errors="ignore"), compact.PRICE_DTYPES)
+
+
 async def get_weekly_alphavantage_company_prices(ticker: str, key: str):
-    """Wrapper to await http get and process company stock price data from Alphavantage.
+    """Get weekly company stock prices built from the stored daily history.
 
-    The download and the processing of alphavantage steps is broken apart for unittesting without
-    having to download constantly.
+    Bars are aggregated from the daily sync rather than spending a TIME_SERIES_WEEKLY_ADJUSTED call.
 
     :param ticker: <str> Company ticker symbol
     :param key: <str> Alphavantage API Key
-    :return cash_flow: Pandas.DataFrame of processed company stock price data
+    :return: Pandas.DataFrame of weekly company stock prices
     """
-    data = await get_alphavantage_data("TIME_SERIES_WEEKLY_ADJUSTED", ticker, key, outputsize="full")
-    return process_alphavantage_company_prices(data)
+    daily = await sync_daily_alphavantage_company_prices(ticker, key)
+    return resample.period_bars(daily, "weekly")
 
 
 async def get_monthly_alphavantage_company_prices(ticker: str, key: str):
-    """Wrapper to await http get and process company stock price data from Alphavantage.
+    """Get monthly company stock prices built from the stored daily history.
 
-    The download and the processing of alphavantage steps is broken apart for unittesting without
-    having to download constantly.
+    Bars are aggregated from the daily sync rather than spending a TIME_SERIES_MONTHLY_ADJUSTED call.
 
     :param ticker: <str> Company ticker symbol
     :param key: <str> Alphavantage API Key
-    :return cash_flow: Pandas.DataFrame of processed company stock price data
+    :return: Pandas.DataFrame of monthly company stock prices
     """
-    data = await get_alphavantage_data("TIME_SERIES_MONTHLY_ADJUSTED", ticker, key, outputsize="full")
-    return process_alphavantage_company_prices(data)
+    daily = await sync_daily_alphavantage_company_prices(ticker, key)
+    return resample.period_bars(daily, "monthly")
 
 
 def process_alphavantage_company_prices(data):
@@ -500,52 +851,44 @@ def process_alphavantage_company_prices(data):
     else:
         raise KeyError
 
-    prices = pd.DataFrame(data[pivot]).T
-    prices = prices.rename(
-        columns={
-            "1. open": "open",
-            "2. high": "high",
-            "3. low": "low",
-            "4. close": "close",
-            "5. adjusted close": "adj_close",
-            "6. volume": "volume",
-            "7. dividend amount": "dividend_amt",
-            "8. split coefficient": "split coefficient",
-        }
+    series = data[pivot]
+    # Walk the time series once into a float table, missing fields (ex. split coefficient on monthly series) are NaN
+    table = np.array(
+        [[quote.get(field, "nan") for field in PRICE_FIELDS] for quote in series.values()], dtype="float64"
     )
-    prices.index.name = "date"
-    prices.index = pd.to_datetime(prices.index)
-    prices = prices.reindex()
-    prices.sort_index(ascending=True, inplace=True)
-    prices["open"] = pd.to_numeric(prices["open"])
-    prices["high"] = pd.to_numeric(prices["high"])
-    prices["low"] = pd.to_numeric(prices["low"])
-    prices["close"] = pd.to_numeric(prices["close"])
-    prices["adj_close"] = pd.to_numeric(prices["adj_close"])
-    prices["volume"] = pd.to_numeric(prices["volume"])
-    prices["dividend_amt"] = pd.to_numeric(prices["dividend_amt"])
-    prices["ticker"] = data["Meta Data"]["2. Symbol"]
-    prices["SMA20"] = prices["close"].rolling(20).mean()
-    prices["SMA50"] = prices["close"].rolling(50).mean()
-    prices["SMA200"] = prices["close"].rolling(200).mean()
-    prices["log_return"] = np.log(prices["close"]) - np.log(prices["close"].shift(1))
-    try:
-        prices["split coefficient"] = pd.to_numeric(prices["split coefficient"], errors="coerce")
-    except KeyError:
-        prices["split coefficient"] = None
-    return prices
+    table = table.reshape(len(series), len(PRICE_FIELDS))
+    dates = np.array(list(series.keys()), dtype="datetime64[ns]")
+    order = np.argsort(dates, kind="stable")
+    columns = {name: table[order, i] for i, name in enumerate(PRICE_FIELDS.values())}
+    columns["volume"] = columns["volume"].astype("int64")
+    prices = pd.DataFrame(columns, index=pd.DatetimeIndex(dates[order], name="date"))
+    prices["ticker"] = pd.Categorical([data["Meta Data"]["2. Symbol"]] * len(prices))
+    return compact.compact_frame(prices, compact.PRICE_DTYPES)
 
 
 async def download_stocks(stocks: list, key: str):
     """Download a collection of stocks from Alphavantage.
 
+    Tickers are synced into the price store concurrently, the shared rate limiter paces the calls. A ticker that
+    fails is reported back instead of aborting the rest of the batch.
+
     :param stocks: <list> a list of stocks to lookup
     :param key: Alphavantage API key
-    :return:
+    :return: (<pandas.DataFrame> of daily prices of the downloaded tickers, <dict> of failed tickers to their error)
     """
-    prices = pd.DataFrame()
-    for ticker in stocks["ticker"].unique().tolist():
-        tmp_stock = await get_daily_alphavantage_company_prices(ticker, key)
-        prices = pd.concat([tmp_stock, prices])
-    prices.to_pickle("stocks.pkl")
-    return prices
+    tickers = stocks["ticker"].unique().tolist()
+    results = await gather(
+        *(sync_daily_alphavantage_company_prices(ticker, key) for ticker in tickers), return_exceptions=True
+    )
+    frames = []
+    failed = {}
+    for ticker, result in zip(tickers, results):
+        if isinstance(result, Exception):
+            LOGGER.warning("Failed to download %s prices: %r", ticker, result)
+            failed[ticker] = result
+        elif isinstance(result, BaseException):
+            raise result
+        else:
+            frames.append(result)
+    prices = pd.concat(frames).astype({"ticker": "category"}) if frames else pd.DataFrame()
+    return prices, failed
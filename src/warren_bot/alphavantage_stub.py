@@ -0,0 +1,293 @@
+# -*- coding: utf-8 -*-
+# pylint: disable=C0116, W0511
+"""Offline stand-in for the Alphavantage ``/query`` API.
+
+Serves recorded payloads from a fixtures folder, falling back to synthetic ones for any other symbol, so report
+workloads can be run and load tested end to end without network access. Latency, per-minute ``Note`` throttling
+and per-day ``Information`` quota errors can be switched on to mimic the real service.
+
+Recorded payloads follow the naming of the unit test fixtures, ``<SYMBOL>.<report>.json`` (ex. IBM.earnings.json).
+Point the bot at the stand-in with the ``ALPHAVANTAGE_URL`` environment variable::
+
+    python -m warren_bot.alphavantage_stub --port 8765 --latency 0.2 --per-minute 5
+    WARREN_CACHE_DIR=./cache-stub ALPHAVANTAGE_URL=http://127.0.0.1:8765/query python -m warren_bot
+"""
+import argparse
+import asyncio
+import collections
+import datetime
+import json
+import logging
+import os
+import random
+import time
+import zlib
+
+import numpy as np
+import pandas as pd
+from aiohttp import web
+
+LOGGER = logging.getLogger(__name__)
+
+FIXTURES_DIR = "./src/tests"
+TEMPLATE_SYMBOL = "IBM"
+# Report files recorded under the fixtures folder, by Alphavantage function
+REPORT_FILES = {
+    "OVERVIEW": "company_overview",
+    "INCOME_STATEMENT": "income_statement",
+    "BALANCE_SHEET": "balance_sheet",
+    "CASH_FLOW": "cash_flow",
+    "EARNINGS": "earnings",
+    "TIME_SERIES_DAILY_ADJUSTED": "daily_adjusted",
+    "TIME_SERIES_WEEKLY_ADJUSTED": "weekly_adjusted",
+    "TIME_SERIES_MONTHLY_ADJUSTED": "monthly_adjusted",
+}
+SERIES_KEYS = {
+    "TIME_SERIES_DAILY_ADJUSTED": "Time Series (Daily)",
+    "TIME_SERIES_WEEKLY_ADJUSTED": "Weekly Adjusted Time Series",
+    "TIME_SERIES_MONTHLY_ADJUSTED": "Monthly Adjusted Time Series",
+}
+COMPACT_BARS = 100
+SYNTHETIC_START = "2000-01-03"  # first bar of every synthetic daily series
+
+NOTE_MESSAGE = (
+    "Thank you for using Alpha Vantage! Our standard API call frequency is {} calls per minute. Please visit "
+    "https://www.alphavantage.co/premium/ if you would like to target a higher API call frequency."
+)
+INFORMATION_MESSAGE = (
+    "Thank you for using Alpha Vantage! Our standard API rate limit is {} requests per day. Please subscribe to any "
+    "of the premium plans at https://www.alphavantage.co/premium/ to instantly remove all daily rate limits."
+)
+ERROR_MESSAGE = (
+    "Invalid API call. Please retry or visit the documentation (https://www.alphavantage.co/documentation/) for {}."
+)
+
+
+def synthetic_daily_prices(symbol: str, today=None):
+    """Build a reproducible random walk of daily bars for a symbol.
+
+    The walk is seeded by the symbol and always starts on SYNTHETIC_START, so a date has the same bar no matter
+    which day the series is requested.
+
+    :param symbol: <str> Company ticker symbol
+    :param today: optional last date of the series, defaults to today
+    :return: <pandas.DataFrame> of open, high, low, close and volume indexed by business day
+    """
+    dates = pd.bdate_range(SYNTHETIC_START, pd.Timestamp(today or pd.Timestamp.today()).normalize())
+    rng = np.random.default_rng(zlib.crc32(str.upper(symbol).encode("utf-8")))
+    close = rng.uniform(20, 200) * np.exp(np.cumsum(rng.normal(0.0003, 0.015, len(dates))))
+    open_ = close * (1 + rng.normal(0, 0.005, len(dates)))
+    return pd.DataFrame(
+        {
+            "open": open_,
+            "high": np.maximum(open_, close) * (1 + np.abs(rng.normal(0, 0.005, len(dates)))),
+            "low": np.minimum(open_, close) * (1 - np.abs(rng.normal(0, 0.005, len(dates)))),
+            "close": close,
+            "volume": rng.integers(1_000_000, 10_000_000, len(dates)),
+        },
+        index=dates,
+    )
+
+
+def synthetic_time_series(function: str, symbol: str, outputsize: str = "compact", today=None):
+    """Build a synthetic TIME_SERIES payload shaped like Alphavantage's.
+
+    :param function: <str> TIME_SERIES_* Alphavantage function
+    :param symbol: <str> Company ticker symbol
+    :param outputsize: <str> compact for the latest COMPACT_BARS daily bars, full for everything
+    :param today: optional last date of the series, defaults to today
+    :return: <dict> JSON payload
+    """
+    prices = synthetic_daily_prices(symbol, today)
+    if function != "TIME_SERIES_DAILY_ADJUSTED":
+        # Weekly and monthly bars are labelled by the last trading day of their period
+        period = prices.index.to_period("W-FRI" if function == "TIME_SERIES_WEEKLY_ADJUSTED" else "M")
+        grouped = prices.assign(date=prices.index).groupby(period)
+        prices = grouped.agg(
+            {"date": "last", "open": "first", "high": "max", "low": "min", "close": "last", "volume": "sum"}
+        ).set_index("date")
+    elif outputsize == "compact":
+        prices = prices.iloc[-COMPACT_BARS:]
+    series = {}
+    for date, row in zip(prices.index.strftime("%Y-%m-%d"), prices.itertuples(index=False)):
+        quote = {
+            "1. open": f"{row.open:.4f}",
+            "2. high": f"{row.high:.4f}",
+            "3. low": f"{row.low:.4f}",
+            "4. close": f"{row.close:.4f}",
+            "5. adjusted close": f"{row.close:.4f}",
+            "6. volume": str(row.volume),
+            "7. dividend amount": "0.0000",
+        }
+        if function == "TIME_SERIES_DAILY_ADJUSTED":
+            quote["8. split coefficient"] = "1.0"
+        series[date] = quote
+    return {
+        "Meta Data": {
+            "1. Information": "Synthetic Time Series",
+            "2. Symbol": symbol,
+            "3. Last Refreshed": prices.index.max().strftime("%Y-%m-%d"),
+            "4. Output Size": "Compact" if outputsize == "compact" else "Full size",
+            "5. Time Zone": "US/Eastern",
+        },
+        # Alphavantage lists the newest bar first
+        SERIES_KEYS[function]: dict(reversed(series.items())),
+    }
+
+
+class AlphavantageStub:  # pylint: disable=too-many-instance-attributes
+    """Request handler that plays the part of the Alphavantage API."""
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        *,
+        fixtures_dir: str = FIXTURES_DIR,
+        template: str = TEMPLATE_SYMBOL,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        per_minute: int = None,
+        per_day: int = None,
+        invalid_symbols: tuple = (),
+    ):
+        """Build an Alphavantage stand-in.
+
+        :param fixtures_dir: <str> folder of recorded <SYMBOL>.<report>.json payloads
+        :param template: <str> symbol whose recorded reports are served for symbols without recordings
+        :param latency: <float> seconds every response is delayed
+        :param jitter: <float> extra random delay of up to this many seconds
+        :param per_minute: <int> calls per minute before answering with a Note, None for unlimited
+        :param per_day: <int> calls per day before answering with an Information quota error, None for unlimited
+        :param invalid_symbols: <tuple> symbols answered with an Error Message
+        """
+        self.fixtures_dir = fixtures_dir
+        self.template = str.upper(template)
+        self.latency = latency
+        self.jitter = jitter
+        self.per_minute = per_minute
+        self.per_day = per_day
+        self.invalid_symbols = {str.upper(symbol) for symbol in invalid_symbols}
+        self.recent_calls = collections.deque()
+        self.calls = 0
+        self.day = datetime.date.today()
+        self._recordings = {}
+
+    def recording(self, symbol: str, function: str):
+        """Read a recorded payload.
+
+        :param symbol: <str> Company ticker symbol
+        :param function: <str> Alphavantage function
+        :return: <dict> recorded JSON payload, None if there is no recording
+        """
+        path = os.path.join(self.fixtures_dir, f"{symbol}.{REPORT_FILES[function]}.json")
+        if path not in self._recordings:
+            try:
+                with open(path, encoding="utf-8") as file:
+                    self._recordings[path] = json.load(file)
+            except FileNotFoundError:
+                self._recordings[path] = None
+        return self._recordings[path]
+
+    def payload(self, function: str, symbol: str, outputsize: str = "compact"):
+        """Build the response body for a query.
+
+        :param function: <str> Alphavantage function
+        :param symbol: <str> Company ticker symbol
+        :param outputsize: <str> compact or full
+        :return: <dict> JSON payload
+        """
+        if function not in REPORT_FILES or not symbol or symbol in self.invalid_symbols:
+            return {"Error Message": ERROR_MESSAGE.format(function)}
+        data = self.recording(symbol, function)
+        if data is not None:
+            if function == "TIME_SERIES_DAILY_ADJUSTED" and outputsize == "compact":
+                series = SERIES_KEYS[function]
+                data = {**data, series: dict(list(data[series].items())[:COMPACT_BARS])}
+            return data
+        if function in SERIES_KEYS:
+            return synthetic_time_series(function, symbol, outputsize)
+        data = self.recording(self.template, function)
+        if data is None:
+            return {"Error Message": ERROR_MESSAGE.format(function)}
+        # Reuse the template's report under the requested symbol
+        text = json.dumps(data).replace(f'"{self.template}"', json.dumps(symbol))
+        return json.loads(text)
+
+    def throttle(self):
+        """Count a call against the configured limits.
+
+        :return: <dict> Note or Information payload if the call is over a limit, else None
+        """
+        today = datetime.date.today()
+        if today != self.day:
+            # the daily quota starts over at midnight
+            self.day = today
+            self.calls = 0
+        if self.per_day is not None and self.calls >= self.per_day:
+            return {"Information": INFORMATION_MESSAGE.format(self.per_day)}
+        if self.per_minute is not None:
+            now = time.monotonic()
+            while self.recent_calls and now - self.recent_calls[0] >= 60:
+                self.recent_calls.popleft()
+            if len(self.recent_calls) >= self.per_minute:
+                return {"Note": NOTE_MESSAGE.format(self.per_minute)}
+            self.recent_calls.append(now)
+        self.calls += 1
+        return None
+
+    async def handle_query(self, request: web.Request):
+        """Answer a GET /query request.
+
+        :param request: <aiohttp.web.Request>
+        :return: <aiohttp.web.Response> JSON response, always HTTP 200 like the real service
+        """
+        delay = self.latency + random.uniform(0, self.jitter)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        function = str.upper(request.query.get("function", ""))
+        symbol = str.upper(request.query.get("symbol", ""))
+        body = self.throttle()
+        if body is None:
+            body = self.payload(function, symbol, request.query.get("outputsize", "compact"))
+        LOGGER.debug("Stub %s %s -> %s", function, symbol, next(iter(body), None))
+        return web.json_response(body)
+
+    def app(self):
+        """Build the aiohttp application serving this stand-in.
+
+        :return: <aiohttp.web.Application>
+        """
+        application = web.Application()
+        application.router.add_get("/query", self.handle_query)
+        return application
+
+
+def main(args=None):
+    """Serve the Alphavantage stand-in until interrupted.
+
+    :param args: <list> optional command line arguments, defaults to sys.argv
+    """
+    parser = argparse.ArgumentParser(description="Offline stand-in for the Alphavantage API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--fixtures", default=FIXTURES_DIR, help="folder of recorded <SYMBOL>.<report>.json files")
+    parser.add_argument("--template", default=TEMPLATE_SYMBOL, help="symbol whose reports stand in for any other")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds every response is delayed")
+    parser.add_argument("--jitter", type=float, default=0.0, help="extra random delay in seconds")
+    parser.add_argument("--per-minute", type=int, default=None, help="calls per minute before a Note response")
+    parser.add_argument("--per-day", type=int, default=None, help="calls per day before an Information response")
+    parser.add_argument("--invalid", nargs="*", default=(), help="symbols answered with an Error Message")
+    options = parser.parse_args(args)
+    stub = AlphavantageStub(
+        fixtures_dir=options.fixtures,
+        template=options.template,
+        latency=options.latency,
+        jitter=options.jitter,
+        per_minute=options.per_minute,
+        per_day=options.per_day,
+        invalid_symbols=options.invalid,
+    )
+    web.run_app(stub.app(), host=options.host, port=options.port)
+
+
+if __name__ == "__main__":
+    main()
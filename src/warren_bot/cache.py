@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+# pylint: disable=C0116, W0511
+"""Persistent on-disk cache for data provider responses.
+
+Responses are stored as gzip compressed JSON files named by the SHA-256 hash of their request key, so a repeat
+request for the same data can be answered without touching the network.
+"""
+import gzip
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+
+LOGGER = logging.getLogger(__name__)
+
+CACHE_DIR = os.getenv("WARREN_CACHE_DIR", "./cache")
+
+
+class ResponseCache:
+    """Content-addressed cache of JSON documents on disk."""
+
+    def __init__(self, directory: str):
+        """Build a response cache.
+
+        :param directory: <str> folder to keep cached documents in
+        """
+        self.directory = directory
+
+    @staticmethod
+    def digest(key: tuple):
+        """Hash a request key into a stable file name.
+
+        :param key: <tuple> request key (ex. (function, symbol, outputsize))
+        :return: <str> hex SHA-256 digest of the key
+        """
+        return hashlib.sha256(json.dumps(list(key), separators=(",", ":")).encode("utf-8")).hexdigest()
+
+    def path(self, key: tuple):
+        """Return the file path for a request key.
+
+        :param key: <tuple> request key
+        :return: <str> path of the cached document
+        """
+        digest = self.digest(key)
+        return os.path.join(self.directory, digest[:2], f"{digest}.json.gz")
+
+    def get(self, key: tuple, max_age: float = None):
+        """Read a cached document.
+
+        :param key: <tuple> request key
+        :param max_age: <float> seconds a document stays fresh, None to accept any age
+        :return: cached JSON data, or None if missing or stale
+        """
+        path = self.path(key)
+        try:
+            if max_age is not None and time.time() - os.path.getmtime(path) > max_age:
+                return None
+            with gzip.open(path, "rt", encoding="utf-8") as file:
+                entry = json.load(file)
+        except FileNotFoundError:
+            return None
+        except (OSError, EOFError, ValueError) as err:
+            LOGGER.warning("Discarding unreadable cache entry %s: %s", path, err)
+            return None
+        LOGGER.debug("Cache hit %s", key)
+        return entry["data"]
+
+    def is_fresh(self, key: tuple, max_age: float = None):
+        """Check a document is cached and fresh without reading it.
+
+        :param key: <tuple> request key
+        :param max_age: <float> seconds a document stays fresh, None to accept any age
+        :return: <bool>
+        """
+        try:
+            age = time.time() - os.path.getmtime(self.path(key))
+        except OSError:
+            return False
+        return max_age is None or age <= max_age
+
+    def set(self, key: tuple, data):
+        """Write a document to the cache atomically.
+
+        :param key: <tuple> request key
+        :param data: JSON serializable data to store
+        """
+        path = self.path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as raw, gzip.GzipFile(fileobj=raw, mode="wb") as file:
+                file.write(json.dumps({"key": list(key), "data": data}).encode("utf-8"))
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
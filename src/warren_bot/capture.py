@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+# pylint: disable=C0116, W0511
+"""Record and replay of data provider traffic.
+
+In ``record`` mode the first call of each request stores its request key, response and how long it took in a corpus
+on disk. Repeats are not recorded again, they are often answered from the response cache and would replace the
+network timing with a near zero one.
+In ``replay`` mode the same calls are answered from the corpus after the recorded delay, so real report workloads
+can be profiled deterministically without network access. The mode is picked with ``WARREN_CAPTURE``::
+
+    WARREN_CAPTURE=record WARREN_CAPTURE_DIR=./corpus python -m warren_bot
+    WARREN_CAPTURE=replay WARREN_CAPTURE_DIR=./corpus python -m warren_bot
+
+Entries are grouped by corpus format version, so a corpus recorded by an older layout is never misread:
+
+    WARREN_CAPTURE_DIR/
+        v1/
+            alphavantage/ab/<sha256 of request key>.json.gz
+            sec/cd/<sha256 of request key>.json.gz
+"""
+import asyncio
+import datetime
+import logging
+import os
+import time
+
+from warren_bot import cache
+
+LOGGER = logging.getLogger(__name__)
+
+CAPTURE_MODES = ("off", "record", "replay")
+CORPUS_FORMAT = 1  # bump when the entry layout changes
+
+
+class ReplayMissError(LookupError):
+    """Raised when a replayed call has no recording in the corpus."""
+
+
+class Corpus:
+    """Versioned on-disk corpus of recorded provider calls."""
+
+    def __init__(self, directory: str, mode: str = "off", speed: float = 1.0):
+        """Build a corpus.
+
+        :param directory: <str> corpus root folder
+        :param mode: <str> off, record or replay
+        :param speed: <float> replay speed multiplier (2 replays twice as fast), 0 answers without waiting
+        """
+        mode = str.lower(mode)
+        if mode not in CAPTURE_MODES:
+            raise ValueError(f"Unknown capture mode: {mode}")
+        self.directory = directory
+        self.mode = mode
+        self.speed = speed
+        self._stores = {}
+
+    def store(self, source: str):
+        """Return the entry store of a data source.
+
+        :param source: <str> data source name (ex. alphavantage, sec)
+        :return: <cache.ResponseCache>
+        """
+        if source not in self._stores:
+            self._stores[source] = cache.ResponseCache(os.path.join(self.directory, f"v{CORPUS_FORMAT}", source))
+        return self._stores[source]
+
+    async def call(self, source: str, key: tuple, func, *args, **kwargs):
+        """Run a provider call through the corpus.
+
+        :param source: <str> data source name
+        :param key: <tuple> JSON serializable request key
+        :param func: coroutine function making the real call
+        :return: the real, or replayed, response
+        :raises ReplayMissError: if replaying and the call was never recorded
+        """
+        if self.mode == "replay":
+            return await self.replay(source, key)
+        start = time.monotonic()
+        response = await func(*args, **kwargs)
+        if self.mode == "record" and not await asyncio.to_thread(self.store(source).is_fresh, key):
+            entry = {
+                "elapsed": time.monotonic() - start,
+                "recorded": datetime.datetime.now().isoformat(),
+                "response": response,
+            }
+            await asyncio.to_thread(self.store(source).set, key, entry)
+        return response
+
+    async def replay(self, source: str, key: tuple):
+        """Answer a call from the corpus, taking as long as the recorded call did divided by the replay speed.
+
+        :param source: <str> data source name
+        :param key: <tuple> JSON serializable request key
+        :return: recorded response
+        """
+        start = time.monotonic()
+        entry = await asyncio.to_thread(self.store(source).get, key)
+        if entry is None:
+            raise ReplayMissError(f"No recorded {source} response for {key}")
+        if self.speed <= 0:
+            return entry["response"]
+        delay = entry["elapsed"] / self.speed - (time.monotonic() - start)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return entry["response"]
+
+
+CAPTURE = Corpus(
+    os.getenv("WARREN_CAPTURE_DIR", "./corpus"),
+    os.getenv("WARREN_CAPTURE", "off"),
+    float(os.getenv("WARREN_REPLAY_SPEED", "1.0")),
+)
@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+# pylint: disable=C0116, W0511
+"""Chart figure lifecycle for report rendering.
+
+Figures are borrowed from a ``ChartPool`` for one chart and handed back once it is rendered to memory. A returned
+figure is wiped and kept for the next chart, together with its axes and its Agg canvas and pixel buffer, so a long
+running bot keeps a fixed handful of figures instead of adding every chart to pyplot's global figure manager. A
+figure whose chart failed is closed rather than reused. Figures are created without pyplot and drawn on the
+headless Agg canvas, so no display is needed.
+
+    with charts.CHARTS.figure() as (fig, ax):
+        frame.plot(ax=ax)
+        files.append(charts.render(fig, "eps_fig.jpg"))
+"""
+import contextlib
+import io
+import logging
+import os
+import threading
+
+import matplotlib
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+# Anything still drawn through pyplot (ex. mplfinance) stays headless too
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt  # noqa: E402 pylint: disable=C0411,C0412,C0413
+
+LOGGER = logging.getLogger(__name__)
+
+MAX_IDLE_FIGURES = 2  # figures kept for reuse, a report section only draws one chart at a time
+SUBPLOT_PARAMS = ("left", "bottom", "right", "top", "wspace", "hspace")
+
+
+def render(fig: Figure, filename: str):
+    """Render a figure into an in-memory image owned by the calling report.
+
+    :param fig: <matplotlib.figure.Figure>
+    :param filename: <str> file name the image is uploaded as, its extension picks the format
+    :return: <tuple> (<str> file name, <io.BytesIO> image)
+    """
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format=os.path.splitext(filename)[1][1:])
+    buffer.seek(0)
+    return filename, buffer
+
+
+class ChartPool:  # pylint: disable=too-many-instance-attributes
+    """Figures and axes reused across chart renders."""
+
+    def __init__(self, max_idle: int = MAX_IDLE_FIGURES):
+        """Build a chart pool.
+
+        :param max_idle: <int> figures kept for reuse, more are closed when returned
+        """
+        self.max_idle = max_idle
+        self.created = 0
+        self.reused = 0
+        self.closed = 0
+        self._idle = []
+        self._in_use = set()
+        self._axes_attributes = None
+        self._lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def figure(self):
+        """Borrow a cleared figure and its axes for one chart.
+
+        :return: context manager giving a (<matplotlib.figure.Figure>, <matplotlib.axes.Axes>) tuple
+        """
+        fig = self._acquire()
+        try:
+            yield fig, fig.axes[0]
+        except BaseException:
+            self._close(fig)
+            raise
+        self._release(fig)
+
+    def close(self):
+        """Close every idle figure."""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for fig in idle:
+            self._close(fig)
+
+    def metrics(self):
+        """Report the figures the pool holds and the memory their pixel buffers take.
+
+        :return: <dict> of live, in use and idle figures, lifetime created, reused and closed figures, bytes of
+            Agg pixel buffers, and figures left open in pyplot's figure manager
+        """
+        with self._lock:
+            live = self._idle + list(self._in_use)
+            in_use = len(self._in_use)
+        return {
+            "live_figures": len(live),
+            "in_use": in_use,
+            "idle": len(live) - in_use,
+            "created": self.created,
+            "reused": self.reused,
+            "closed": self.closed,
+            "buffer_bytes": sum(_buffer_bytes(fig) for fig in live),
+            "pyplot_figures": len(plt.get_fignums()),
+        }
+
+    def _acquire(self):
+        with self._lock:
+            if self._idle:
+                fig = self._idle.pop()
+                self.reused += 1
+            else:
+                fig = None
+                self.created += 1
+        if fig is None:
+            fig = Figure()
+            FigureCanvasAgg(fig)
+            ax = fig.add_subplot()
+            if self._axes_attributes is None:
+                self._axes_attributes = set(vars(ax))
+            LOGGER.debug("Created chart figure, %s", self.metrics())
+        with self._lock:
+            self._in_use.add(fig)
+        return fig
+
+    def _release(self, fig: Figure):
+        with self._lock:
+            self._in_use.discard(fig)
+            keep = len(self._idle) < self.max_idle
+        if not keep:
+            self._close(fig)
+            return
+        _reset(fig, self._axes_attributes)
+        with self._lock:
+            self._idle.append(fig)
+
+    def _close(self, fig: Figure):
+        fig.clear()
+        with self._lock:
+            self._in_use.discard(fig)
+            self.closed += 1
+
+
+def _reset(fig: Figure, axes_attributes: set):
+    # Drop axes added on top of the first (ex. twinx) and return the first to a fresh state
+    ax = fig.axes[0]
+    for extra in fig.axes[1:]:
+        extra.remove()
+    ax.cla()
+    # Plotting libraries tag axes with their own state (ex. pandas' time series frequency), forget it
+    for attribute in set(vars(ax)) - axes_attributes:
+        delattr(ax, attribute)
+    fig.set_size_inches(matplotlib.rcParams["figure.figsize"])
+    fig.subplots_adjust(**{param: matplotlib.rcParams[f"figure.subplot.{param}"] for param in SUBPLOT_PARAMS})
+
+
+def _buffer_bytes(fig: Figure):
+    renderer = getattr(fig.canvas, "renderer", None)
+    return 0 if renderer is None else memoryview(renderer.buffer_rgba()).nbytes
+
+
+CHARTS = ChartPool()
+
+
+def metrics():
+    """Report the shared chart pool of this process.
+
+    :return: <dict> see ChartPool.metrics
+    """
+    return CHARTS.metrics()
+
+
+def with_metrics(func, *args, **kwargs):
+    """Run a charting function and report the chart pool of the process that drew its charts.
+
+    Run through the worker pool, ex. ``workers.run(charts.with_metrics, stock_analysis.trend, ...)``, the metrics
+    come from the worker that rendered the charts rather than from whichever worker picks up a separate job.
+
+    :param func: module level function drawing charts with CHARTS
+    :return: <tuple> (result of func, <dict> see ChartPool.metrics)
+    """
+    return func(*args, **kwargs), metrics()
@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+# pylint: disable=C0116, W0511
+"""Memory-compact column types for price and fundamentals frames.
+
+Each numeric column has one declared type whatever its values: price columns are float32 (see PRICE_DTYPES) while
+statement and earnings figures keep float64, so analysis built on them is not silently done in float32. Repeated
+text such as tickers and currencies becomes categorical, and other text becomes the nullable string type instead of
+Python objects.
+
+``python -m warren_bot.compact`` prints a memory report of the local price store.
+"""
+import argparse
+
+import pandas as pd
+
+from warren_bot import price_store
+
+# Price columns kept in float32, prices are published with at most four decimals which float32 holds below ~1000.
+# Statement and earnings figures stay float64 so per-share values and ratios computed from them do too.
+PRICE_DTYPES = {
+    "open": "float32",
+    "high": "float32",
+    "low": "float32",
+    "close": "float32",
+    "adj_close": "float32",
+    "dividend_amt": "float32",
+    "split coefficient": "float32",
+}
+CATEGORY_RATIO = 0.5  # text columns with fewer unique values per row than this become categoricals
+
+
+def compact_frame(frame: pd.DataFrame, dtypes: dict = None):
+    """Convert the columns of a frame to compact types.
+
+    Numeric columns are only narrowed when their type is given, so a column has the same type for every ticker.
+
+    :param frame: <pandas.DataFrame>
+    :param dtypes: <dict> optional column name to type, ex. PRICE_DTYPES
+    :return: <pandas.DataFrame> with narrowed columns
+    """
+    dtypes = dtypes or {}
+    columns = {}
+    for name, values in frame.items():
+        if name in dtypes:
+            values = values.astype(dtypes[name])
+        elif values.dtype.kind == "O":
+            if values.nunique(dropna=True) <= max(len(values) * CATEGORY_RATIO, 1):
+                values = values.astype("category")
+            else:
+                values = values.astype("string")
+        columns[name] = values
+    return pd.DataFrame(columns, index=frame.index)
+
+
+def memory_report(frames: dict):
+    """Measure the memory held by a set of frames.
+
+    :param frames: <dict> of name to <pandas.DataFrame>
+    :return: <pandas.DataFrame> of rows, bytes and bytes per row for each frame, plus a total row
+    """
+    rows = []
+    for name, frame in frames.items():
+        size = int(frame.memory_usage(index=True, deep=True).sum())
+        rows.append({"frame": name, "rows": len(frame), "bytes": size})
+    report = pd.DataFrame(rows, columns=["frame", "rows", "bytes"]).set_index("frame")
+    report.loc["total"] = report.sum()
+    report["bytes_per_row"] = (report["bytes"] / report["rows"].where(report["rows"] > 0)).round(1)
+    return report
+
+
+def main(args=None):
+    """Print a memory report of the price store in compact types next to float64 and object columns.
+
+    :param args: <list> optional command line arguments, defaults to sys.argv
+    """
+    parser = argparse.ArgumentParser(description="Memory report of the local price store")
+    parser.add_argument("--directory", default=None, help="price store folder, defaults to PRICE_DIR")
+    options = parser.parse_args(args)
+    tickers = price_store.stored_tickers(options.directory)
+    compact = price_store.load_panel(tickers, directory=options.directory)
+    wide = compact.astype({column: "float64" for column in compact.columns if compact[column].dtype.kind in "fiu"})
+    wide["ticker"] = wide["ticker"].astype(object)
+    report = memory_report({"float64 + object": wide, "compact": compact})
+    print(f"{len(tickers)} tickers")
+    print(report.to_string())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+# pylint: disable=C0116, W0511
+"""Asyncio helpers shared by the data provider modules."""
+import asyncio
+import logging
+
+LOGGER = logging.getLogger(__name__)
+
+
+class SingleFlight:
+    """Collapse identical in-flight calls into one shared call.
+
+    The first caller for a key starts the work, later callers with the same key wait on the same result until it
+    finishes. Once finished the key is released so the next call starts fresh.
+    """
+
+    def __init__(self):
+        """Build an empty registry of in-flight calls."""
+        self._calls = {}
+
+    def in_flight(self, key):
+        """Check if a call for a key is running.
+
+        :param key: hashable call key
+        :return: <bool>
+        """
+        return key in self._calls
+
+    async def do(self, key, func, *args, **kwargs):
+        """Run ``func(*args, **kwargs)`` once per key no matter how many callers ask concurrently.
+
+        :param key: hashable call key
+        :param func: coroutine function to run
+        :return: result of the shared call
+        """
+        future = self._calls.get(key)
+        if future is None:
+            future = asyncio.ensure_future(func(*args, **kwargs))
+            self._calls[key] = future
+            future.add_done_callback(lambda _: self._calls.pop(key, None))
+        else:
+            LOGGER.debug("Joining in-flight call %s", key)
+        # Shield so one cancelled waiter does not cancel the call for everyone else
+        return await asyncio.shield(future)
@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+# pylint: disable=C0116, W0511
+"""Shared asynchronous HTTP transport for warren_bot data providers.
+
+A single keep-alive ``aiohttp.ClientSession`` is kept for the lifetime of the bot so that every Alphavantage and SEC
+request reuses pooled TCP/TLS connections instead of blocking the discord.py event loop with ``requests``.
+Requests are retried through ``resilience`` with per-host circuit breakers.
+"""
+import asyncio
+import json
+import logging
+from urllib.parse import urlsplit
+
+import aiohttp
+
+from warren_bot import resilience
+
+LOGGER = logging.getLogger(__name__)
+
+DEFAULT_TIMEOUT = 15  # seconds a single attempt may take
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+MAX_CONNECTIONS = 20  # total pooled connections
+MAX_CONNECTIONS_PER_HOST = 10  # pooled connections per provider
+KEEPALIVE_TIMEOUT = 75  # seconds an idle connection is kept open
+
+_SESSION = None
+_SESSION_LOOP = None
+
+
+async def get_session():
+    """Return the shared HTTP session, creating it on first use.
+
+    The session is bound to the running event loop, a new one is built if the loop has changed (ex. between
+    ``asyncio.run`` calls in scripts and tests).
+
+    :return: <aiohttp.ClientSession> pooled keep-alive session
+    """
+    global _SESSION, _SESSION_LOOP  # pylint: disable=global-statement
+    loop = asyncio.get_running_loop()
+    if _SESSION is None or _SESSION.closed or _SESSION_LOOP is not loop:
+        connector = aiohttp.TCPConnector(
+            limit=MAX_CONNECTIONS,
+            limit_per_host=MAX_CONNECTIONS_PER_HOST,
+            keepalive_timeout=KEEPALIVE_TIMEOUT,
+            ttl_dns_cache=300,
+        )
+        _SESSION = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=DEFAULT_TIMEOUT),
+        )
+        _SESSION_LOOP = loop
+        LOGGER.debug("Opened shared HTTP session")
+    return _SESSION
+
+
+async def close_session():
+    """Close the shared HTTP session and release pooled connections."""
+    global _SESSION, _SESSION_LOOP  # pylint: disable=global-statement
+    if _SESSION is not None and not _SESSION.closed:
+        await _SESSION.close()
+        LOGGER.debug("Closed shared HTTP session")
+    _SESSION = None
+    _SESSION_LOOP = None
+
+
+async def get_json(
+    url: str,
+    params: dict = None,
+    headers: dict = None,
+    timeout: float = DEFAULT_TIMEOUT,
+    deadline: float = resilience.DEFAULT_DEADLINE,
+):
+    """Perform a non-blocking GET request and decode the JSON body.
+
+    Timeouts, dropped connections, 5xx and 429 answers and malformed JSON are retried with backoff until the
+    deadline.
+
+    :param url: <str> endpoint to request
+    :param params: <dict> optional query string parameters
+    :param headers: <dict> optional request headers
+    :param timeout: <float> seconds allowed for a single attempt
+    :param deadline: <float> seconds allowed for the request, retries included
+    :return: (<int> HTTP status code, <dict> decoded JSON body)
+    :raises resilience.CircuitOpenError: if the host is failing and not being called
+    """
+    host = urlsplit(url).hostname
+    return await resilience.call(host, _get_json_once, url, params, headers, timeout, deadline=deadline)
+
+
+async def _get_json_once(url: str, params: dict, headers: dict, attempt_timeout: float, timeout: float):
+    session = await get_session()
+    client_timeout = aiohttp.ClientTimeout(total=min(attempt_timeout, timeout))
+    async with session.get(url, params=params, headers=headers, timeout=client_timeout) as resp:
+        if resp.status in RETRY_STATUSES:
+            raise resilience.TransientError(f"{url} answered HTTP {resp.status}")
+        try:
+            body = await resp.json(content_type=None)
+        except json.JSONDecodeError:
+            if resp.status >= 400:
+                resp.raise_for_status()
+            raise
+        if body is None:
+            raise json.JSONDecodeError("Empty response body", "", 0)
+        return resp.status, body
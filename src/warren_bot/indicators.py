@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+# pylint: disable=C0116, W0511
+"""Technical indicators of stock prices computed on demand.
+
+Indicators are not stored with the prices, they are computed when asked for, only over the requested date window
+plus the warm-up bars the indicator needs, and memoized per (ticker, indicator, parameters) until the prices
+change.
+
+    from warren_bot import indicators
+    sma50 = indicators.indicator(prices, "sma", start="2024-01-02", window=50)
+"""
+import collections
+
+import numpy as np
+import pandas as pd
+
+# Bars of history before the window that exponentially weighted indicators need to settle, per bar of span
+EWM_WARMUP = 10
+MAX_CACHE_ENTRIES = 512
+
+
+def sma(close: pd.Series, window: int = 20):
+    """Simple moving average.
+
+    :param close: <pandas.Series> of close prices
+    :param window: <int> bars averaged
+    :return: <pandas.Series>
+    """
+    return close.rolling(window).mean()
+
+
+def log_return(close: pd.Series):
+    """Log return from the previous bar.
+
+    :param close: <pandas.Series> of close prices
+    :return: <pandas.Series>
+    """
+    return np.log(close) - np.log(close.shift(1))
+
+
+def rsi(close: pd.Series, window: int = 14):
+    """Relative strength index using Wilder's smoothing.
+
+    :param close: <pandas.Series> of close prices
+    :param window: <int> smoothing period
+    :return: <pandas.Series> between 0 and 100
+    """
+    delta = close.diff()
+    gain = delta.clip(lower=0).ewm(alpha=1 / window, adjust=False, min_periods=window).mean()
+    loss = (-delta.clip(upper=0)).ewm(alpha=1 / window, adjust=False, min_periods=window).mean()
+    return 100 - 100 / (1 + gain / loss)
+
+
+def macd(close: pd.Series, fast: int = 12, slow: int = 26, signal: int = 9):
+    """Moving average convergence divergence.
+
+    :param close: <pandas.Series> of close prices
+    :param fast: <int> span of the fast exponential moving average
+    :param slow: <int> span of the slow exponential moving average
+    :param signal: <int> span of the signal line
+    :return: <pandas.DataFrame> with macd, signal and histogram columns
+    """
+    line = close.ewm(span=fast, adjust=False).mean() - close.ewm(span=slow, adjust=False).mean()
+    signal_line = line.ewm(span=signal, adjust=False).mean()
+    return pd.DataFrame({"macd": line, "signal": signal_line, "histogram": line - signal_line})
+
+
+def bollinger(close: pd.Series, window: int = 20, num_std: float = 2):
+    """Bollinger bands.
+
+    :param close: <pandas.Series> of close prices
+    :param window: <int> bars in the moving average
+    :param num_std: <float> standard deviations between the middle and outer bands
+    :return: <pandas.DataFrame> with middle, upper and lower columns
+    """
+    middle = close.rolling(window).mean()
+    std = close.rolling(window).std()
+    return pd.DataFrame({"middle": middle, "upper": middle + num_std * std, "lower": middle - num_std * std})
+
+
+# name: (function of close prices, bars of history needed before the first output bar for the given parameters)
+INDICATORS = {
+    "sma": (sma, lambda window=20: window - 1),
+    "log_return": (log_return, lambda: 1),
+    "rsi": (rsi, lambda window=14: EWM_WARMUP * window),
+    "macd": (macd, lambda fast=12, slow=26, signal=9: EWM_WARMUP * (slow + signal)),
+    "bollinger": (bollinger, lambda window=20, num_std=2: window - 1),
+}
+
+_Entry = collections.namedtuple("_Entry", ["fingerprint", "first", "last", "values"])
+
+
+class IndicatorCache:
+    """Least recently used memo of computed indicators."""
+
+    def __init__(self, max_entries: int = MAX_CACHE_ENTRIES):
+        """Build an indicator memo.
+
+        :param max_entries: <int> memoized indicators kept before the least recently used is dropped
+        """
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = collections.OrderedDict()
+
+    def clear(self):
+        """Forget every memoized indicator."""
+        self._entries.clear()
+
+    def get(self, prices: pd.DataFrame, name: str, start=None, end=None, **params):
+        """Get an indicator of one ticker's prices over a date window.
+
+        :param prices: <pandas.DataFrame> of a single ticker's prices sorted oldest first, with a close column
+        :param name: <str> key of INDICATORS
+        :param start: optional first date of the window (inclusive)
+        :param end: optional last date of the window (inclusive)
+        :return: <pandas.Series> or <pandas.DataFrame> of the indicator over the window
+        """
+        try:
+            func, warmup = INDICATORS[name]
+        except KeyError as err:
+            raise ValueError(f"Unknown indicator: {name}") from err
+        close = prices["close"]
+        first = 0 if start is None else int(close.index.searchsorted(pd.Timestamp(start), "left"))
+        last = len(close) if end is None else int(close.index.searchsorted(pd.Timestamp(end), "right"))
+        if first >= last:
+            return func(close.iloc[0:0], **params)
+        ticker = prices["ticker"].iloc[0] if "ticker" in prices else None
+        key = (ticker, name, tuple(sorted(params.items())))
+        fingerprint = (close.index[0], close.index[-1], len(close), close.iloc[-1])
+        entry = self._entries.get(key)
+        if (
+            entry is not None
+            and entry.fingerprint == fingerprint  # noqa: W503
+            and entry.first <= first  # noqa: W503
+            and last <= entry.last  # noqa: W503
+        ):
+            self.hits += 1
+            self._entries.move_to_end(key)
+            offset = entry.first
+            return entry.values.iloc[first - offset:last - offset]
+        self.misses += 1
+        begin = max(first - warmup(**params), 0)
+        values = func(close.iloc[begin:last], **params).iloc[first - begin:]
+        if ticker is not None:
+            self._entries[key] = _Entry(fingerprint, first, last, values)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return values
+
+
+INDICATOR_CACHE = IndicatorCache()
+
+
+def indicator(prices: pd.DataFrame, name: str, start=None, end=None, **params):
+    """Get an indicator of one ticker's prices from the shared memo.
+
+    :param prices: <pandas.DataFrame> of a single ticker's prices sorted oldest first, with a close column
+    :param name: <str> key of INDICATORS (sma, log_return, rsi, macd, bollinger)
+    :param start: optional first date of the window (inclusive)
+    :param end: optional last date of the window (inclusive)
+    :return: <pandas.Series> or <pandas.DataFrame> of the indicator over the window
+    """
+    return INDICATOR_CACHE.get(prices, name, start, end, **params)
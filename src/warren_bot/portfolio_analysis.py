@@ -4,26 +4,42 @@
 import datetime as dt
 import json
 import logging
-import os
-import time
 
 import mplfinance as mpf
-import numpy as np
 import pandas as pd
 from pandas.tseries.offsets import BDay
 
 from warren_bot import analysis
+from warren_bot import indicators
+from warren_bot import price_store
+from warren_bot import quota
 from warren_bot import utilities as util
+from warren_bot import workers
 from warren_bot.alphavantage import download_stocks
+from warren_bot.alphavantage import estimate_calls
 
 logger = logging.getLogger("discord")
 logger.setLevel(logging.DEBUG)
 
+CHART_DAYS_BACK = 180
+# Extra calendar days of history read before the chart window so SMA200 is filled from its first bar
+INDICATOR_WARMUP_DAYS = 300
+
+
+def refresh_cost(club_stocks_file):
+    """Estimate the Alphavantage calls refreshing the club's stale price histories will spend.
+
+    :param club_stocks_file: <str> path of the club stocks csv
+    :return: <int> number of calls
+    """
+    tickers = pd.read_csv(club_stocks_file, usecols=["ticker"], encoding="utf_8", encoding_errors="ignore")["ticker"]
+    return estimate_calls([ticker for ticker in tickers.unique() if not price_store.is_fresh(ticker)], functions=[])
+
 
 async def run(club_stocks_file, club_info_file, key):
     """Execute club analysis report.
 
-    :return:
+    :return: <dict> of tickers whose prices could not be refreshed to their error
     """
     stocks = pd.read_csv(
         club_stocks_file,
@@ -32,7 +48,6 @@ async def run(club_stocks_file, club_info_file, key):
         encoding="utf_8",
         encoding_errors="ignore",
     )
-    total_shares = stocks["shares"].sum()
     # get club info / check and update club info
     with open(club_info_file, encoding="utf-8") as json_data:
         club_data_json = json.load(json_data)
@@ -45,18 +60,36 @@ async def run(club_stocks_file, club_info_file, key):
     # Compare the last meeting day == today - offset to last business day
     if meeting_dates.iloc[-1].date() != (pd.to_datetime(dt.datetime.today() - BDay())).date():
         meeting_dates = pd.concat([meeting_dates, pd.Series(pd.to_datetime(dt.datetime.today() - BDay()))])
-    # Read in stock prices, else get new prices from alphavantage
-    try:
-        # check if stocks.pkl is old data
-        local_stock_price_file = "stocks.pkl"
-        if str(dt.datetime.today().date()) != time.strftime(
-            "%Y-%m-%d", time.gmtime(os.path.getmtime(local_stock_price_file))
-        ):
-            prices = await download_stocks(stocks, key)
-        else:
-            prices = pd.read_pickle(local_stock_price_file)
-    except (FileNotFoundError, KeyError):
-        prices = await download_stocks(stocks, key)
+    # Refresh stale tickers in the price store, then read only the window the report needs
+    tickers = stocks["ticker"].unique().tolist()
+    stale = [ticker for ticker in tickers if not price_store.is_fresh(ticker)]
+    failed = {}
+    if stale:
+        # Tickers past the batch share of the daily quota fail with ReservedQuotaError and are reported as failed
+        with quota.priority(quota.BATCH):
+            _, failed = await download_stocks(stocks[stocks["ticker"].isin(stale)], key)
+    report = await workers.run(build_club_report, stocks, club_data, meeting_dates, tickers)
+    logger.info("Club report saved to %s", report)
+    return failed
+
+
+def build_club_report(stocks: pd.DataFrame, club_data: dict, meeting_dates: pd.Series, tickers: list):
+    """Compute club statistics, render the stock charts and draw the report PDF.
+
+    CPU-bound, run it in the worker pool.
+
+    :param stocks: <pandas.DataFrame> club stock purchases indexed by date
+    :param club_data: <dict> json of club_data from club_info.json
+    :param meeting_dates: <pandas.Series> of club valuation dates
+    :param tickers: <list> of club ticker symbols
+    :return: <str> path of the report PDF
+    """
+    # pylint: disable=R0914
+    total_shares = stocks["shares"].sum()
+    window_start = min(
+        meeting_dates.min(), pd.Timestamp.today().normalize() - pd.Timedelta(days=CHART_DAYS_BACK)
+    ) - pd.Timedelta(days=INDICATOR_WARMUP_DAYS)
+    prices = price_store.load_panel(tickers, start=window_start)
     close = prices.reset_index().pivot(index="date", columns="ticker", values="close")
 
     # Build table for meeting valuation dates
@@ -115,14 +148,21 @@ async def run(club_stocks_file, club_info_file, key):
     stock_price_compare.style.format(precision=2, thousands=",").format_index(str.upper)
 
     # Build stock graphs
-    days_back = 180
+    days_back = CHART_DAYS_BACK
     stock_charts = []
     for ticker in prices["ticker"].unique().tolist():
-        stock = prices[prices["ticker"] == ticker].sort_index(ascending=True)
-        stock = stock[-days_back:]
+        history = prices[prices["ticker"] == ticker].sort_index(ascending=True)
+        stock = history[-days_back:]
+        moving_averages = pd.concat(
+            {
+                f"SMA{window}": indicators.indicator(history, "sma", start=stock.index[0], window=window)
+                for window in (20, 50, 200)
+            },
+            axis=1,
+        )
         other_plots = [
-            mpf.make_addplot(stock[["SMA20", "SMA50", "SMA200"]], type="line", panel=1, alpha=0.3),
-            mpf.make_addplot(stock[["log_return"]], type="bar", panel=0),
+            mpf.make_addplot(moving_averages, type="line", panel=1, alpha=0.3),
+            mpf.make_addplot(indicators.indicator(history, "log_return", start=stock.index[0]), type="bar", panel=0),
         ]
         meeting_days = meeting_valuation[
             meeting_valuation.index > pd.Timestamp.today() - pd.Timedelta(days=days_back)
@@ -177,7 +217,7 @@ async def run(club_stocks_file, club_info_file, key):
         # Only get prices of the given ticker symbol
         price_returns = prices[prices["ticker"] == x]
         # Build dataframe of log returns
-        log_returns = np.log(price_returns["close"]) - np.log(price_returns["close"].shift(1))
+        log_returns = indicators.indicator(price_returns, "log_return")
         returns_std = log_returns.std()
         # print("Price Return {} : {}".format(x, price_returns))
         # print("Log Return {} : {}".format(x, log_returns))
@@ -189,7 +229,7 @@ async def run(club_stocks_file, club_info_file, key):
         )
 
     # Generate Report
-    util.draw_club_report(
+    return util.draw_club_report(
         "CyIC.{}.EconomicsReport".format(dt.datetime.now().strftime("%B%Y")),
         stock_price_compare,
         stock_charts,
@@ -0,0 +1,187 @@
+# -*- coding: utf-8 -*-
+# pylint: disable=C0116, W0511
+"""Local columnar store of daily stock price history, partitioned by ticker.
+
+Each ticker gets a folder holding one ``.npy`` file per column plus the date index. Files are memory-mapped on read
+so a date range or a few columns only touch the bytes they need. ``meta.json`` names the current version folder
+and records when the ticker was last refreshed; replacing it is the atomic commit point of a write.
+
+    PRICE_DIR/
+        IBM/
+            meta.json
+            v1a2b3c/
+                date.npy
+                close.npy
+                ...
+"""
+import datetime
+import json
+import logging
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from warren_bot import cache
+
+LOGGER = logging.getLogger(__name__)
+
+PRICE_DIR = os.path.join(cache.CACHE_DIR, "prices")
+META_FILE = "meta.json"
+DATE_FILE = "date.npy"
+
+
+def ticker_dir(ticker: str, directory: str = None):
+    """Return the folder holding a ticker's price history.
+
+    :param ticker: <str> Company ticker symbol
+    :param directory: <str> optional store folder, defaults to PRICE_DIR
+    :return: <str> path of the ticker's folder
+    """
+    return os.path.join(directory or PRICE_DIR, str.upper(ticker))
+
+
+def read_metadata(ticker: str, directory: str = None):
+    """Read a ticker's store metadata.
+
+    :param ticker: <str> Company ticker symbol
+    :param directory: <str> optional store folder, defaults to PRICE_DIR
+    :return: <dict> {ticker, version, columns, rows, first, last, updated}, None if nothing is stored
+    """
+    try:
+        with open(os.path.join(ticker_dir(ticker, directory), META_FILE), encoding="utf-8") as file:
+            return json.load(file)
+    except FileNotFoundError:
+        return None
+
+
+def is_fresh(ticker: str, directory: str = None, today: datetime.date = None):
+    """Check if a ticker's price history was refreshed today.
+
+    :param ticker: <str> Company ticker symbol
+    :param directory: <str> optional store folder, defaults to PRICE_DIR
+    :param today: <datetime.date> optional date to compare against
+    :return: <bool>
+    """
+    meta = read_metadata(ticker, directory)
+    if meta is None:
+        return False
+    updated = datetime.datetime.fromisoformat(meta["updated"]).date()
+    return updated == (today or datetime.date.today())
+
+
+def save_prices(ticker: str, prices: pd.DataFrame, directory: str = None):
+    """Store a ticker's daily price history, replacing what was there.
+
+    Columns are written to a new version folder and only become visible once ``meta.json`` is swapped to point at
+    it, so readers never see a half written history.
+
+    :param ticker: <str> Company ticker symbol
+    :param prices: <pandas.DataFrame> of daily prices indexed by date
+    :param directory: <str> optional store folder, defaults to PRICE_DIR
+    """
+    root = ticker_dir(ticker, directory)
+    os.makedirs(root, exist_ok=True)
+    prices = prices.sort_index()
+    version = tempfile.mkdtemp(dir=root, prefix="v")
+    columns = [column for column in prices.columns if prices[column].dtype.kind in "biuf"]
+    np.save(os.path.join(version, DATE_FILE), prices.index.values.astype("datetime64[ns]"), allow_pickle=False)
+    for column in columns:
+        np.save(os.path.join(version, f"{column}.npy"), prices[column].to_numpy(), allow_pickle=False)
+    meta = {
+        "ticker": str.upper(ticker),
+        "version": os.path.basename(version),
+        "columns": columns,
+        "rows": len(prices),
+        "first": str(prices.index.min().date()) if len(prices) else None,
+        "last": str(prices.index.max().date()) if len(prices) else None,
+        "updated": datetime.datetime.now().isoformat(),
+    }
+    fd, tmp_path = tempfile.mkstemp(dir=root, suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as file:
+        json.dump(meta, file)
+    os.replace(tmp_path, os.path.join(root, META_FILE))
+    # Drop replaced versions, open memory maps keep reading their unlinked files
+    for entry in os.listdir(root):
+        if entry not in (meta["version"], META_FILE) and os.path.isdir(os.path.join(root, entry)):
+            shutil.rmtree(os.path.join(root, entry), ignore_errors=True)
+    LOGGER.debug("Stored %s daily prices for %s", len(prices), ticker)
+
+
+def load_prices(ticker: str, start=None, end=None, columns: list = None, directory: str = None):
+    """Load a ticker's stored daily price history.
+
+    :param ticker: <str> Company ticker symbol
+    :param start: optional first date to read (inclusive)
+    :param end: optional last date to read (inclusive)
+    :param columns: <list> optional columns to read, defaults to every stored column
+    :param directory: <str> optional store folder, defaults to PRICE_DIR
+    :return: <pandas.DataFrame> of daily prices with a ticker column, None if nothing is stored
+    """
+    for attempt in range(2):
+        meta = read_metadata(ticker, directory)
+        if meta is None:
+            return None
+        try:
+            return _read_version(meta, start, end, columns, directory)
+        except FileNotFoundError:
+            # a writer replaced this version between reading the metadata and the columns
+            if attempt:
+                raise
+            LOGGER.debug("Price history for %s changed while reading, retrying", ticker)
+    return None
+
+
+def _read_version(meta: dict, start, end, columns: list, directory: str):
+    if columns is None:
+        columns = meta["columns"]
+    else:
+        columns = [column for column in columns if column in meta["columns"]]
+    version = os.path.join(ticker_dir(meta["ticker"], directory), meta["version"])
+    if meta["rows"] == 0:
+        dates = np.array([], dtype="datetime64[ns]")
+        data = {column: np.array([]) for column in columns}
+    else:
+        dates = np.load(os.path.join(version, DATE_FILE), mmap_mode="r")
+        first = 0 if start is None else np.searchsorted(dates, np.datetime64(pd.Timestamp(start)), "left")
+        last = len(dates) if end is None else np.searchsorted(dates, np.datetime64(pd.Timestamp(end)), "right")
+        dates = np.array(dates[first:last])
+        data = {
+            column: np.array(np.load(os.path.join(version, f"{column}.npy"), mmap_mode="r")[first:last])
+            for column in columns
+        }
+    prices = pd.DataFrame(data, index=pd.DatetimeIndex(dates, name="date"))
+    prices["ticker"] = pd.Categorical([meta["ticker"]] * len(prices))
+    return prices
+
+
+def load_panel(tickers: list, start=None, end=None, columns: list = None, directory: str = None):
+    """Load the stored price histories of several tickers into one long DataFrame.
+
+    :param tickers: <list> of Company ticker symbols
+    :param start: optional first date to read (inclusive)
+    :param end: optional last date to read (inclusive)
+    :param columns: <list> optional columns to read, defaults to every stored column
+    :param directory: <str> optional store folder, defaults to PRICE_DIR
+    :return: <pandas.DataFrame> of daily prices for every stored ticker
+    """
+    frames = [load_prices(ticker, start, end, columns, directory) for ticker in tickers]
+    frames = [frame for frame in frames if frame is not None]
+    if not frames:
+        return pd.DataFrame()
+    return pd.concat(frames).astype({"ticker": "category"})
+
+
+def stored_tickers(directory: str = None):
+    """List the tickers with a stored price history.
+
+    :param directory: <str> optional store folder, defaults to PRICE_DIR
+    :return: <list> of ticker symbols
+    """
+    try:
+        entries = sorted(os.listdir(directory or PRICE_DIR))
+    except FileNotFoundError:
+        return []
+    return [entry for entry in entries if os.path.exists(os.path.join(directory or PRICE_DIR, entry, META_FILE))]
@@ -0,0 +1,191 @@
+# -*- coding: utf-8 -*-
+# pylint: disable=C0116, W0511
+"""Daily Alphavantage quota accounting and planning.
+
+Interactive commands (``!sr``) and batch downloads (``!cr``) draw from the same daily budget, counted by the
+Alphavantage ``rate_limit.KeyPool``. Calls run at the priority of the work that makes them, and the ``QuotaPlanner``
+keeps a share of the budget back for interactive commands. Batch work that does not fit in what is left is deferred
+to off-peak hours, when the reserve is released. A download shared through a ``PriorityFlight`` runs at the highest
+priority among the callers waiting on it, so a stock report joining a club download is not held to the reserve.
+
+    with quota.priority(quota.BATCH):
+        await download_stocks(stocks, key)  # raises ReservedQuotaError instead of eating the reserve
+"""
+import collections
+import contextlib
+import contextvars
+import datetime
+import logging
+import math
+
+from warren_bot import concurrency
+from warren_bot import rate_limit
+
+LOGGER = logging.getLogger(__name__)
+
+INTERACTIVE = "interactive"
+BATCH = "batch"
+PRIORITIES = (INTERACTIVE, BATCH)
+INTERACTIVE_RESERVE = 0.4  # share of the daily budget batch work may not spend outside off-peak hours
+# Local hours [start, end) batch work may spend the reserve, late enough that the reserve is rarely needed and
+# before the daily budget resets at midnight
+OFF_PEAK_HOURS = (21, 24)
+
+CALL_PRIORITY = contextvars.ContextVar("call_priority", default=INTERACTIVE)
+# Priorities of the callers waiting on each shared call the current task runs for, see PriorityFlight
+FLIGHT_WAITERS = contextvars.ContextVar("flight_waiters", default=())
+
+
+class ReservedQuotaError(rate_limit.DailyLimitError):
+    """Raised when batch work would spend calls reserved for interactive commands."""
+
+
+@contextlib.contextmanager
+def priority(name: str):
+    """Run the calls made inside the block, including from tasks it starts, at a priority.
+
+    :param name: <str> INTERACTIVE or BATCH
+    """
+    if name not in PRIORITIES:
+        raise ValueError(f"Unknown call priority: {name}")
+    token = CALL_PRIORITY.set(name)
+    try:
+        yield
+    finally:
+        CALL_PRIORITY.reset(token)
+
+
+def current_priority():
+    """Return the priority calls made now run at.
+
+    :return: <str> highest of CALL_PRIORITY and the priorities of callers waiting on the shared calls running it
+    """
+    names = {CALL_PRIORITY.get()}
+    for waiting in FLIGHT_WAITERS.get():
+        names.update(waiting)
+    return min(names, key=PRIORITIES.index)
+
+
+class PriorityFlight(concurrency.SingleFlight):
+    """Single flight whose shared call runs at the highest priority among the callers waiting on it.
+
+    The shared call is started in the first caller's context, so without this an interactive command joining a batch
+    download would be admitted as batch work.
+    """
+
+    def __init__(self):
+        """Build an empty registry of in-flight calls."""
+        super().__init__()
+        self._waiting = {}
+
+    async def do(self, key, func, *args, **kwargs):
+        """Run ``func(*args, **kwargs)`` once per key at the highest priority of its callers.
+
+        :param key: hashable call key
+        :param func: coroutine function to run
+        :return: result of the shared call
+        """
+        waiting = self._waiting.setdefault(key, [])
+        name = current_priority()
+        waiting.append(name)
+        try:
+            return await super().do(key, _run_for, waiting, func, *args, **kwargs)
+        finally:
+            waiting.remove(name)
+            if not waiting and not self.in_flight(key):
+                self._waiting.pop(key, None)
+
+
+async def _run_for(waiting: list, func, *args, **kwargs):
+    # Runs in the shared call's own task, so the waiters are only seen by calls made from it
+    FLIGHT_WAITERS.set(FLIGHT_WAITERS.get() + (waiting,))
+    return await func(*args, **kwargs)
+
+
+# cost: calls the work needs, available: calls it may spend at start, start: <datetime.datetime> to begin at
+Plan = collections.namedtuple("Plan", ["cost", "available", "start"])
+
+
+class QuotaPlanner:
+    """Decide when work of a priority may spend the daily budget."""
+
+    def __init__(self, reserve: float = INTERACTIVE_RESERVE, off_peak: tuple = OFF_PEAK_HOURS):
+        """Build a quota planner.
+
+        :param reserve: <float> share of the daily budget kept for interactive commands
+        :param off_peak: <tuple> local (start, end) hours when batch work may spend the reserve
+        """
+        self.reserve = reserve
+        self.off_peak = off_peak
+
+    def is_off_peak(self, now: datetime.datetime):
+        """Check if a time falls in the off-peak hours.
+
+        :param now: <datetime.datetime>
+        :return: <bool>
+        """
+        start, end = self.off_peak
+        if start <= end:
+            return start <= now.hour < end
+        return now.hour >= start or now.hour < end
+
+    def next_off_peak(self, now: datetime.datetime):
+        """Return when the next off-peak window opens.
+
+        :param now: <datetime.datetime>
+        :return: <datetime.datetime> now if already off-peak
+        """
+        if self.is_off_peak(now):
+            return now
+        start = now.replace(hour=self.off_peak[0] % 24, minute=0, second=0, microsecond=0)
+        return start if start > now else start + datetime.timedelta(days=1)
+
+    def available(self, remaining: int, budget: int, name: str, now: datetime.datetime):
+        """Return the calls work of a priority may spend.
+
+        :param remaining: <int> calls left today, None when unlimited
+        :param budget: <int> total daily calls, None when unlimited
+        :param name: <str> INTERACTIVE or BATCH
+        :param now: <datetime.datetime>
+        :return: <float> calls, math.inf when unlimited
+        """
+        if remaining is None:
+            return math.inf
+        if name == INTERACTIVE or budget is None or self.is_off_peak(now):
+            return remaining
+        return max(remaining - math.ceil(budget * self.reserve), 0)
+
+    def admit(self, remaining: int, budget: int, name: str = None, now: datetime.datetime = None):
+        """Check a single call may be made now.
+
+        :param remaining: <int> calls left today, None when unlimited
+        :param budget: <int> total daily calls, None when unlimited
+        :param name: <str> priority of the call, defaults to current_priority()
+        :param now: <datetime.datetime> optional time, defaults to now
+        :raises ReservedQuotaError: if a batch call would spend the interactive reserve
+        """
+        name = name or current_priority()
+        if name == BATCH and remaining and self.available(remaining, budget, name, now or datetime.datetime.now()) < 1:
+            raise ReservedQuotaError("Remaining Alphavantage calls are reserved for stock reports")
+
+    def plan(self, cost: int, remaining: int, budget: int, name: str, now: datetime.datetime = None):
+        """Plan when work of a known cost should run.
+
+        Interactive work always runs now. Batch work runs now when it fits outside the reserve, else at the next
+        off-peak window; if that window is on a later day the budget will have reset by then.
+
+        :param cost: <int> calls the work needs
+        :param remaining: <int> calls left today, None when unlimited
+        :param budget: <int> total daily calls, None when unlimited
+        :param name: <str> INTERACTIVE or BATCH
+        :param now: <datetime.datetime> optional time, defaults to now
+        :return: <Plan>
+        """
+        now = now or datetime.datetime.now()
+        available = self.available(remaining, budget, name, now)
+        if name == INTERACTIVE or cost <= available:
+            return Plan(cost, available, now)
+        start = self.next_off_peak(now)
+        if start.date() != now.date():
+            remaining = budget
+        return Plan(cost, self.available(remaining, budget, name, start), start)
@@ -0,0 +1,364 @@
+# -*- coding: utf-8 -*-
+# pylint: disable=C0116, W0511
+"""Process-wide rate limiting for data provider API calls.
+
+Alphavantage limits each API key to a number of calls per minute and per day depending on the key's tier.
+Every call draws from the shared ``KeyPool``, which holds a ``RateLimiter`` per key, so concurrent commands queue
+behind each other instead of all tripping the limit and stalling together. The pool hands each call to the key with
+the most budget left, so throughput grows with the number of keys, and persists what each key used today across
+restarts.
+"""
+import asyncio
+import datetime
+import hashlib
+import json
+import logging
+import math
+import os
+import tempfile
+import time
+
+LOGGER = logging.getLogger(__name__)
+
+# https://www.alphavantage.co/premium/
+ALPHAVANTAGE_TIERS = {
+    "free": {"per_minute": 5, "per_day": 25},
+    "premium_75": {"per_minute": 75, "per_day": None},
+    "premium_150": {"per_minute": 150, "per_day": None},
+    "premium_300": {"per_minute": 300, "per_day": None},
+    "premium_600": {"per_minute": 600, "per_day": None},
+    "premium_1200": {"per_minute": 1200, "per_day": None},
+}
+SAVE_DELAY = 1.0  # seconds usage changes are batched before the usage file is rewritten
+
+
+class DailyLimitError(ConnectionError):
+    """Raised when the daily call budget is used up."""
+
+
+class NoKeysError(ValueError):
+    """Raised when a call is made before any API key was configured."""
+
+
+class TokenBucket:
+    """Token bucket that hands out tokens at a steady rate with a limited burst.
+
+    Tokens are reserved immediately and callers sleep off any deficit, so waiters are served in arrival order
+    without needing a lock.
+    """
+
+    def __init__(self, capacity: float, period: float):
+        """Build a token bucket.
+
+        :param capacity: <float> maximum burst of tokens
+        :param period: <float> seconds needed to refill a full bucket
+        """
+        self.capacity = capacity
+        self.rate = capacity / period
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, tokens: float = 1):
+        """Take tokens from the bucket.
+
+        :param tokens: <float> number of tokens to take
+        :return: <float> seconds the caller must wait before using the tokens
+        """
+        self._refill()
+        self.tokens -= tokens
+        if self.tokens >= 0:
+            return 0.0
+        return -self.tokens / self.rate
+
+    def wait_time(self, tokens: float = 1):
+        """Return how long taking tokens now would wait, without taking them.
+
+        :param tokens: <float> number of tokens
+        :return: <float> seconds
+        """
+        self._refill()
+        return max(tokens - self.tokens, 0) / self.rate
+
+    async def acquire(self, tokens: float = 1):
+        """Wait until tokens are available and take them.
+
+        :param tokens: <float> number of tokens to take
+        """
+        delay = self.reserve(tokens)
+        if delay > 0:
+            LOGGER.debug("Rate limited, waiting %.2fs", delay)
+            await asyncio.sleep(delay)
+
+    def drain(self):
+        """Empty the bucket, ex. when the provider reports it is throttling us anyway."""
+        self._refill()
+        self.tokens = min(self.tokens, 0)
+
+
+class RateLimiter:
+    """Per-minute token bucket combined with a per-day call budget."""
+
+    def __init__(self, per_minute: int, per_day: int = None):
+        """Build a rate limiter.
+
+        :param per_minute: <int> calls allowed per minute
+        :param per_day: <int> calls allowed per day, None for unlimited
+        """
+        self.per_minute = per_minute
+        self.per_day = per_day
+        self.minute_bucket = TokenBucket(per_minute, 60)
+        self.day = datetime.date.today()
+        self.used_today = 0
+        self.exhausted = False
+
+    def remaining_today(self):
+        """Return the calls left in today's budget.
+
+        :return: <int> remaining calls, None when there is no daily limit
+        """
+        self._roll_day()
+        if self.exhausted:
+            return 0
+        if self.per_day is None:
+            return None
+        return max(self.per_day - self.used_today, 0)
+
+    def _roll_day(self):
+        today = datetime.date.today()
+        if today != self.day:
+            self.day = today
+            self.used_today = 0
+            self.exhausted = False
+
+    def exhaust(self):
+        """Mark today's budget as used up, ex. when the provider reports the key spent it elsewhere."""
+        self._roll_day()
+        self.exhausted = True
+
+    async def acquire(self):
+        """Wait for a call slot.
+
+        :raises DailyLimitError: if the daily budget is exhausted
+        """
+        if self.remaining_today() == 0:
+            raise DailyLimitError("Daily Alphavantage API Limit Reached!")
+        self.used_today += 1
+        await self.minute_bucket.acquire()
+
+    def drain(self):
+        """Empty the per-minute bucket after the provider throttled a call."""
+        self.minute_bucket.drain()
+
+
+class KeyPool:
+    """Rate limited API keys that share out calls by the budget each key has left.
+
+    Every key has its own ``RateLimiter``. A call goes to the key whose per-minute slot opens soonest, preferring
+    the one with the most calls left today, and exhausted keys are skipped until the day rolls over. Calls used
+    per key are saved to a JSON file, keyed by a hash of the key rather than the key itself. Inside an event loop
+    changes are batched for ``SAVE_DELAY`` seconds and written on a worker thread, call ``flush`` before exiting.
+    """
+
+    def __init__(self, keys: list = (), per_minute: int = 5, per_day: int = None, usage_file: str = None):
+        """Build a key pool.
+
+        :param keys: <list> of API keys
+        :param per_minute: <int> calls each key is allowed per minute
+        :param per_day: <int> calls each key is allowed per day, None for unlimited
+        :param usage_file: <str> optional JSON file to persist daily usage in
+        """
+        self.per_minute = per_minute
+        self.per_day = per_day
+        self.usage_file = usage_file
+        self.limiters = {}
+        self._saved = self._load()
+        self._pending = None
+        for key in keys:
+            self.add(key)
+
+    @classmethod
+    def for_tier(cls, keys: list, tier: str, usage_file: str = None):
+        """Build a key pool of keys sharing an Alphavantage tier.
+
+        :param keys: <list> of API keys
+        :param tier: <str> key of ALPHAVANTAGE_TIERS
+        :param usage_file: <str> optional JSON file to persist daily usage in
+        :return: <KeyPool>
+        """
+        try:
+            limits = ALPHAVANTAGE_TIERS[str.lower(tier)]
+        except KeyError as err:
+            raise ValueError(f"Unknown Alphavantage tier: {tier}") from err
+        return cls(keys, limits["per_minute"], limits["per_day"], usage_file)
+
+    def __len__(self):
+        """Return the number of keys in the pool."""
+        return len(self.limiters)
+
+    @staticmethod
+    def fingerprint(key: str):
+        """Hash a key so usage can be saved without storing the key.
+
+        :param key: <str> API key
+        :return: <str> short hex digest
+        """
+        return hashlib.sha256(key.encode("utf-8")).hexdigest()[:16]
+
+    def add(self, key: str):
+        """Add a key to the pool, restoring what it already used today.
+
+        :param key: <str> API key
+        """
+        if key in self.limiters:
+            return
+        limiter = RateLimiter(self.per_minute, self.per_day)
+        saved = self._saved.get(self.fingerprint(key), {})
+        if saved.get("day") == limiter.day.isoformat():
+            limiter.used_today = saved.get("used", 0)
+            limiter.exhausted = saved.get("exhausted", False)
+        self.limiters[key] = limiter
+
+    def remaining_today(self):
+        """Return the calls left today across every key.
+
+        :return: <int> remaining calls, None when a key has no daily limit
+        """
+        remaining = [limiter.remaining_today() for limiter in self.limiters.values()]
+        if None in remaining:
+            return None
+        return sum(remaining)
+
+    def daily_budget(self):
+        """Return the calls allowed per day across every key.
+
+        :return: <int> total calls, None when a key has no daily limit
+        """
+        if self.per_day is None:
+            return None
+        return self.per_day * len(self.limiters)
+
+    def select(self):
+        """Pick the key for the next call without spending from it.
+
+        :return: <str> API key
+        :raises NoKeysError: if the pool has no keys
+        :raises DailyLimitError: if every key's daily budget is exhausted
+        """
+        if not self.limiters:
+            raise NoKeysError("No Alphavantage API key configured, set key or keys under [alphavantage] in the config")
+        best, best_rank = None, None
+        for key, limiter in self.limiters.items():
+            remaining = limiter.remaining_today()
+            if remaining == 0:
+                continue
+            rank = (limiter.minute_bucket.wait_time(), -(math.inf if remaining is None else remaining))
+            if best_rank is None or rank < best_rank:
+                best, best_rank = key, rank
+        if best is None:
+            raise DailyLimitError("Daily Alphavantage API Limit Reached!")
+        return best
+
+    async def acquire(self, key: str = None):
+        """Wait for a call slot on the key with the most budget left.
+
+        :param key: <str> optional key the caller holds, added to the pool if it is new
+        :return: <str> API key to make the call with
+        :raises NoKeysError: if the pool has no keys
+        :raises DailyLimitError: if every key's daily budget is exhausted
+        """
+        if key is not None:
+            self.add(key)
+        chosen = self.select()
+        # Saving is batched, the call is counted by the time usage is written
+        self._save()
+        await self.limiters[chosen].acquire()
+        return chosen
+
+    def drain(self, key: str):
+        """Empty a key's per-minute bucket after the provider throttled a call made with it.
+
+        :param key: <str> API key
+        """
+        self.limiters[key].drain()
+
+    def exhaust(self, key: str):
+        """Skip a key until tomorrow after the provider reported its daily budget spent.
+
+        :param key: <str> API key
+        """
+        LOGGER.warning("Alphavantage key %s reached its daily limit", self.fingerprint(key))
+        self.limiters[key].exhaust()
+        self._save()
+
+    def usage(self):
+        """Report what each key used today.
+
+        :return: <dict> of key fingerprint to day, calls used and exhausted flag
+        """
+        usage = {}
+        for key, limiter in self.limiters.items():
+            limiter.remaining_today()  # rolls the day over
+            usage[self.fingerprint(key)] = {
+                "day": limiter.day.isoformat(),
+                "used": limiter.used_today,
+                "exhausted": limiter.exhausted,
+            }
+        return usage
+
+    def _load(self):
+        if self.usage_file is None:
+            return {}
+        try:
+            with open(self.usage_file, encoding="utf-8") as file:
+                return json.load(file)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as err:
+            LOGGER.warning("Ignoring unreadable key usage file %s: %s", self.usage_file, err)
+            return {}
+
+    async def flush(self):
+        """Write usage changes still waiting to be saved."""
+        if self._pending is not None:
+            await self._pending
+        if self.usage_file is not None:
+            await asyncio.to_thread(self._write, self._snapshot())
+
+    def _save(self):
+        if self.usage_file is None:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._write(self._snapshot())
+            return
+        if self._pending is None:
+            self._pending = loop.create_task(self._save_later())
+
+    async def _save_later(self):
+        try:
+            await asyncio.sleep(SAVE_DELAY)
+            await asyncio.to_thread(self._write, self._snapshot())
+        finally:
+            self._pending = None
+
+    def _snapshot(self):
+        self._saved.update(self.usage())
+        return dict(self._saved)
+
+    def _write(self, saved: dict):
+        directory = os.path.dirname(self.usage_file) or "."
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as file:
+                json.dump(saved, file)
+            os.replace(tmp_path, self.usage_file)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
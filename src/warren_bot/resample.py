@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+# pylint: disable=C0116, W0511
+"""Weekly and monthly price bars built from the daily price history.
+
+Bars are aggregated locally instead of spending Alphavantage calls on TIME_SERIES_WEEKLY_ADJUSTED and
+TIME_SERIES_MONTHLY_ADJUSTED. Like Alphavantage, each bar is labelled by the last trading day of its period.
+Built bars are memoized per (ticker, frequency); when the daily history grows only the periods from the first
+changed day onward are rebuilt.
+"""
+import collections
+
+import numpy as np
+import pandas as pd
+
+FREQUENCIES = {"weekly": "W-FRI", "monthly": "M"}
+# Daily price column and how it is aggregated into a period bar
+AGGREGATIONS = {
+    "open": "first",
+    "high": "max",
+    "low": "min",
+    "close": "last",
+    "adj_close": "last",
+    "volume": "sum",
+    "dividend_amt": "sum",
+    "split coefficient": "prod",
+}
+MAX_CACHE_ENTRIES = 256
+
+
+def resample_prices(daily: pd.DataFrame, frequency: str):
+    """Aggregate daily prices into period bars.
+
+    :param daily: <pandas.DataFrame> of a single ticker's daily prices sorted oldest first
+    :param frequency: <str> weekly or monthly
+    :return: <pandas.DataFrame> of period bars indexed by the last trading day of each period
+    """
+    periods = daily.index.to_period(FREQUENCIES[frequency])
+    aggregations = {column: how for column, how in AGGREGATIONS.items() if column in daily}
+    bars = daily[list(aggregations)].groupby(periods).agg(aggregations)
+    last_days = daily.index.to_series().groupby(periods).max()
+    bars.index = pd.DatetimeIndex(last_days.to_numpy(), name="date")
+    if "ticker" in daily:
+        bars["ticker"] = daily["ticker"].iloc[0] if len(daily) else None
+    return bars
+
+
+_Entry = collections.namedtuple("_Entry", ["dates", "values", "bars"])
+
+
+class BarCache:
+    """Least recently used memo of period bars that rebuilds only changed periods."""
+
+    def __init__(self, max_entries: int = MAX_CACHE_ENTRIES):
+        """Build a period bar memo.
+
+        :param max_entries: <int> memoized bar series kept before the least recently used is dropped
+        """
+        self.max_entries = max_entries
+        self.hits = 0
+        self.partial = 0
+        self.misses = 0
+        self._entries = collections.OrderedDict()
+
+    def clear(self):
+        """Forget every memoized bar series."""
+        self._entries.clear()
+
+    def get(self, daily: pd.DataFrame, frequency: str):
+        """Get period bars of one ticker's daily prices.
+
+        :param daily: <pandas.DataFrame> of a single ticker's daily prices sorted oldest first
+        :param frequency: <str> weekly or monthly
+        :return: <pandas.DataFrame> of period bars, a copy the caller may modify
+        """
+        if frequency not in FREQUENCIES:
+            raise ValueError(f"Unknown bar frequency: {frequency}")
+        if "ticker" not in daily or daily.empty:
+            return resample_prices(daily, frequency)
+        key = (daily["ticker"].iloc[0], frequency)
+        columns = [column for column in AGGREGATIONS if column in daily]
+        dates = daily.index.to_numpy()
+        values = daily[columns].to_numpy(dtype="float64")
+        entry = self._entries.get(key)
+        changed = self._first_change(entry, dates, values)
+        if changed is None:
+            self.misses += 1
+            bars = resample_prices(daily, frequency)
+        elif changed == len(dates):
+            self.hits += 1
+            bars = entry.bars
+        else:
+            # Periods before the one holding the first changed day are still valid
+            self.partial += 1
+            period_start = daily.index[changed].to_period(FREQUENCIES[frequency]).start_time
+            rebuilt = resample_prices(daily[daily.index >= period_start], frequency)
+            bars = pd.concat([entry.bars[entry.bars.index < period_start], rebuilt])
+        self._entries[key] = _Entry(dates, values, bars)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return bars.copy()
+
+    @staticmethod
+    def _first_change(entry, dates: np.ndarray, values: np.ndarray):
+        """Find the first daily row that differs from the memoized history.
+
+        :return: <int> row position, len(dates) if nothing changed, None if everything must be rebuilt
+        """
+        if entry is None or values.shape[1] != entry.values.shape[1] or len(dates) < len(entry.dates):
+            return None
+        known = len(entry.dates)
+        same = (values[:known] == entry.values) | (np.isnan(values[:known]) & np.isnan(entry.values))
+        same = same.all(axis=1) & (dates[:known] == entry.dates)
+        differs = np.flatnonzero(~same)
+        if differs.size:
+            return None if differs[0] == 0 else int(differs[0])
+        return known
+
+
+BAR_CACHE = BarCache()
+
+
+def period_bars(daily: pd.DataFrame, frequency: str):
+    """Get weekly or monthly bars of one ticker's daily prices from the shared memo.
+
+    :param daily: <pandas.DataFrame> of a single ticker's daily prices sorted oldest first
+    :param frequency: <str> weekly or monthly
+    :return: <pandas.DataFrame> of period bars indexed by the last trading day of each period
+    """
+    return BAR_CACHE.get(daily, frequency)
@@ -0,0 +1,159 @@
+# -*- coding: utf-8 -*-
+# pylint: disable=C0116, W0511
+"""Retries and circuit breakers for data provider calls.
+
+Transient failures (timeouts, dropped connections, 5xx and 429 answers, malformed JSON) are retried with jittered
+exponential backoff, but never past the call's deadline. Every provider host has a ``CircuitBreaker``: after
+repeated failures calls to that host fail at once with ``CircuitOpenError`` until a trial call succeeds again, so a
+provider that is down costs seconds instead of tying up commands for minutes.
+"""
+import asyncio
+import json
+import logging
+import random
+import time
+
+import aiohttp
+
+LOGGER = logging.getLogger(__name__)
+
+DEFAULT_DEADLINE = 30  # seconds a call may take, retries included
+MAX_ATTEMPTS = 4
+BASE_DELAY = 0.5  # seconds of backoff ceiling before the first retry, doubled on every retry
+MAX_DELAY = 8  # seconds
+FAILURE_THRESHOLD = 5  # consecutive failures that open a host's circuit
+RESET_TIMEOUT = 30  # seconds an open circuit waits before letting a trial call through
+
+
+class TransientError(ConnectionError):
+    """Raised for provider answers worth retrying, ex. HTTP 5xx or 429."""
+
+
+class CircuitOpenError(ConnectionError):
+    """Raised instead of calling a host whose circuit is open."""
+
+
+RETRYABLE_ERRORS = (
+    TransientError,
+    asyncio.TimeoutError,
+    aiohttp.ClientConnectionError,
+    aiohttp.ClientPayloadError,
+    json.JSONDecodeError,
+)
+
+
+def backoff_delay(attempt: int, base: float = BASE_DELAY, cap: float = MAX_DELAY):
+    """Return a full jitter exponential backoff delay.
+
+    :param attempt: <int> retries made so far, from 0
+    :param base: <float> seconds of ceiling before the first retry
+    :param cap: <float> largest ceiling in seconds
+    :return: <float> seconds to wait, uniformly drawn below the ceiling
+    """
+    return random.uniform(0, min(cap, base * 2**attempt))
+
+
+class CircuitBreaker:
+    """Closed, open and half-open circuit for one provider host."""
+
+    def __init__(self, failure_threshold: int = FAILURE_THRESHOLD, reset_timeout: float = RESET_TIMEOUT):
+        """Build a circuit breaker.
+
+        :param failure_threshold: <int> consecutive failures that open the circuit
+        :param reset_timeout: <float> seconds the circuit stays open before a trial call
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self.trial = False
+
+    @property
+    def state(self):
+        """Return closed, open or half-open."""
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def before_call(self, host: str = ""):
+        """Check a call may go through.
+
+        :param host: <str> host name for the error message
+        :raises CircuitOpenError: while the circuit is open, or a half-open trial call is already out
+        """
+        state = self.state
+        if state == "open" or (state == "half-open" and self.trial):
+            raise CircuitOpenError(f"{host or 'Provider'} is failing, not calling it for now")
+        if state == "half-open":
+            self.trial = True
+
+    def record_success(self):
+        """Close the circuit after a successful call."""
+        self.failures = 0
+        self.opened_at = None
+        self.trial = False
+
+    def release(self):
+        """Let another trial call through after one ended without a verdict, ex. it was cancelled."""
+        self.trial = False
+
+    def record_failure(self):
+        """Count a failed call, opening the circuit once the threshold is reached."""
+        self.failures += 1
+        self.trial = False
+        if self.failures >= self.failure_threshold or self.opened_at is not None:
+            if self.opened_at is None:
+                LOGGER.warning("Opening circuit after %d consecutive failures", self.failures)
+            self.opened_at = time.monotonic()
+
+
+BREAKERS = {}
+
+
+def breaker(host: str):
+    """Return the shared circuit breaker of a host.
+
+    :param host: <str> provider host name
+    :return: <CircuitBreaker>
+    """
+    return BREAKERS.setdefault(host, CircuitBreaker())
+
+
+async def call(host: str, func, *args, deadline: float = DEFAULT_DEADLINE, max_attempts: int = MAX_ATTEMPTS, **kwargs):
+    """Await a provider call, retrying transient failures until the deadline.
+
+    Each attempt is given the time left before the deadline as its ``timeout`` keyword.
+
+    :param host: <str> provider host name the circuit breaker is kept for
+    :param func: coroutine function making one attempt, it must accept a timeout keyword
+    :param deadline: <float> seconds the call may take, retries included
+    :param max_attempts: <int> attempts before giving up
+    :return: result of func
+    :raises CircuitOpenError: if the host's circuit is open
+    :raises: the last transient error once attempts or time run out
+    """
+    circuit = breaker(host)
+    end = time.monotonic() + deadline
+    attempt = 0
+    while True:
+        circuit.before_call(host)
+        remaining = end - time.monotonic()
+        try:
+            result = await asyncio.wait_for(func(*args, timeout=remaining, **kwargs), remaining)
+        except RETRYABLE_ERRORS as err:
+            circuit.record_failure()
+            attempt += 1
+            delay = backoff_delay(attempt - 1)
+            if attempt >= max_attempts or time.monotonic() + delay >= end:
+                LOGGER.warning("%s failed after %d attempts: %r", host, attempt, err)
+                raise
+            LOGGER.info("%s attempt %d failed (%r), retrying in %.2fs", host, attempt, err, delay)
+            await asyncio.sleep(delay)
+        except BaseException:
+            circuit.release()
+            raise
+        else:
+            circuit.record_success()
+            return result
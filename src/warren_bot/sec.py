@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+# pylint: disable=C0116, W0511
+"""Asynchronous SEC EDGAR client.
+
+https://www.sec.gov/edgar/sec-api-documentation
+
+Requests share one token bucket held to SEC's fair access limit of 10 requests per second, identical requests in
+flight share one download, and ``submissions`` and ``companyfacts`` documents are kept in an on-disk cache.
+"""
+import logging
+import os
+from asyncio import to_thread
+
+from warren_bot import cache
+from warren_bot import capture
+from warren_bot import concurrency
+from warren_bot import http_client
+from warren_bot import rate_limit
+
+LOGGER = logging.getLogger(__name__)
+
+SEC_URL = "https://data.sec.gov"
+# Bulk file of every listed ticker with its CIK, company name and exchange
+COMPANY_TICKERS_URL = "https://www.sec.gov/files/company_tickers_exchange.json"
+# SEC asks automated tools to identify themselves with a contact address
+SEC_HEADERS = {
+    "user-agent": "Cypress Investment Club simmonsj@jasimmonsv.com",
+}
+REQUESTS_PER_SECOND = 10  # https://www.sec.gov/os/accessing-edgar-data
+RATE_LIMITER = rate_limit.TokenBucket(REQUESTS_PER_SECOND, 1)
+RESPONSE_CACHE = cache.ResponseCache(os.path.join(cache.CACHE_DIR, "sec"))
+IN_FLIGHT = concurrency.SingleFlight()
+# Seconds each kind of EDGAR document stays fresh in the response cache
+CACHE_TTLS = {
+    "submissions": 24 * 60 * 60,
+    "companyfacts": 7 * 24 * 60 * 60,
+    "company_tickers": 24 * 60 * 60,
+}
+
+
+async def get_sec_data(url: str, max_age: float = None):
+    """Get a JSON document from the SEC EDGAR API.
+
+    :param url: <str> data.sec.gov API url
+    :param max_age: <float> seconds a cached document is accepted for, None to always download
+    :return: <dict> json of SEC data
+    """
+    return await capture.CAPTURE.call("sec", (url,), IN_FLIGHT.do, url, _fetch_sec_data, url, max_age)
+
+
+async def _fetch_sec_data(url: str, max_age: float = None):
+    if max_age is not None:
+        resp = await to_thread(RESPONSE_CACHE.get, (url,), max_age)
+        if resp is not None:
+            return resp
+    await RATE_LIMITER.acquire()
+    _, resp = await http_client.get_json(url, headers=SEC_HEADERS)
+    if max_age is not None:
+        await to_thread(RESPONSE_CACHE.set, (url,), resp)
+    return resp
+
+
+async def get_submissions(cik: str):
+    """Get a company's EDGAR submissions document (name, SIC industry, tickers, filings).
+
+    :param cik: <str> company SEC CIK number, zero padding optional
+    :return: <dict> json of the submissions document
+    """
+    return await get_sec_data(f"{SEC_URL}/submissions/CIK{str(cik).zfill(10)}.json", CACHE_TTLS["submissions"])
+
+
+async def get_company_facts(cik: str, max_age: float = CACHE_TTLS["companyfacts"]):
+    """Get every XBRL fact a company has reported.
+
+    :param cik: <str> company SEC CIK number, zero padding optional
+    :param max_age: <float> seconds a cached document is accepted for, 0 to download a fresh one
+    :return: <dict> json of the companyfacts document
+    """
+    url = f"{SEC_URL}/api/xbrl/companyfacts/CIK{str(cik).zfill(10)}.json"
+    return await get_sec_data(url, max_age)
+
+
+async def get_company_tickers(max_age: float = CACHE_TTLS["company_tickers"]):
+    """Get SEC's bulk list of listed tickers.
+
+    :param max_age: <float> seconds a cached document is accepted for
+    :return: <dict> json with fields (cik, name, ticker, exchange) and a data row per ticker
+    """
+    return await get_sec_data(COMPANY_TICKERS_URL, max_age)
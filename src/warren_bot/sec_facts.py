@@ -0,0 +1,218 @@
+# -*- coding: utf-8 -*-
+# pylint: disable=C0116, W0511
+"""Local index of SEC EDGAR company facts.
+
+Every XBRL fact of a ``companyfacts`` document is stored in a SQLite table keyed by (CIK, concept, fiscal year,
+form), next to each company's industry and the last financial filing the facts were read from. A company is only
+downloaded again when its ``submissions`` document lists a newer financial filing, and then only facts filed since
+the last update are written. Lookups such as the latest annual revenue are a single indexed query, no network.
+
+    await sec_facts.sync_company("51143")
+    revenue = sec_facts.FACTS_INDEX.latest_annual("51143", sec_facts.REVENUE_CONCEPTS)
+"""
+import logging
+import os
+import sqlite3
+import threading
+from asyncio import to_thread
+
+from warren_bot import cache
+from warren_bot import concurrency
+from warren_bot import sec
+
+LOGGER = logging.getLogger(__name__)
+
+# Forms whose filing brings new financial facts
+FACT_FORMS = {"10-K", "10-K/A", "10-Q", "10-Q/A", "20-F", "20-F/A", "40-F", "40-F/A"}
+ANNUAL_FORMS = ("10-K", "20-F", "40-F")
+# us-gaap concepts companies report revenue under, most preferred first
+REVENUE_CONCEPTS = [
+    "Revenues",
+    "RevenueFromContractWithCustomerExcludingAssessedTax",
+    "SalesRevenueNet",
+]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS companies (
+    cik INTEGER PRIMARY KEY,
+    name TEXT,
+    sic_description TEXT,
+    last_accession TEXT,
+    last_filed TEXT
+);
+CREATE TABLE IF NOT EXISTS facts (
+    cik INTEGER NOT NULL,
+    concept TEXT NOT NULL,
+    fy INTEGER,
+    form TEXT,
+    fp TEXT,
+    unit TEXT NOT NULL,
+    start TEXT,
+    end TEXT NOT NULL,
+    val REAL,
+    accn TEXT,
+    filed TEXT,
+    PRIMARY KEY (cik, concept, fy, form, unit, start, end)
+);
+"""
+
+
+class FactsIndex:
+    """SQLite store of company facts and the filing they were last updated from."""
+
+    def __init__(self, path: str):
+        """Build a company facts index.
+
+        :param path: <str> SQLite database file, ":memory:" for a throwaway index
+        """
+        self.path = path
+        self._connection = None
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        if self._connection is None:
+            if self.path != ":memory:":
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._connection = sqlite3.connect(self.path, check_same_thread=False)
+            self._connection.executescript(SCHEMA)
+        return self._connection
+
+    def close(self):
+        """Close the database connection."""
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    def company(self, cik: str):
+        """Return what is stored about a company.
+
+        :param cik: <str> company SEC CIK number
+        :return: <dict> of name, sic_description, last_accession and last_filed, None if not indexed
+        """
+        with self._lock:
+            row = (
+                self._connect()
+                .execute(
+                    "SELECT name, sic_description, last_accession, last_filed FROM companies WHERE cik = ?",
+                    (int(cik),),
+                )
+                .fetchone()
+            )
+        if row is None:
+            return None
+        return dict(zip(["name", "sic_description", "last_accession", "last_filed"], row))
+
+    def update(self, cik: str, facts: dict, submissions: dict, accession: str):
+        """Write the facts filed since the last update and record the filing they are current to.
+
+        :param cik: <str> company SEC CIK number
+        :param facts: <dict> json of the companyfacts document
+        :param submissions: <dict> json of the submissions document
+        :param accession: <str> accession number of the latest financial filing
+        :return: <int> number of facts written
+        """
+        stored = self.company(cik) or {}
+        since = stored.get("last_filed") or ""
+        rows = [
+            (
+                int(cik),
+                concept,
+                record.get("fy") or 0,
+                record.get("form"),
+                record.get("fp"),
+                unit,
+                record.get("start", ""),  # instant facts have no start, NULL would defeat the primary key
+                record["end"],
+                record["val"],
+                record.get("accn"),
+                record.get("filed"),
+            )
+            for taxonomy in facts.get("facts", {}).values()
+            for concept, fact in taxonomy.items()
+            for unit, records in fact.get("units", {}).items()
+            for record in records
+            if (record.get("filed") or "") >= since
+        ]
+        last_filed = max((row[10] or "" for row in rows), default=since)
+        with self._lock:
+            connection = self._connect()
+            with connection:
+                connection.executemany("INSERT OR REPLACE INTO facts VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+                connection.execute(
+                    "INSERT OR REPLACE INTO companies VALUES (?, ?, ?, ?, ?)",
+                    (
+                        int(cik),
+                        submissions.get("name") or facts.get("entityName"),
+                        submissions.get("sicDescription"),
+                        accession,
+                        last_filed,
+                    ),
+                )
+        LOGGER.debug("Indexed %d facts of CIK %s filed since %s", len(rows), cik, since or "ever")
+        return len(rows)
+
+    def latest_annual(self, cik: str, concepts: list, unit: str = "USD"):
+        """Return the most recent full fiscal year value of a concept from annual reports.
+
+        :param cik: <str> company SEC CIK number
+        :param concepts: <list> of concepts to try, the one with the latest fiscal year wins and within a fiscal
+            year the one listed first
+        :param unit: <str> unit of measure
+        :return: <float> value, None if the company reported none of the concepts
+        """
+        placeholders = ", ".join("?" for _ in concepts)
+        forms = ", ".join("?" for _ in ANNUAL_FORMS)
+        preference = " ".join(f"WHEN ? THEN {rank}" for rank in range(len(concepts)))
+        with self._lock:
+            row = (
+                self._connect()
+                .execute(
+                    f"SELECT val FROM facts WHERE cik = ? AND concept IN ({placeholders}) AND form IN ({forms}) "
+                    "AND unit = ? AND fp = 'FY' AND julianday(end) - julianday(start) > 300 "
+                    f"ORDER BY fy DESC, CASE concept {preference} END, end DESC, filed DESC LIMIT 1",
+                    (int(cik), *concepts, *ANNUAL_FORMS, unit, *concepts),
+                )
+                .fetchone()
+            )
+        return None if row is None else row[0]
+
+
+FACTS_INDEX = FactsIndex(os.path.join(cache.CACHE_DIR, "sec_facts.sqlite3"))
+SYNCS = concurrency.SingleFlight()
+
+
+def latest_financial_filing(submissions: dict):
+    """Find the newest filing that carries financial facts.
+
+    :param submissions: <dict> json of the submissions document
+    :return: <str> accession number, None if the company filed none recently
+    """
+    recent = submissions.get("filings", {}).get("recent", {})
+    for form, accession in zip(recent.get("form", []), recent.get("accessionNumber", [])):
+        if form in FACT_FORMS:
+            return accession
+    return None
+
+
+async def sync_company(cik: str, index: FactsIndex = None):
+    """Bring a company's indexed facts up to date with its latest financial filing.
+
+    :param cik: <str> company SEC CIK number
+    :param index: <FactsIndex> optional index, defaults to FACTS_INDEX
+    :return: <bool> True if new facts were downloaded
+    """
+    index = index or FACTS_INDEX
+    return await SYNCS.do((id(index), int(cik)), _sync_company, cik, index)
+
+
+async def _sync_company(cik: str, index: FactsIndex):
+    submissions = await sec.get_submissions(cik)
+    accession = latest_financial_filing(submissions)
+    stored = await to_thread(index.company, cik)
+    if stored is not None and stored["last_accession"] == accession:
+        return False
+    # A new filing is not in the cached document yet, download a fresh one
+    facts = await sec.get_company_facts(cik, max_age=0 if stored is not None else sec.CACHE_TTLS["companyfacts"])
+    await to_thread(index.update, cik, facts, submissions, accession)
+    return True
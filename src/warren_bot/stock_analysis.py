@@ -1,18 +1,20 @@
 # -*- coding: utf-8 -*-
 # pylint: disable=C0116, W0511, E1121
 """Stock Analysis functions for chatbot."""
+import asyncio
 import datetime
 import logging
 
 import discord
-import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
 from dateutil.relativedelta import relativedelta
 from prettytable import PrettyTable
 
 from warren_bot import alphavantage as alpha
+from warren_bot import charts
 from warren_bot import utilities as utils
+from warren_bot import workers
 
 YRS_LOOKBACK = 5
 LOGGER = logging.getLogger("discord")
@@ -160,7 +162,7 @@ def record_of_stock(eps, inc_statement, daily_prices, monthly_prices, current_ep
     )
 
     # get current stock prices
-    present_price = daily_prices["close"].iloc[0]
+    present_price = float(daily_prices["close"].iloc[0])
     # get current eps
     msg.append(f"*Present Price*:\t**{present_price:.3f}**\t*Present EPS*:\t**{current_eps:.3f}**")
     # Display
@@ -280,7 +282,7 @@ def record_of_stock(eps, inc_statement, daily_prices, monthly_prices, current_ep
     )
     msg.append(f"```{y}```")
     msg.append("**% Payout** is `Dividend per share / EPS` \t**% High Yield** is `Dividend per share / Low Price`")
-    return msg, high_yield.max()
+    return msg, float(high_yield.max())
 
 
 def trend(
@@ -293,7 +295,7 @@ def trend(
     :param inc_statement: <pandas.DatFrame>
     :param eps: <pandas.DatFrame>
     :param monthly_company_prices: <pandas.DatFrame>
-    :return: <tuple> (<str> a message of the section to print, <list> of chart figure file names)
+    :return: <tuple> (<str> a message of the section to print, <list> of (<str> file name, <io.BytesIO> image))
     """
     msg = "\n__**Trends**__"
     files = []
@@ -305,31 +307,30 @@ def trend(
     quarterly_eps = eps["quarterlyEarnings"]["reportedEPS"]
     # quarterly_eps = quarterly_eps[quarterly_eps.index >= datetime.datetime.now() - relativedelta(years=YRS_LOOKBACK)]
     quarterly_eps.sort_index(ascending=False, inplace=True)
-    # Quarterly Revenue
-    fig1, revenue_fig = plt.subplots()  # pylint: disable=W0612
-    revenue_fig.set_xlabel("Date")
-    revenue_fig.set_ylabel("Revenue", color="tab:red")
-    revenue_fig.plot(quarterly_revenue, color="tab:red")
-    revenue_fig.set_title("Revenue & EPS")
-    # Quarterly EPS
-    eps_fig = revenue_fig.twinx()
-    eps_fig.set_ylabel("EPS", color="tab:blue")
-    eps_fig.plot(quarterly_eps)
-    # Price high/low
-    plt.savefig("./eps_fig.jpg")
-    files.append("./eps_fig.jpg")
+    with charts.CHARTS.figure() as (fig, revenue_fig):
+        # Quarterly Revenue
+        revenue_fig.set_xlabel("Date")
+        revenue_fig.set_ylabel("Revenue", color="tab:red")
+        revenue_fig.plot(quarterly_revenue, color="tab:red")
+        revenue_fig.set_title("Revenue & EPS")
+        # Quarterly EPS
+        eps_fig = revenue_fig.twinx()
+        eps_fig.set_ylabel("EPS", color="tab:blue")
+        eps_fig.plot(quarterly_eps)
+        files.append(charts.render(fig, "eps_fig.jpg"))
 
     # Plot Stock Highs and Lows
     monthly_company_prices["avg_high"] = monthly_company_prices["high"].rolling(4).mean()
     monthly_company_prices["avg_low"] = monthly_company_prices["low"].rolling(4).mean()
-    monthly_company_prices.plot(
-        y=["high", "low", "avg_high", "avg_low"],
-        title="Stock High & Low",
-        xlabel="Date",
-        ylabel="USD",
-    )
-    plt.savefig("./stock_high_low.jpg")
-    files.append("./stock_high_low.jpg")
+    with charts.CHARTS.figure() as (fig, ax):
+        monthly_company_prices.plot(
+            ax=ax,
+            y=["high", "low", "avg_high", "avg_low"],
+            title="Stock High & Low",
+            xlabel="Date",
+            ylabel="USD",
+        )
+        files.append(charts.render(fig, "stock_high_low.jpg"))
     return msg, files
 
 
@@ -669,7 +670,7 @@ def revenue_growth(
     msg += f"```{total_revenue}```"
     msg += f"```Average Growth: {total_revenue['percent_change'][-YRS_LOOKBACK:].mean():.3%}```"
     msg += f"```div yield: {dividend_yield:.3f}```"
-    current_price = daily_prices["close"].iloc[0]
+    current_price = float(daily_prices["close"].iloc[0])
     current_pe = current_price / current_eps
     msg += f"```Current P/E: {current_pe:.4f}```"
     grw_rate_dividends = ((total_revenue["percent_change"][-YRS_LOOKBACK:].mean() * 100) + dividend_yield) / current_pe
@@ -774,7 +775,7 @@ def risk_reward(
     :param monthly_company_prices: DataFrame of history of monthly company stock prices
     :param inc_statement: Dataframe of company Income Statement
     :param high_yield: high yield from EPS chart
-    :return: a tuple of a string to print to the report, and a collection of files (images) to post
+    :return: a tuple of a string to print to the report, and a list of (file name, <io.BytesIO> image) to post
     """
     msg = "\n__**Evaluating Risk & Reward**__  - **Work in Progress**"
     present_price = float(daily_prices["close"].iloc[0])
@@ -815,9 +816,9 @@ def risk_reward(
     quarterly_eps.index.name = "date"
     quarterly_eps.index = pd.to_datetime(time)
     quarterly_eps.sort_index(axis=0, ascending=True, inplace=True)
-    quarterly_eps.plot()
-    plt.savefig("./eps_pred_fig.jpg")
-    files.append("./eps_pred_fig.jpg")
+    with charts.CHARTS.figure() as (fig, ax):
+        quarterly_eps.plot(ax=ax)
+        files.append(charts.render(fig, "eps_pred_fig.jpg"))
     forcast_high = pe_high.mean() * est_high_eps
 
     # Build High Revenue Prediction
@@ -842,9 +843,9 @@ def risk_reward(
     quarterly_revenue.index = pd.to_datetime(time)
     quarterly_revenue.sort_index(axis=0, ascending=True, inplace=True)
     # Plot revenue and prediction
-    quarterly_revenue.plot()
-    plt.savefig("./revenue_pred_fig.jpg")
-    files.append("./revenue_pred_fig.jpg")
+    with charts.CHARTS.figure() as (fig, ax):
+        quarterly_revenue.plot(ax=ax)
+        files.append(charts.render(fig, "revenue_pred_fig.jpg"))
 
     # Sales to EPS Prediction
     # print('PE High Mean: {}'.format(pe_high.mean()))
@@ -879,9 +880,9 @@ def risk_reward(
     low_prices.index.name = "date"
     low_prices.index = pd.to_datetime(time)
     low_prices.sort_index(ascending=True, inplace=True)
-    low_prices.plot()
-    plt.savefig("./low_price_pred_fig.jpg")
-    files.append("./low_price_pred_fig.jpg")
+    with charts.CHARTS.figure() as (fig, ax):
+        low_prices.plot(ax=ax)
+        files.append(charts.render(fig, "low_price_pred_fig.jpg"))
 
     # Build High Price Predictions
     # Calculate linear regression high
@@ -903,9 +904,9 @@ def risk_reward(
     high_prices.index.name = "date"
     high_prices.index = pd.to_datetime(time)
     high_prices.sort_index(axis=0, ascending=True, inplace=True)
-    high_prices.plot()
-    plt.savefig("./high_price_pred_fig.jpg")
-    files.append("./high_price_pred_fig.jpg")
+    with charts.CHARTS.figure() as (fig, ax):
+        high_prices.plot(ax=ax)
+        files.append(charts.render(fig, "high_price_pred_fig.jpg"))
 
     # Calculate avg high
     avg_high = daily_prices["high"].mean()
@@ -1000,6 +1001,63 @@ d) {dividend_low:.4f} to 1```""".format(
     return msg, files
 
 
+async def send_charts(channel, images: list):
+    """Upload rendered charts.
+
+    :param channel: Discord message channel
+    :param images: <list> of (<str> file name, <io.BytesIO> image) from a charting section (ex. trend)
+    """
+    for filename, image in images:
+        await channel.send(file=discord.File(image, filename=filename))
+
+
+def fetch_company_data(ticker: str, alphavantage_key: str):
+    """Start every Alphavantage download for a company concurrently.
+
+    Each task downloads and processes its own data set, so parsing starts as soon as that payload arrives instead
+    of after the slowest request. Monthly prices are built from the same daily sync rather than their own call, and
+    the four statements wait for the overview so they are only downloaded again once a new quarter is filed.
+
+    :param ticker: Company stock ticker
+    :param alphavantage_key: Alphavantage API key
+    :return: <dict> of asyncio.Task keyed by data set name
+    """
+    overview = asyncio.create_task(alpha.get_alphavantage_overview(ticker, alphavantage_key))
+    return {
+        "overview": overview,
+        "income_statement": asyncio.create_task(
+            fetch_statement(alpha.get_alphavantage_income_statement, ticker, alphavantage_key, overview)
+        ),
+        "balance_sheet": asyncio.create_task(
+            fetch_statement(alpha.get_alphavantage_balance_sheet, ticker, alphavantage_key, overview)
+        ),
+        "earnings": asyncio.create_task(
+            fetch_statement(alpha.get_alphavantage_earnings, ticker, alphavantage_key, overview)
+        ),
+        "cash_flow": asyncio.create_task(
+            fetch_statement(alpha.get_alphavantage_cash_flow, ticker, alphavantage_key, overview)
+        ),
+        "monthly_prices": asyncio.create_task(
+            alpha.get_monthly_alphavantage_company_prices(ticker, alphavantage_key)
+        ),
+        "daily_prices": asyncio.create_task(alpha.sync_daily_alphavantage_company_prices(ticker, alphavantage_key)),
+    }
+
+
+async def fetch_statement(getter, ticker: str, alphavantage_key: str, overview: asyncio.Task):
+    """Download a financial statement once the overview reports the company's latest filed quarter.
+
+    :param getter: Alphavantage statement getter (ex. alpha.get_alphavantage_income_statement)
+    :param ticker: Company stock ticker
+    :param alphavantage_key: Alphavantage API key
+    :param overview: <asyncio.Task> company overview download
+    :return: processed statement
+    """
+    # Shield so a cancelled statement does not cancel the overview shared with the other sections
+    latest_quarter = (await asyncio.shield(overview)).get("LatestQuarter")
+    return await getter(ticker, alphavantage_key, latest_quarter=latest_quarter)
+
+
 async def run(message, ticker, alphavantage_key=None):
     """Run stock analysis.
 
@@ -1008,42 +1066,55 @@ async def run(message, ticker, alphavantage_key=None):
     :param alphavantage_key: Alphavantage API key
     :return:
     """
+    tasks = fetch_company_data(ticker, alphavantage_key)
+    try:
+        await build_report(message, tasks)
+    finally:
+        # Stop any downloads still in flight if a report section failed
+        for task in tasks.values():
+            task.cancel()
+        await asyncio.gather(*tasks.values(), return_exceptions=True)
+
+
+async def build_report(message, tasks: dict):
+    """Build and send the stock report sections as their data sets arrive.
+
+    :param message: <discord.message> Discord message object to make replys to
+    :param tasks: <dict> of asyncio.Task from fetch_company_data
+    :return:
+    """
     # Get and sort Company Data
-    overview = await alpha.get_alphavantage_overview(ticker, alphavantage_key)
-    income_statement = await alpha.get_alphavantage_income_statement(ticker, alphavantage_key)
+    income_statement = await tasks["income_statement"]
     income_statement["annualReports"].sort_index(axis=0, ascending=False, inplace=True)
     income_statement["quarterlyReports"].sort_index(axis=0, ascending=False, inplace=True)
 
-    balance_sheet = await alpha.get_alphavantage_balance_sheet(ticker, alphavantage_key)
-    balance_sheet["quarterlyReports"].sort_index(axis=0, ascending=False, inplace=True)
-    balance_sheet["annualReports"].sort_index(axis=0, ascending=False, inplace=True)
+    # Build and send report components, every section is computed in the worker pool so only Discord I/O runs here
+    # Past sales Records
+    await utils.send_message_in_chunks(
+        message.channel, await workers.run(past_sales_records, income_statement["annualReports"].copy())
+    )
 
-    earnings = await alpha.get_alphavantage_earnings(ticker, alphavantage_key)
+    earnings = await tasks["earnings"]
     earnings["quarterlyEarnings"].sort_index(axis=0, ascending=False, inplace=True)
     earnings["annualEarnings"].sort_index(axis=0, ascending=False, inplace=True)
     if income_statement["annualReports"].index[0].value != earnings["annualEarnings"].index[0].value:
         earnings["annualEarnings"] = earnings["annualEarnings"].drop(earnings["annualEarnings"].index[0])
 
-    cash_flow = await alpha.get_alphavantage_cash_flow(ticker, alphavantage_key)
-    cash_flow["annualReports"].sort_index(axis=0, ascending=False, inplace=True)
-    cash_flow["quarterlyReports"].sort_index(axis=0, ascending=False, inplace=True)
+    # Past EPS
+    await message.channel.send(await workers.run(past_eps, earnings["annualEarnings"].copy()))
+
+    overview = await tasks["overview"]
 
     # Get company stock prices
-    monthly_company_prices = await alpha.get_monthly_alphavantage_company_prices(ticker, alphavantage_key)
+    monthly_company_prices = await tasks["monthly_prices"]
     monthly_company_prices.sort_index(axis=0, ascending=False, inplace=True)
-    daily_company_prices = await alpha.get_daily_alphavantage_company_prices(ticker, alphavantage_key)
+    daily_company_prices = await tasks["daily_prices"]
     daily_company_prices.sort_index(axis=0, ascending=False, inplace=True)
     # TODO normalize dates for bug
 
-    # Build and send report components
-    # Past sales Records
-    await utils.send_message_in_chunks(message.channel, past_sales_records(income_statement["annualReports"].copy()))
-
-    # Past EPS
-    await message.channel.send(past_eps(earnings["annualEarnings"].copy()))
-
     # Record of Stock
-    msg, high_yield = record_of_stock(
+    msg, high_yield = await workers.run(
+        record_of_stock,
         earnings.copy(),
         income_statement.copy(),
         daily_company_prices.copy(),
@@ -1054,17 +1125,22 @@ async def run(message, ticker, alphavantage_key=None):
     await utils.send_message_in_chunks(message.channel, msg)
 
     # Trend
-    msg, charts = trend(income_statement.copy(), earnings.copy(), monthly_company_prices.copy())
+    msg, images = await workers.run(trend, income_statement.copy(), earnings.copy(), monthly_company_prices.copy())
     await message.channel.send(msg)
-    for fig in charts:
-        with open(fig, "rb") as fh:
-            f = discord.File(fh, filename=fig)
-            await message.channel.send(file=f)
+    await send_charts(message.channel, images)
     # Cash Position
-    await utils.send_message_in_chunks(message.channel, cash_position(balance_sheet.copy()))
+    balance_sheet = await tasks["balance_sheet"]
+    balance_sheet["quarterlyReports"].sort_index(axis=0, ascending=False, inplace=True)
+    balance_sheet["annualReports"].sort_index(axis=0, ascending=False, inplace=True)
+    await utils.send_message_in_chunks(message.channel, await workers.run(cash_position, balance_sheet.copy()))
+
+    cash_flow = await tasks["cash_flow"]
+    cash_flow["annualReports"].sort_index(axis=0, ascending=False, inplace=True)
+    cash_flow["quarterlyReports"].sort_index(axis=0, ascending=False, inplace=True)
 
     # Revenue Growth
-    revenue_message, dividend_yield, current_pe = revenue_growth(
+    revenue_message, dividend_yield, current_pe = await workers.run(
+        revenue_growth,
         daily_company_prices.copy(),
         cash_flow.copy(),
         income_statement.copy(),
@@ -1074,11 +1150,13 @@ async def run(message, ticker, alphavantage_key=None):
     await message.channel.send(revenue_message)
 
     # Earnings Growth
-    await message.channel.send(earnings_growth(cash_flow.copy(), dividend_yield, current_pe))
+    await message.channel.send(await workers.run(earnings_growth, cash_flow.copy(), dividend_yield, current_pe))
 
     # TODO management
     # Risk Reward
-    msg, charts = risk_reward(
+    (msg, images), chart_metrics = await workers.run(
+        charts.with_metrics,
+        risk_reward,
         daily_company_prices.copy(),
         earnings.copy(),
         monthly_company_prices.copy(),
@@ -1086,7 +1164,5 @@ async def run(message, ticker, alphavantage_key=None):
         high_yield,  # high yield from EPS chart
     )
     await message.channel.send(msg)
-    for fig in charts:
-        with open(fig, "rb") as fh:
-            f = discord.File(fh, filename=fig)
-            await message.channel.send(file=f)
+    await send_charts(message.channel, images)
+    LOGGER.debug("Chart metrics of the report worker: %s", chart_metrics)
@@ -0,0 +1,212 @@
+# -*- coding: utf-8 -*-
+# pylint: disable=C0116, W0511
+"""Offline index of listed ticker symbols.
+
+Built from SEC's bulk ``company_tickers_exchange.json`` (ticker, CIK, name, exchange) and saved to disk, so a
+symbol can be checked with a dictionary lookup before any Alphavantage quota is spent on it. A ticker that drops
+out of the bulk file is kept as delisted with the day it disappeared. The index is refreshed once a day in the
+background while the saved index keeps answering lookups, and a failed refresh is not retried for RETRY_INTERVAL.
+
+    index = await symbols.get_index()
+    index.get("MSFT").cik
+"""
+import bisect
+import collections
+import datetime
+import difflib
+import json
+import logging
+import os
+import re
+import tempfile
+import time
+from asyncio import create_task, to_thread
+
+import aiohttp
+
+from warren_bot import cache
+from warren_bot import concurrency
+from warren_bot import sec
+
+LOGGER = logging.getLogger(__name__)
+
+SYMBOL_FILE = os.path.join(cache.CACHE_DIR, "symbols.json")
+REFRESH_INTERVAL = 24 * 60 * 60  # seconds
+RETRY_INTERVAL = 60 * 60  # seconds between refresh attempts while SEC keeps failing
+# A single letter after a dot is a share class (BRK.B), longer suffixes name an exchange (TSCO.LON)
+SHARE_CLASS = re.compile(r"\.([A-Z])$")
+
+# status is active or delisted, delisted the ISO day the ticker left the listing files
+Listing = collections.namedtuple("Listing", ["ticker", "cik", "name", "exchange", "status", "delisted"])
+
+
+def normalize(ticker: str):
+    """Normalize a ticker so share class separators match (BRK.B and BRK-B).
+
+    :param ticker: <str> ticker symbol
+    :return: <str> upper case ticker with - as class separator, exchange suffixes (ex. TSCO.LON) are kept
+    """
+    return SHARE_CLASS.sub(r"-\1", str.upper(ticker).strip())
+
+
+def has_exchange_suffix(ticker: str):
+    """Check if a ticker names a non US exchange (ex. TSCO.LON), those are not in SEC's listing files.
+
+    :param ticker: <str> ticker symbol
+    :return: <bool>
+    """
+    return "." in normalize(ticker)
+
+
+class SymbolIndex:
+    """Ticker symbols with constant time lookup and sorted prefix search."""
+
+    def __init__(self, listings=(), updated: float = None):
+        """Build a symbol index.
+
+        :param listings: iterable of <Listing>
+        :param updated: <float> epoch seconds the listings were downloaded, None if never
+        """
+        self.listings = {normalize(listing.ticker): listing for listing in listings}
+        self._tickers = sorted(self.listings)
+        self.updated = updated
+
+    def __len__(self):
+        """Return the number of indexed tickers."""
+        return len(self.listings)
+
+    def get(self, ticker: str):
+        """Look up a ticker.
+
+        :param ticker: <str> ticker symbol, any case or class separator
+        :return: <Listing> None if unknown
+        """
+        return self.listings.get(normalize(ticker))
+
+    def prefix(self, prefix: str, limit: int = 10):
+        """Find tickers starting with a prefix.
+
+        :param prefix: <str> start of a ticker symbol
+        :param limit: <int> most listings returned
+        :return: <list> of <Listing> in ticker order
+        """
+        prefix = normalize(prefix)
+        first = bisect.bisect_left(self._tickers, prefix)
+        found = []
+        for ticker in self._tickers[first:first + limit]:
+            if not ticker.startswith(prefix):
+                break
+            found.append(self.listings[ticker])
+        return found
+
+    def suggest(self, ticker: str, limit: int = 3):
+        """Suggest active tickers close to a mistyped one.
+
+        :param ticker: <str> ticker symbol not in the index
+        :param limit: <int> most suggestions returned
+        :return: <list> of ticker symbols
+        """
+        ticker = normalize(ticker)
+        candidates = [
+            listing.ticker for listing in self.prefix(ticker[:1], limit=len(self)) if listing.status == "active"
+        ]
+        return difflib.get_close_matches(ticker, candidates, n=limit, cutoff=0.6)
+
+    def merge(self, bulk: dict, today: datetime.date = None):
+        """Build a new index from a bulk listing file, keeping tickers that left it as delisted.
+
+        :param bulk: <dict> json of sec.get_company_tickers
+        :param today: <datetime.date> optional day tickers that left are marked delisted on
+        :return: <SymbolIndex>
+        """
+        fields = bulk["fields"]
+        listings = {}
+        for values in bulk["data"]:
+            row = dict(zip(fields, values))
+            if not row.get("ticker"):
+                continue
+            listing = Listing(row["ticker"], str(row["cik"]), row["name"], row.get("exchange"), "active", None)
+            listings.setdefault(normalize(listing.ticker), listing)
+        delisted_on = (today or datetime.date.today()).isoformat()
+        for key, listing in self.listings.items():
+            if key not in listings:
+                if listing.status == "active":
+                    listing = listing._replace(status="delisted", delisted=delisted_on)
+                listings[key] = listing
+        return SymbolIndex(listings.values(), time.time())
+
+    def save(self, path: str = SYMBOL_FILE):
+        """Write the index to a JSON file atomically.
+
+        :param path: <str> file path
+        """
+        directory = os.path.dirname(path) or "."
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as file:
+                listings = [list(listing) for listing in self.listings.values()]
+                json.dump({"updated": self.updated, "listings": listings}, file)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    @classmethod
+    def load(cls, path: str = SYMBOL_FILE):
+        """Read an index saved with save.
+
+        :param path: <str> file path
+        :return: <SymbolIndex> empty if the file is missing or unreadable
+        """
+        try:
+            with open(path, encoding="utf-8") as file:
+                data = json.load(file)
+            return cls((Listing(*row) for row in data["listings"]), data["updated"])
+        except FileNotFoundError:
+            return cls()
+        except (OSError, ValueError, KeyError, TypeError) as err:
+            LOGGER.warning("Ignoring unreadable symbol index %s: %s", path, err)
+            return cls()
+
+
+INDEX = None
+REFRESHES = concurrency.SingleFlight()
+REFRESH_TASK = None  # background refresh of a saved index
+LAST_ATTEMPT = 0.0  # epoch seconds of the last refresh attempt
+
+
+async def get_index(path: str = SYMBOL_FILE):
+    """Return the shared symbol index, loading it from disk and refreshing it once a day.
+
+    A stale saved index is returned right away and refreshed in the background, only an index that was never
+    downloaded waits for SEC.
+
+    :param path: <str> file the index is saved in
+    :return: <SymbolIndex> possibly empty if it was never downloaded and SEC cannot be reached
+    """
+    global INDEX, REFRESH_TASK  # pylint: disable=global-statement
+    if INDEX is None:
+        INDEX = SymbolIndex.load(path)
+    now = time.time()
+    stale = INDEX.updated is None or now - INDEX.updated > REFRESH_INTERVAL
+    if not stale or now - LAST_ATTEMPT < RETRY_INTERVAL:
+        return INDEX
+    if not INDEX:
+        await REFRESHES.do(path, _refresh, path)
+    elif not REFRESHES.in_flight(path):
+        REFRESH_TASK = create_task(REFRESHES.do(path, _refresh, path))
+    return INDEX
+
+
+async def _refresh(path: str):
+    global INDEX, LAST_ATTEMPT  # pylint: disable=global-statement
+    LAST_ATTEMPT = time.time()
+    try:
+        bulk = await sec.get_company_tickers()
+    except (ConnectionError, TimeoutError, ValueError, aiohttp.ClientError) as err:
+        LOGGER.warning("Could not refresh the symbol index, keeping %d saved symbols: %s", len(INDEX), err)
+        return
+    INDEX = INDEX.merge(bulk)
+    await to_thread(INDEX.save, path)
+    LOGGER.info("Symbol index refreshed with %d symbols", len(INDEX))
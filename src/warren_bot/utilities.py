@@ -2,17 +2,21 @@
 # pylint: disable=C0116, W0511
 """Collection of useful utilities for warren_bot including getting data from alphavantage and processing
 data structures."""
+import asyncio
 import datetime
 import logging
 import os
+import re
 from argparse import ArgumentParser
-from asyncio import sleep
 
 import pandas as pd
-import requests
 from jinja2 import Environment, select_autoescape, FileSystemLoader
 from xhtml2pdf import pisa
 
+from warren_bot import sec
+from warren_bot import sec_facts
+from warren_bot import symbols
+
 try:
     import ConfigParser as config_parser  # noqa: N813
 except:  # noqa: E722 pylint: disable=bare-except
@@ -106,44 +110,25 @@ def company_size(revenue):
 
 
 async def get_company_industry(cik):
-    """Get Industry and Sector for a given company ticker.
+    """Get the industry of a company from its SEC submissions.
 
     :param cik: <str> company SEC CIK number
-    :return: (<industry>, <sector>)
+    :return: <str> SIC industry description, None if SEC lists none
     """
-    url = f"https://data.sec.gov/submissions/CIK{fix_cik(cik)}.json"
-    headers = {
-        "user-agent": "Cypress Investment Club simmonsj@jasimmonsv.com",
-    }
-    r = requests.get(url, headers=headers, timeout=30)
-    if r.status_code != "200":
-        await sleep(15)
-        r = requests.get(url, headers=headers, timeout=30)
-    r = r.json()
-    return r["sicDescription"]
+    submissions = await sec.get_submissions(cik)
+    return submissions.get("sicDescription") or None
 
 
 async def get_current_sec_10k_revenue(cik: str):
-    """Get current 10-K from SEC Edgar API.
+    """Get the revenue of a company's latest 10-K from the local SEC facts index.
 
-    :param cik:
-    :return:
+    The index is brought up to date first, which only downloads facts when a new filing appeared.
+
+    :param cik: <str> company SEC CIK number
+    :return: <float> revenue of the latest fiscal year, None if the company reports no revenue concept
     """
-    url = f"https://data.sec.gov/api/xbrl/companyfacts/CIK{fix_cik(cik)}.json"
-    headers = {
-        "user-agent": "Cypress Investment Club simmonsj@jasimmonsv.com",
-    }
-    r = requests.get(url, headers=headers, timeout=30)
-    if r.status_code != "200":
-        await sleep(15)
-        r = requests.get(url, headers=headers, timeout=30)
-    r = r.json()
-    latest_year = 0
-    for record in r["facts"]["us-gaap"]["Revenues"]["units"]["USD"]:
-        if record["fy"] > latest_year and record["form"] == "10-K":
-            revenue = record["val"]
-            # fy = record["fy"]
-    return revenue
+    await sec_facts.sync_company(cik)
+    return await asyncio.to_thread(sec_facts.FACTS_INDEX.latest_annual, cik, sec_facts.REVENUE_CONCEPTS)
 
 
 def fix_cik(cik: str):
@@ -171,7 +156,6 @@ async def verify_club_data(data):
     :param data: <dict> club data json from local file
     :return data, changed: data is a dict with relevant club data, changed is a <bool> if anything was changed
     """
-    changed = False
     assert "club" in data.keys()
     assert "name" in data["club"].keys()
     assert "valuation_dates" in data["club"].keys()
@@ -179,25 +163,44 @@ async def verify_club_data(data):
     assert len(data["club"]["valuation_dates"]) > 0
     # check club stocks
     assert "club_stocks" in data["club"].keys()
-    # check each club stock has verified info
-    for stock in data["club"]["club_stocks"].keys():
-        cik = fix_cik(data["club"]["club_stocks"][stock]["cik"])
-        industry = data["club"]["club_stocks"][stock]["industry"]
-        sector = data["club"]["club_stocks"][stock]["sector"]
-        size = data["club"]["club_stocks"][stock]["company_size"]
-        assert cik != ""
-        if industry == "":
-            data["club"]["club_stocks"][stock]["industry"] = await get_company_industry(cik)
-            changed = True
-        if sector != "":
-            pass  # TODO get company sector information
-        if size == "":
-            revenue = await get_current_sec_10k_revenue(cik)
-            size = company_size(revenue)
-            changed = True
+    # check each club stock has verified info, all stocks at once
+    stocks = data["club"]["club_stocks"]
+    results = await asyncio.gather(*(verify_club_stock(ticker, stock) for ticker, stock in stocks.items()))
+    changed = any(results)
     return data, changed
 
 
+async def verify_club_stock(ticker: str, stock: dict):
+    """Fill in the missing CIK, industry and company size of a club stock.
+
+    The CIK comes from the offline symbol index, industry and size from SEC EDGAR.
+
+    :param ticker: <str> ticker symbol of the club stock
+    :param stock: <dict> club stock entry from club data json, updated in place
+    :return: <bool> True if anything was changed
+    """
+    changed = False
+    if stock.get("cik", "") == "":
+        listing = (await symbols.get_index()).get(ticker)
+        assert listing is not None, f"No CIK known for {ticker}, enter it in the club info file"
+        stock["cik"] = listing.cik
+        changed = True
+    cik = fix_cik(stock["cik"])
+    lookups = {}
+    if stock["industry"] == "":
+        lookups["industry"] = get_company_industry(cik)
+    if stock["sector"] != "":
+        pass  # TODO get company sector information
+    if stock["company_size"] == "":
+        lookups["company_size"] = get_current_sec_10k_revenue(cik)
+    values = await asyncio.gather(*lookups.values())
+    for field, value in zip(lookups, values):
+        if value is not None:
+            stock[field] = company_size(value) if field == "company_size" else value
+            changed = True
+    return changed
+
+
 def convert_html_to_pdf(source_html: str, output_filename: str):
     """Take HTML object and build a PDF document from it.
 
@@ -229,7 +232,7 @@ def draw_club_report(
     :param stock_charts: <list> of filenames of chart images
     :param club_data: <dict> json of club_data from club_info.json
     :param reports_dir: <str> optional directory to save reports to
-    :return:
+    :return: <str> path of the report PDF
     """
     # Sanity checks for files and folders
     assert os.path.isdir(reports_dir)
@@ -351,6 +354,7 @@ def draw_club_report(
         # save html page as PDF
         pdf_file_path = os.path.join(reports_dir, f"{filename}.pdf")
         convert_html_to_pdf(html_page, pdf_file_path)
+        return pdf_file_path
     except AssertionError as err:
         raise FileNotFoundError(f"Company Logo not found! - {company_logo}") from err
     except Exception as err:
@@ -370,7 +374,7 @@ def process_config_file(cfg_obj=None):
                 "discord_app_id": "",
                 "discord_public_key": "",
             },
-            "alphavantage": {"key": ""},
+            "alphavantage": {"key": "", "keys": [], "tier": "free"},
         }
     :return: overwritten config dict
     """
@@ -386,21 +390,37 @@ def process_config_file(cfg_obj=None):
         cfg_obj["discord"]["token"] = config.get("discord", "token")
         cfg_obj["discord"]["discord_app_id"] = config.get("discord", "discordAppId")
         cfg_obj["discord"]["discord_public_key"] = config.get("discord", "discordPublicKey")
-    except config_parser.NoOptionError:
+    except (config_parser.NoSectionError, config_parser.NoOptionError):
         LOGGER.error("Could not read discord configuration.")
-    # Alphavantage
-    try:
-        cfg_obj["alphavantage"]["key"] = config.get("alphavantage", "key")
-    except config_parser.NoOptionError:
+    # Alphavantage, either a single key or a list of keys that calls are spread across
+    cfg_obj["alphavantage"]["key"] = config.get("alphavantage", "key", fallback="").strip()
+    cfg_obj["alphavantage"]["keys"] = parse_api_keys(
+        config.get("alphavantage", "keys", fallback=""), cfg_obj["alphavantage"]["key"]
+    )
+    cfg_obj["alphavantage"]["tier"] = config.get("alphavantage", "tier", fallback="free").strip()
+    if not cfg_obj["alphavantage"]["keys"]:
         LOGGER.error("Could not read alphavantage configuration.")
     # Logging Level
     try:
         cfg_obj["logging_level"] = config.get("bot", "logging_level")
-    except config_parser.NoOptionError:
+    except (config_parser.NoSectionError, config_parser.NoOptionError):
         LOGGER.error("Could not read logging_level configuration.")
     return cfg_obj
 
 
+def parse_api_keys(keys: str, key: str = ""):
+    """Parse a comma separated list of API keys, falling back to a single key.
+
+    :param keys: <str> keys separated by commas or whitespace, may be blank
+    :param key: <str> key used when keys is blank
+    :return: <list> of keys, empty if neither is set
+    """
+    parsed = [value for value in re.split(r"[,\s]+", keys.strip()) if value]
+    if not parsed and key:
+        parsed = [key]
+    return parsed
+
+
 def process_env_variables(config):  # pylint: disable=too-many-branches
     """Process OS environmental variables.
 
@@ -413,7 +433,7 @@ def process_env_variables(config):  # pylint: disable=too-many-branches
                 "discord_app_id": "",
                 "discord_public_key": "",
             },
-            "alphavantage": {"key": ""},
+            "alphavantage": {"key": "", "keys": [], "tier": "free"},
         }
     :return: overwritten config dict
     """
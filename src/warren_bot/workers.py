@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+# pylint: disable=C0116, W0511
+"""Process pool for CPU-bound report work.
+
+Pandas analysis, chart rendering and PDF conversion run in worker processes so the discord.py event loop keeps
+answering commands and gateway heartbeats. At most ``MAX_WORKERS`` jobs run at once, later jobs queue. Jobs are
+plain module level functions whose arguments and results are pickled, so they hand back ready to send messages and
+file buffers rather than objects tied to the bot.
+
+    msg, files = await workers.run(stock_analysis.trend, income_statement, earnings, monthly_prices)
+"""
+import asyncio
+import functools
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+LOGGER = logging.getLogger(__name__)
+
+# 0 runs jobs on a thread of this process instead, ex. when debugging
+MAX_WORKERS = int(os.getenv("WARREN_WORKERS", str(min(2, os.cpu_count() or 1))))
+
+_POOL = None
+
+
+def get_pool():
+    """Return the shared process pool, creating it on first use.
+
+    Workers are spawned rather than forked so they do not inherit the event loop, sockets or locks of the bot.
+
+    :return: <concurrent.futures.ProcessPoolExecutor>
+    """
+    global _POOL  # pylint: disable=global-statement
+    if _POOL is None:
+        _POOL = ProcessPoolExecutor(max_workers=MAX_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+        LOGGER.debug("Started %d report workers", MAX_WORKERS)
+    return _POOL
+
+
+def shutdown():
+    """Stop the worker processes, waiting for running jobs to finish."""
+    global _POOL  # pylint: disable=global-statement
+    if _POOL is not None:
+        _POOL.shutdown(wait=True, cancel_futures=True)
+        _POOL = None
+        LOGGER.debug("Stopped report workers")
+
+
+async def run(func, *args, **kwargs):
+    """Run a CPU-bound function in the worker pool.
+
+    :param func: module level function, picklable along with its arguments and result
+    :return: result of func
+    """
+    if MAX_WORKERS == 0:
+        return await asyncio.to_thread(func, *args, **kwargs)
+    try:
+        return await asyncio.get_running_loop().run_in_executor(get_pool(), functools.partial(func, *args, **kwargs))
+    except BrokenProcessPool:
+        # A worker died (ex. out of memory), start a new pool for the next job
+        LOGGER.error("Report worker died running %s, restarting the pool", func.__name__)
+        global _POOL  # pylint: disable=global-statement
+        _POOL = None
+        raise